@@ -0,0 +1,4 @@
+import time
+
+# 冷启动计时起点：导入 app 包的时刻（见 bootstrap.startup_report）
+import_started = time.perf_counter()
@@ -0,0 +1,57 @@
+from typing import AsyncGenerator, Optional
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from .config import Settings, get_settings
+from .database import apply_sqlite_pragmas, database_url
+
+settings = get_settings()
+
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_url(url: str) -> str:
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if parsed.get_driver_name() in ("aiosqlite", "asyncpg") or backend not in _ASYNC_DRIVERS:
+        return url
+    return str(parsed.set(drivername=_ASYNC_DRIVERS[backend]))
+
+
+def build_async_engine(url: str, config: Settings) -> AsyncEngine:
+    url = async_url(url)
+    if make_url(url).get_backend_name() != "sqlite":
+        return create_async_engine(
+            url,
+            connect_args=config.db_connect_args,
+            pool_size=config.db_pool_size,
+            max_overflow=config.db_max_overflow,
+            pool_timeout=config.db_pool_timeout,
+            pool_pre_ping=config.db_pool_pre_ping,
+            pool_recycle=config.db_pool_recycle,
+        )
+    async_engine = create_async_engine(
+        url,
+        connect_args={"timeout": config.sqlite_busy_timeout_ms / 1000, **config.db_connect_args},
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=config.db_pool_size,
+        max_overflow=config.db_max_overflow,
+        pool_timeout=config.db_pool_timeout,
+        # 本地文件库不存在断线问题，省去每次签出时额外一次跨线程的 SELECT 1
+        pool_pre_ping=False,
+    )
+    apply_sqlite_pragmas(async_engine.sync_engine, config)
+    return async_engine
+
+
+# 仅在 DB_ASYNC 开启时创建，避免同步模式下要求安装 aiosqlite/asyncpg
+async_engine: Optional[AsyncEngine] = build_async_engine(database_url, settings) if settings.db_async else None
+AsyncSessionLocal = sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as session:
+        yield session
@@ -1,14 +1,33 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Any, Callable, Optional, Tuple
 
+from fastapi.concurrency import run_in_threadpool
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from .config import get_settings
 from .schemas import TokenPayload
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 settings = get_settings()
+# min_rounds 与默认成本一致：低于当前成本的旧哈希会在下次登录成功时自动升级
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+)
+
+
+class PasswordPoolBusy(Exception):
+    pass
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_pending = 0
 
 
 def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
@@ -35,3 +54,50 @@ def validate_token(token: str) -> Optional[TokenPayload]:
         return decode_access_token(token)
     except JWTError:
         return None
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if settings.password_hash_workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=settings.password_hash_workers)
+        return _pool
+
+
+async def run_password_task(func: Callable[..., Any], *args: Any) -> Any:
+    """Run a bcrypt call in the dedicated process pool, bounded by ``password_hash_queue_limit``.
+
+    bcrypt is CPU-bound; running it in separate processes keeps login bursts from
+    occupying the threadpool and the GIL that every other sync endpoint depends on.
+    """
+    global _pending
+    with _pool_lock:
+        if _pending >= settings.password_hash_queue_limit:
+            raise PasswordPoolBusy()
+        _pending += 1
+    try:
+        pool = _get_pool()
+        if pool is None:
+            return await run_in_threadpool(func, *args)
+        return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+    finally:
+        with _pool_lock:
+            _pending -= 1
+
+
+def password_pool_stats() -> dict:
+    return {"workers": settings.password_hash_workers, "pending": _pending, "queue_limit": settings.password_hash_queue_limit}
+
+
+def shutdown_password_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
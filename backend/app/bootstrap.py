@@ -0,0 +1,161 @@
+import logging
+import os
+import time
+from typing import Any, Dict
+
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from .auth import get_password_hash
+from .config import get_settings
+from .database import Base
+from .migrations import LATEST_VERSION, current_version, run_migrations
+from .models import Role, User
+from .utils.audit import create_audit_log
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+DEFAULT_ROLES: Dict[str, Dict[str, bool]] = {
+    "admin": {
+        "can_create_asset": True,
+        "can_read_asset": True,
+        "can_update_asset": True,
+        "can_delete_asset": True,
+        "can_manage_users": True,
+    },
+    "editor": {
+        "can_create_asset": True,
+        "can_read_asset": True,
+        "can_update_asset": True,
+        "can_delete_asset": True,
+        "can_manage_users": False,
+    },
+    "viewer": {
+        "can_create_asset": False,
+        "can_read_asset": True,
+        "can_update_asset": False,
+        "can_delete_asset": False,
+        "can_manage_users": False,
+    },
+}
+
+# 本进程的冷启动耗时，启动完成后写入日志并由 /api/system/startup 返回
+startup_report: Dict[str, Any] = {}
+
+
+def record_import_time() -> None:
+    """Call once the application module has finished importing."""
+    from . import import_started
+
+    startup_report["import_seconds"] = round(time.perf_counter() - import_started, 4)
+
+
+# PostgreSQL 事务级咨询锁的键，任意固定值即可
+_ADVISORY_LOCK_KEY = 4815162342
+
+
+def seed_defaults(session: Session) -> None:
+    existing = {name for (name,) in session.query(Role.role_name)}
+    for role_name, permissions in DEFAULT_ROLES.items():
+        if role_name not in existing:
+            session.add(Role(role_name=role_name, **permissions))
+    session.flush()
+
+    if session.query(User.id).filter(User.username == "admin").first():
+        return
+    admin_role = session.query(Role).filter(Role.role_name == "admin").one()
+    admin_user = User(
+        username="admin",
+        display_name="系统管理员",
+        dept="信息中心",
+        role_id=admin_role.id,
+        password_hash=get_password_hash(settings.admin_default_password),
+    )
+    session.add(admin_user)
+    session.flush()
+    create_audit_log(
+        session,
+        user_id=None,
+        action="CREATE",
+        target_table="users",
+        target_id=admin_user.id,
+        detail="初始化管理员账号",
+    )
+
+
+def _lock(conn: Connection) -> None:
+    # 持有写锁期间其他 worker 阻塞在这里，拿到锁后会看到已完成的版本号并直接返回
+    if conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+    elif conn.dialect.name == "postgresql":
+        conn.exec_driver_sql(f"SELECT pg_advisory_xact_lock({_ADVISORY_LOCK_KEY})")
+
+
+def _schema_current(engine: Engine) -> bool:
+    with engine.connect() as conn:
+        return current_version(conn) >= LATEST_VERSION
+
+
+def _initialize(engine: Engine) -> bool:
+    """Create tables, migrate and seed in one locked transaction; ``False`` if another worker already did."""
+    session = Session(bind=engine)
+    try:
+        conn = session.connection()
+        _lock(conn)
+        if current_version(conn) >= LATEST_VERSION:
+            session.rollback()
+            return False
+        Base.metadata.create_all(bind=conn)
+        run_migrations(conn)
+        seed_defaults(session)
+        session.commit()
+        return True
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def bootstrap(engine: Engine) -> str:
+    """Bring the database to the latest schema with default roles and admin, at most once across workers.
+
+    Returns ``"current"`` when nothing was needed (a single version query),
+    ``"initialized"`` when this process did the work, or ``"waited"`` when another
+    worker did it while this one waited for the lock.
+    """
+    if _schema_current(engine):
+        return "current"
+    deadline = time.monotonic() + settings.bootstrap_timeout_seconds
+    while True:
+        try:
+            return "initialized" if _initialize(engine) else "waited"
+        except OperationalError as exc:
+            # SQLite 锁等待超过 busy_timeout（例如另一 worker 正在执行耗时迁移）时重试
+            if "locked" not in str(exc) or time.monotonic() > deadline:
+                raise
+            if _schema_current(engine):
+                return "waited"
+
+
+def run_startup(engine: Engine) -> Dict[str, Any]:
+    started = time.perf_counter()
+    outcome = bootstrap(engine)
+    finished = time.perf_counter()
+    # 以预加载方式 fork 的 worker 共享导入阶段，进程号在启动事件中记录
+    startup_report.update(
+        pid=os.getpid(),
+        bootstrap=outcome,
+        bootstrap_seconds=round(finished - started, 4),
+        schema_version=LATEST_VERSION,
+    )
+    logger.info(
+        "worker %s 启动完成：导入 %.3fs，初始化 %.3fs（%s）",
+        startup_report["pid"],
+        startup_report.get("import_seconds", 0.0),
+        startup_report["bootstrap_seconds"],
+        outcome,
+    )
+    return startup_report
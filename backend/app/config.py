@@ -1,5 +1,7 @@
+import json
 import os
 from functools import lru_cache
+from typing import Any, Dict
 
 from pydantic import BaseSettings
 
@@ -8,8 +10,83 @@ class Settings(BaseSettings):
     app_name: str = "资产管理系统"
     secret_key: str = os.getenv("SECRET_KEY", "change_me_secret")
     access_token_expire_minutes: int = 60 * 12  # 12小时
+    bcrypt_rounds: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    password_hash_workers: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))  # 0 表示不使用独立进程池
+    password_hash_queue_limit: int = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "32"))
+    login_ip_limit: int = int(os.getenv("LOGIN_IP_LIMIT", "30"))
+    login_ip_window_seconds: int = int(os.getenv("LOGIN_IP_WINDOW_SECONDS", "60"))
+    login_user_failure_limit: int = int(os.getenv("LOGIN_USER_FAILURE_LIMIT", "10"))
+    login_user_failure_window_seconds: int = int(os.getenv("LOGIN_USER_FAILURE_WINDOW_SECONDS", "300"))
     sqlite_url: str = os.getenv("DATABASE_URL", "sqlite:///./data/app.db")
+    # 开启后资产/用户/审计路由改用异步驱动（SQLite 为 aiosqlite，PostgreSQL 为 asyncpg）
+    db_async: bool = os.getenv("DB_ASYNC", "false").lower() == "true"
+    # 连接池（SQLite 文件库同样使用 QueuePool，忽略 pool_recycle）；默认总连接数与 AnyIO 线程池的 40 个线程一致
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "20"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    db_pool_timeout: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    db_pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    # 透传给数据库驱动的连接参数，JSON 格式，如 {"connect_timeout": 5}
+    db_connect_args: Dict[str, Any] = json.loads(os.getenv("DB_CONNECT_ARGS", "{}"))
+    # SQLite 连接建立时执行的 PRAGMA
+    sqlite_journal_mode: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    sqlite_synchronous: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    sqlite_busy_timeout_ms: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "15000"))
+    sqlite_cache_size_kib: int = int(os.getenv("SQLITE_CACHE_SIZE_KIB", "65536"))
+    sqlite_mmap_size: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    # 多 worker 同时启动时，等待其他 worker 完成建表与迁移的最长时间
+    bootstrap_timeout_seconds: float = float(os.getenv("BOOTSTRAP_TIMEOUT_SECONDS", "300"))
     admin_default_password: str = os.getenv("ADMIN_DEFAULT_PASSWORD", "Admin@123")
+    asset_page_default_limit: int = int(os.getenv("ASSET_PAGE_DEFAULT_LIMIT", "100"))
+    asset_page_max_limit: int = int(os.getenv("ASSET_PAGE_MAX_LIMIT", "1000"))
+    stream_chunk_size: int = int(os.getenv("STREAM_CHUNK_SIZE", "1000"))
+    bulk_batch_size: int = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+    asset_batch_max_size: int = int(os.getenv("ASSET_BATCH_MAX_SIZE", "10000"))
+    audit_mode: str = os.getenv("AUDIT_MODE", "async")  # async：后台批量写入；strict：与业务变更同一事务提交
+    audit_queue_size: int = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+    audit_batch_size: int = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+    audit_flush_interval: float = float(os.getenv("AUDIT_FLUSH_INTERVAL", "0.5"))
+    audit_enqueue_timeout: float = float(os.getenv("AUDIT_ENQUEUE_TIMEOUT", "1.0"))
+    audit_archive_dir: str = os.getenv("AUDIT_ARCHIVE_DIR", "./data/audit_archive")
+    # 后台写入失败时按指数退避重试，仍失败则将该批事件暂存到磁盘，下次写入成功或重启后补写
+    audit_flush_retries: int = int(os.getenv("AUDIT_FLUSH_RETRIES", "3"))
+    audit_retry_backoff: float = float(os.getenv("AUDIT_RETRY_BACKOFF", "0.2"))
+    audit_retry_backoff_max: float = float(os.getenv("AUDIT_RETRY_BACKOFF_MAX", "2.0"))
+    audit_spool_dir: str = os.getenv("AUDIT_SPOOL_DIR", "./data/audit_spool")
+    # 资产读接口的响应缓存：memory 为进程内 LRU，none 关闭，或 "模块:工厂函数" 接入共享缓存
+    response_cache_backend: str = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+    response_cache_max_entries: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+    response_cache_ttl_seconds: float = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+    # 资产变更订阅：每个 worker 一个轮询任务检查新变更，长轮询与 SSE 连接共享轮询结果
+    change_feed_poll_interval: float = float(os.getenv("CHANGE_FEED_POLL_INTERVAL", "0.5"))
+    change_feed_max_wait: float = float(os.getenv("CHANGE_FEED_MAX_WAIT", "30"))
+    change_feed_page_size: int = int(os.getenv("CHANGE_FEED_PAGE_SIZE", "500"))
+    change_feed_retention_days: int = int(os.getenv("CHANGE_FEED_RETENTION_DAYS", "7"))
+    # 资产历史：早于 compact 天数的版本合并为每天一个，早于 retention 天数的版本删除（0 表示永久保留）
+    asset_history_compact_days: int = int(os.getenv("ASSET_HISTORY_COMPACT_DAYS", "30"))
+    asset_history_retention_days: int = int(os.getenv("ASSET_HISTORY_RETENTION_DAYS", "0"))
+    # 网络扫描对账：解析进程数（0 表示在请求线程内解析）、逐行格式的切块大小、报告明细条数上限
+    reconcile_workers: int = int(os.getenv("RECONCILE_WORKERS", str(min(4, (os.cpu_count() or 1) - 1))))
+    reconcile_chunk_bytes: int = int(os.getenv("RECONCILE_CHUNK_BYTES", str(8 * 1024 * 1024)))
+    reconcile_report_limit: int = int(os.getenv("RECONCILE_REPORT_LIMIT", "1000"))
+    # 运行指标：开启后按路由统计延迟、并发与每个请求的 SQL 条数/耗时，/metrics 输出 Prometheus 文本格式
+    metrics_enabled: bool = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+    metrics_token: str = os.getenv("METRICS_TOKEN", "")  # 非空时 /metrics 需携带 Authorization: Bearer <token>
+    # 慢查询日志阈值（毫秒，0 表示关闭），是否同时记录绑定参数
+    slow_query_ms: float = float(os.getenv("SLOW_QUERY_MS", "0"))
+    slow_query_log_params: bool = os.getenv("SLOW_QUERY_LOG_PARAMS", "true").lower() == "true"
+    # 采样分析：请求头 X-Profile 与此值相同时对该请求采样，输出 folded 格式的火焰图数据；为空表示关闭
+    profile_token: str = os.getenv("PROFILE_TOKEN", "")
+    profile_interval_ms: float = float(os.getenv("PROFILE_INTERVAL_MS", "2"))
+    profile_dir: str = os.getenv("PROFILE_DIR", "./data/profiles")
+    # 资产列表的列式扫描：分类/状态/部门/IPv4 过滤改由多 worker 共享的内存映射快照回答，按变更序号增量刷新；需要安装 numpy
+    asset_scan_enabled: bool = os.getenv("ASSET_SCAN_ENABLED", "false").lower() == "true"
+    asset_scan_path: str = os.getenv("ASSET_SCAN_PATH", "./data/asset_scan.bin")
+    asset_scan_max_changes: int = int(os.getenv("ASSET_SCAN_MAX_CHANGES", "50000"))  # 积压变更超过此数时整体重建
+    principal_cache_ttl_seconds: float = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+    principal_cache_max_size: int = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "10000"))
+    # 登录态缓存每隔多少秒比对一次 users/roles 表的版本号，其他 worker 修改用户或角色后最迟在该时间后生效
+    principal_cache_revalidate_seconds: float = float(os.getenv("PRINCIPAL_CACHE_REVALIDATE_SECONDS", "1"))
 
 
 @lru_cache
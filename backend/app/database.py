@@ -1,10 +1,12 @@
 from pathlib import Path
-from typing import Generator
+from typing import Any, Dict, Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
 
-from .config import get_settings
+from .config import Settings, get_settings
 
 settings = get_settings()
 
@@ -13,7 +15,59 @@ if database_url.startswith("sqlite"):
     db_path = database_url.split("///")[-1]
     Path(db_path).parent.mkdir(parents=True, exist_ok=True)
 
-engine = create_engine(database_url, connect_args={"check_same_thread": False})
+
+def _sqlite_pragmas(config: Settings) -> Dict[str, Any]:
+    return {
+        "journal_mode": config.sqlite_journal_mode,
+        "synchronous": config.sqlite_synchronous,
+        "busy_timeout": config.sqlite_busy_timeout_ms,
+        # 负值表示以 KiB 为单位
+        "cache_size": -config.sqlite_cache_size_kib,
+        "mmap_size": config.sqlite_mmap_size,
+        "temp_store": "MEMORY",
+    }
+
+
+def build_engine(url: str, config: Settings) -> Engine:
+    pool_options = {
+        "pool_size": config.db_pool_size,
+        "max_overflow": config.db_max_overflow,
+        "pool_timeout": config.db_pool_timeout,
+        "pool_pre_ping": config.db_pool_pre_ping,
+        "pool_recycle": config.db_pool_recycle,
+    }
+    if make_url(url).get_backend_name() != "sqlite":
+        return create_engine(url, connect_args=config.db_connect_args, **pool_options)
+
+    in_memory = make_url(url).database in (None, "", ":memory:")
+    if in_memory:
+        pool_options = {"poolclass": StaticPool}
+    else:
+        # SQLAlchemy 1.4 对文件型 SQLite 默认使用 NullPool，每次请求都要重新打开文件并执行 PRAGMA
+        pool_options["poolclass"] = QueuePool
+        pool_options.pop("pool_recycle")
+    connect_args = {"check_same_thread": False, "timeout": config.sqlite_busy_timeout_ms / 1000, **config.db_connect_args}
+    sqlite_engine = create_engine(url, connect_args=connect_args, **pool_options)
+    apply_sqlite_pragmas(sqlite_engine, config, in_memory)
+    return sqlite_engine
+
+
+def apply_sqlite_pragmas(target: Engine, config: Settings, in_memory: bool = False) -> None:
+    pragmas = _sqlite_pragmas(config)
+    if in_memory:
+        pragmas.pop("journal_mode")
+
+    @event.listens_for(target, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+engine = build_engine(database_url, settings)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
 Base = declarative_base()
@@ -1,15 +1,61 @@
+from typing import Any, Callable, Optional
+
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
-from . import models
+from . import models, schemas
 from .auth import validate_token
-from .database import get_db
+from .config import get_settings
+from .database import SessionLocal, get_db
+from .utils.cache import VersionedTTLCache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/login")
+settings = get_settings()
+
+# 以令牌主体（用户名）为键缓存启用状态与角色权限，避免每个请求都查询 users/roles；
+# users/roles 表有写入（包括其他 worker）时整体失效
+principal_cache: VersionedTTLCache[schemas.Principal] = VersionedTTLCache(
+    max_size=settings.principal_cache_max_size,
+    ttl=settings.principal_cache_ttl_seconds,
+    tables=(models.User.__tablename__, models.Role.__tablename__),
+    revalidate_interval=settings.principal_cache_revalidate_seconds,
+)
+
+
+def load_principal(db: Session, username: str) -> Optional[schemas.Principal]:
+    user = db.query(models.User).options(joinedload(models.User.role)).filter(models.User.username == username).first()
+    if not user:
+        return None
+    return schemas.Principal(
+        id=user.id,
+        username=user.username,
+        is_active=user.is_active,
+        role_id=user.role_id,
+        **{field: getattr(user.role, field) for field in schemas.PERMISSION_FIELDS},
+    )
+
+
+def _call_with_session(fn: Callable[..., Any], *args: Any) -> Any:
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
 
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> models.User:
+async def _run_with_session(fn: Callable[..., Any], *args: Any) -> Any:
+    if settings.db_async:
+        from .async_database import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            return await db.run_sync(fn, *args)
+    return await run_in_threadpool(_call_with_session, fn, *args)
+
+
+# 缓存命中时直接在事件循环内返回，不再为鉴权占用线程池和数据库连接
+async def get_current_principal(token: str = Depends(oauth2_scheme)) -> schemas.Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="无效或已过期的登录令牌",
@@ -18,17 +64,37 @@ def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_
     token_payload = validate_token(token)
     if not token_payload:
         raise credentials_exception
-    user = db.query(models.User).filter(models.User.username == token_payload.sub).first()
-    if not user or not user.is_active:
+    if principal_cache.needs_revalidation():
+        await _run_with_session(principal_cache.revalidate)
+    principal = principal_cache.get(token_payload.sub)
+    if principal is None:
+        generation = principal_cache.generation
+        principal = await _run_with_session(load_principal, token_payload.sub)
+        if principal is None:
+            raise credentials_exception
+        principal_cache.set(token_payload.sub, principal, generation)
+    if not principal.is_active:
         raise credentials_exception
+    return principal
+
+
+def get_current_user(
+    db: Session = Depends(get_db), principal: schemas.Principal = Depends(get_current_principal)
+) -> models.User:
+    user = db.get(models.User, principal.id)
+    if not user or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="无效或已过期的登录令牌",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 
 def require_permission(permission_field: str):
-    def wrapper(current_user: models.User = Depends(get_current_user)) -> models.User:
-        role = current_user.role
-        if not getattr(role, permission_field, False):
+    async def wrapper(principal: schemas.Principal = Depends(get_current_principal)) -> schemas.Principal:
+        if not getattr(principal, permission_field, False):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="权限不足")
-        return current_user
+        return principal
 
     return wrapper
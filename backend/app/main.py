@@ -1,12 +1,15 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from .auth import shutdown_password_pool
+from .bootstrap import record_import_time, run_startup
 from .config import get_settings
-from .database import Base, engine
-from .models import Role, User
-from .routers import assets, auth, users
-from .utils.audit import create_audit_log
-from .auth import get_password_hash
+from .database import engine
+from .routers import assets, audit, auth, system, users
+from .utils.asset_scan import asset_scan
+from .utils.audit import audit_writer
+from .utils.metrics import instrument_engine, instrument_routes, metrics_endpoint
+from .utils.reconcile import shutdown_reconcile_pool
 
 settings = get_settings()
 
@@ -17,70 +20,54 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified", "X-Profile-File"],
 )
 
 app.include_router(auth.router)
-app.include_router(assets.router)
-app.include_router(users.router)
+if settings.db_async:
+    from .utils.async_routes import asyncify_router
+
+    # 列表与详情是读多的热点接口，使用原生异步实现；其余接口在 greenlet 中运行同步实现
+    app.include_router(
+        asyncify_router(assets.router, native={"list_assets": assets.list_assets_async, "get_asset": assets.get_asset_async})
+    )
+    # 创建/修改用户本身是异步处理函数：bcrypt 在进程池中计算，数据库操作在线程池中执行
+    app.include_router(asyncify_router(users.router))
+    app.include_router(asyncify_router(audit.router))
+else:
+    app.include_router(assets.router)
+    app.include_router(users.router)
+    app.include_router(audit.router)
+app.include_router(system.router)
+if settings.metrics_enabled:
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+# 指标与采样分析都关闭时不包装路由、不注册 SQL 事件，请求路径上没有额外开销
+if settings.metrics_enabled or settings.profile_token:
+    instrument_routes(app)
+instrument_engine(engine)
+if settings.db_async:
+    from .async_database import async_engine
+
+    instrument_engine(async_engine.sync_engine)
 
 
 @app.on_event("startup")
 def on_startup():
-    Base.metadata.create_all(bind=engine)
-    from sqlalchemy.orm import Session
+    audit_writer.start()
+    run_startup(engine)
+    if asset_scan is not None:
+        asset_scan.warm(engine)
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    shutdown_password_pool()
+    shutdown_reconcile_pool()
+    audit_writer.stop()
+    if settings.db_async:
+        from .async_database import async_engine
+
+        await async_engine.dispose()
 
-    session = Session(bind=engine)
-    try:
-        roles_definitions = {
-            "admin": {
-                "can_create_asset": True,
-                "can_read_asset": True,
-                "can_update_asset": True,
-                "can_delete_asset": True,
-                "can_manage_users": True,
-            },
-            "editor": {
-                "can_create_asset": True,
-                "can_read_asset": True,
-                "can_update_asset": True,
-                "can_delete_asset": True,
-                "can_manage_users": False,
-            },
-            "viewer": {
-                "can_create_asset": False,
-                "can_read_asset": True,
-                "can_update_asset": False,
-                "can_delete_asset": False,
-                "can_manage_users": False,
-            },
-        }
-        for role_name, permissions in roles_definitions.items():
-            role = session.query(Role).filter(Role.role_name == role_name).first()
-            if not role:
-                role = Role(role_name=role_name, **permissions)
-                session.add(role)
-        session.commit()
 
-        admin_role = session.query(Role).filter(Role.role_name == "admin").first()
-        if admin_role:
-            admin_user = session.query(User).filter(User.username == "admin").first()
-            if not admin_user:
-                admin_user = User(
-                    username="admin",
-                    display_name="系统管理员",
-                    dept="信息中心",
-                    role_id=admin_role.id,
-                    password_hash=get_password_hash(settings.admin_default_password),
-                )
-                session.add(admin_user)
-                session.commit()
-                create_audit_log(
-                    session,
-                    user_id=None,
-                    action="CREATE",
-                    target_table="users",
-                    target_id=admin_user.id,
-                    detail="初始化管理员账号",
-                )
-    finally:
-        session.close()
+record_import_time()
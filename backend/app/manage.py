@@ -0,0 +1,132 @@
+import argparse
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from .config import get_settings
+from .database import SessionLocal, engine
+from .migrations import analyze
+from .utils.audit_archive import archive_audit_logs
+from .utils.change_feed import prune_changes
+from .utils.history import compact_history, prune_history
+from .utils.reconcile import RECONCILE_FIELDS, SCAN_FORMATS, ReconcileConflict, parse_sources, reconcile, scope_ranges
+from .utils.search import rebuild_search_index
+from .utils.stats import rebuild_stats
+
+settings = get_settings()
+
+
+def rebuild_search(args: argparse.Namespace) -> None:
+    rebuild_search_index(engine)
+    print("资产全文索引已重建")
+
+
+def rebuild_asset_stats(args: argparse.Namespace) -> None:
+    rebuild_stats(engine)
+    print("资产统计汇总表已重建")
+
+
+def analyze_database(args: argparse.Namespace) -> None:
+    with engine.begin() as conn:
+        analyze(conn)
+    print("优化器统计信息已更新")
+
+
+def archive_audit(args: argparse.Namespace) -> None:
+    before = datetime.strptime(args.before, "%Y-%m")
+    results = archive_audit_logs(engine, before, Path(args.dir))
+    for month, count, path in results:
+        print(f"{month}: 归档 {count} 条 -> {path}")
+    if not results:
+        print("没有需要归档的审计日志")
+
+
+def prune_asset_changes(args: argparse.Namespace) -> None:
+    count = prune_changes(engine, datetime.utcnow() - timedelta(days=args.days))
+    print(f"已清理 {count} 条资产变更记录")
+
+
+def compact_asset_history(args: argparse.Namespace) -> None:
+    count = compact_history(engine, datetime.utcnow() - timedelta(days=args.days))
+    print(f"已合并 {count} 个资产历史版本")
+
+
+def prune_asset_history(args: argparse.Namespace) -> None:
+    if args.days <= 0:
+        print("未设置保留天数，资产历史永久保留")
+        return
+    count = prune_history(engine, datetime.utcnow() - timedelta(days=args.days))
+    print(f"已清理 {count} 个资产历史版本")
+
+
+def reconcile_scans(args: argparse.Namespace) -> None:
+    sources = []
+    for item in args.files:
+        scan_format, _, path = item.partition(":")
+        if scan_format not in SCAN_FORMATS or not path:
+            raise SystemExit(f"参数格式应为 格式:路径，格式为 {', '.join(SCAN_FORMATS)} 之一：{item}")
+        sources.append((scan_format, path))
+    started = time.perf_counter()
+    observations = parse_sources(sources)
+    parsed = time.perf_counter()
+    db = SessionLocal()
+    try:
+        report = reconcile(db, observations, fields=args.fields, scope=scope_ranges(args.scope), apply=args.apply, limit=args.limit)
+        if args.apply:
+            db.commit()
+    except ReconcileConflict:
+        db.rollback()
+        raise SystemExit("对账期间有资产被修改，未做任何更新，请重新执行")
+    finally:
+        db.close()
+    if args.output:
+        Path(args.output).write_text(report.json(ensure_ascii=False, indent=2), encoding="utf-8")
+    print(
+        f"解析 {report.observations} 条记录（{parsed - started:.2f}s），合并为 {report.hosts} 台设备："
+        f"匹配 {report.matched}，变化 {report.changed_total}，未登记 {report.unknown_total}，"
+        f"未发现 {report.missing_total}，已更新 {report.applied}（共 {time.perf_counter() - started:.2f}s）"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.manage", description="资产管理系统运维命令")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    subcommands.add_parser("rebuild-search", help="重建资产全文索引").set_defaults(handler=rebuild_search)
+
+    subcommands.add_parser("rebuild-stats", help="按资产表重新计算统计汇总表").set_defaults(handler=rebuild_asset_stats)
+
+    subcommands.add_parser("analyze", help="更新查询优化器统计信息（大批量导入后建议执行）").set_defaults(handler=analyze_database)
+
+    archive = subcommands.add_parser("archive-audit", help="将早于指定月份的审计日志按月归档为 gzip 压缩的 JSONL 文件")
+    archive.add_argument("--before", required=True, help="归档此月份（YYYY-MM）之前的记录，当月不归档")
+    archive.add_argument("--dir", default=settings.audit_archive_dir, help="归档目录")
+    archive.set_defaults(handler=archive_audit)
+
+    prune = subcommands.add_parser("prune-changes", help="清理早于保留期的资产变更记录（变更订阅）")
+    prune.add_argument("--days", type=int, default=settings.change_feed_retention_days, help="保留天数")
+    prune.set_defaults(handler=prune_asset_changes)
+
+    compact = subcommands.add_parser("compact-history", help="将早于指定天数的资产历史版本合并为每天一个")
+    compact.add_argument("--days", type=int, default=settings.asset_history_compact_days, help="最近多少天内的版本保持原样")
+    compact.set_defaults(handler=compact_asset_history)
+
+    prune_versions = subcommands.add_parser("prune-history", help="删除早于保留期的资产历史版本，当前版本不删除")
+    prune_versions.add_argument("--days", type=int, default=settings.asset_history_retention_days, help="保留天数，0 表示永久保留")
+    prune_versions.set_defaults(handler=prune_asset_history)
+
+    scans = subcommands.add_parser("reconcile", help="将网络扫描结果（nmap、ARP、DHCP、交换机 MAC 表等）与资产台账对账")
+    scans.add_argument("files", nargs="+", help="格式:路径，如 nmap:scan.xml arp:arp.txt mac-table:core.txt")
+    scans.add_argument("--scope", action="append", help="扫描覆盖的网段（CIDR，可重复），用于报告未发现的在用资产")
+    scans.add_argument("--fields", nargs="+", choices=RECONCILE_FIELDS, default=["ip_address", "mac_address"], help="比对与更新的字段")
+    scans.add_argument("--apply", action="store_true", help="批量更新发生变化的资产")
+    scans.add_argument("--output", help="完整报告写入该 JSON 文件")
+    scans.add_argument("--limit", type=int, default=settings.reconcile_report_limit, help="报告中每类明细的条数上限")
+    scans.set_defaults(handler=reconcile_scans)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
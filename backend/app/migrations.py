@@ -0,0 +1,138 @@
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import Column, Integer, LargeBinary, MetaData, String, Table, bindparam, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.types import TypeEngine
+
+from .utils.change_feed import create_change_log
+from .utils.history import create_asset_history
+from .utils.network import shadow_columns
+from .utils.search import create_search_index
+from .utils.stats import create_stats_tables
+from .utils.versions import track_table
+
+metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    metadata,
+    Column("version", Integer, primary_key=True),
+)
+
+
+def _create_index(conn: Connection, name: str, table: str, columns: str) -> None:
+    conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+
+
+def _add_column(conn: Connection, table: str, column: str, type_: TypeEngine, default: Optional[str] = None) -> None:
+    existing = {item["name"] for item in inspect(conn).get_columns(table)}
+    if column not in existing:
+        ddl = type_.compile(dialect=conn.dialect)
+        if default is not None:
+            ddl += f" NOT NULL DEFAULT {default}"
+        conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+
+def _assets_keyset_index(conn: Connection) -> None:
+    _create_index(conn, "ix_assets_updated_at_id", "assets", "updated_at, id")
+
+
+def _assets_network_columns(conn: Connection) -> None:
+    _add_column(conn, "assets", "ip_packed", LargeBinary(16))
+    _add_column(conn, "assets", "mac_normalized", String(12))
+    _create_index(conn, "ix_assets_ip_packed", "assets", "ip_packed")
+    _create_index(conn, "ix_assets_mac_normalized", "assets", "mac_normalized")
+    select_batch = text("SELECT id, ip_address, mac_address FROM assets WHERE id > :last_id ORDER BY id LIMIT 5000")
+    update = text("UPDATE assets SET ip_packed = :ip_packed, mac_normalized = :mac_normalized WHERE id = :row_id")
+    update = update.bindparams(bindparam("ip_packed", type_=LargeBinary))
+    last_id = 0
+    while True:
+        rows = conn.execute(select_batch, {"last_id": last_id}).fetchall()
+        if not rows:
+            break
+        conn.execute(update, [{"row_id": row.id, **shadow_columns(row.ip_address, row.mac_address)} for row in rows])
+        last_id = rows[-1].id
+
+
+def _audit_log_indexes(conn: Connection) -> None:
+    _create_index(conn, "ix_audit_logs_created_at_id", "audit_logs", "created_at, id")
+    _create_index(conn, "ix_audit_logs_user_created", "audit_logs", "user_id, created_at, id")
+    _create_index(conn, "ix_audit_logs_target_created", "audit_logs", "target_table, target_id, created_at, id")
+    _create_index(conn, "ix_audit_logs_action_created", "audit_logs", "action, created_at, id")
+
+
+def _audit_asset_code(conn: Connection) -> None:
+    _add_column(conn, "audit_logs", "asset_code", String())
+    _create_index(conn, "ix_audit_logs_asset_code_created", "audit_logs", "asset_code, created_at, id")
+
+
+def analyze(conn: Connection) -> None:
+    # 更新优化器统计信息，多个索引可选时（如类别 + IP）据此选择过滤性更强的索引
+    conn.exec_driver_sql("ANALYZE")
+
+
+def _assets_filter_indexes(conn: Connection) -> None:
+    _create_index(conn, "ix_assets_category_status_updated", "assets", "category, status, updated_at, id")
+    _create_index(conn, "ix_assets_category_updated", "assets", "category, updated_at, id")
+    _create_index(conn, "ix_assets_status_updated", "assets", "status, updated_at, id")
+    _create_index(conn, "ix_assets_owner_dept_updated", "assets", "owner_dept, updated_at, id")
+    analyze(conn)
+
+
+def _assets_version(conn: Connection) -> None:
+    track_table(conn, "assets")
+
+
+def _row_versions(conn: Connection) -> None:
+    _add_column(conn, "assets", "version", Integer(), default="1")
+    _add_column(conn, "users", "version", Integer(), default="1")
+
+
+def _roles_version(conn: Connection) -> None:
+    track_table(conn, "roles")
+
+
+def _users_version(conn: Connection) -> None:
+    track_table(conn, "users")
+
+
+# 按顺序追加，已发布的迁移不可修改
+MIGRATIONS: List[Tuple[int, Callable[[Connection], None]]] = [
+    (1, _assets_keyset_index),
+    (2, _assets_network_columns),
+    (3, create_search_index),
+    (4, _audit_log_indexes),
+    (5, _audit_asset_code),
+    (6, create_stats_tables),
+    (7, _assets_filter_indexes),
+    (8, _assets_version),
+    (9, _row_versions),
+    (10, create_change_log),
+    (11, _roles_version),
+    (12, create_asset_history),
+    (13, _users_version),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn: Connection) -> int:
+    if not inspect(conn).has_table(schema_migrations.name):
+        return 0
+    version = conn.execute(select(schema_migrations.c.version).order_by(schema_migrations.c.version.desc())).scalar()
+    return version or 0
+
+
+def run_migrations(bind) -> int:
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            return run_migrations(conn)
+    metadata.create_all(bind=bind)
+    version = current_version(bind)
+    for target, migrate in MIGRATIONS:
+        if target <= version:
+            continue
+        migrate(bind)
+        bind.execute(schema_migrations.insert().values(version=target))
+        version = target
+    return version
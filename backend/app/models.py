@@ -1,9 +1,10 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, LargeBinary, String, Text
+from sqlalchemy.orm import relationship, validates
 
 from .database import Base
+from .utils.network import normalize_mac, pack_ip
 
 
 class Role(Base):
@@ -32,10 +33,13 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     role = relationship("Role", back_populates="users")
     audit_logs = relationship("AuditLog", back_populates="user")
 
+    __mapper_args__ = {"version_id_col": version}
+
 
 class Asset(Base):
     __tablename__ = "assets"
@@ -50,11 +54,115 @@ class Asset(Base):
     owner_dept = Column(String)
     ip_address = Column(String)
     mac_address = Column(String)
+    ip_packed = Column(LargeBinary(16), index=True)
+    mac_normalized = Column(String(12), index=True)
     os_or_firmware = Column(String)
     status = Column(String, nullable=False)
     note = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    # 等值过滤列在前、排序列 (updated_at, id) 在后，过滤后的列表可沿索引有序读取，无需全表扫描和排序
+    __table_args__ = (
+        Index("ix_assets_updated_at_id", "updated_at", "id"),
+        Index("ix_assets_category_status_updated", "category", "status", "updated_at", "id"),
+        Index("ix_assets_category_updated", "category", "updated_at", "id"),
+        Index("ix_assets_status_updated", "status", "updated_at", "id"),
+        Index("ix_assets_owner_dept_updated", "owner_dept", "updated_at", "id"),
+    )
+    # ORM 更新与删除带上 WHERE version = ?，未命中即说明已被并发修改，抛出 StaleDataError
+    __mapper_args__ = {"version_id_col": version}
+
+    @validates("ip_address")
+    def _sync_ip_packed(self, key, value):
+        self.ip_packed = pack_ip(value)
+        return value
+
+    @validates("mac_address")
+    def _sync_mac_normalized(self, key, value):
+        self.mac_normalized = normalize_mac(value)
+        return value
+
+
+class AssetStat(Base):
+    """Asset counts per (category, status, owner_dept); kept current by triggers."""
+
+    __tablename__ = "asset_stats"
+
+    category = Column(String, primary_key=True)
+    status = Column(String, primary_key=True)
+    # 未填写的部门以空字符串计入，保证主键非空
+    owner_dept = Column(String, primary_key=True, default="")
+    asset_count = Column(Integer, nullable=False, default=0)
+
+
+class AssetLocationStat(Base):
+    """Asset counts per location; kept separately because locations are high-cardinality."""
+
+    __tablename__ = "asset_location_stats"
+
+    location = Column(String, primary_key=True, default="")
+    asset_count = Column(Integer, nullable=False, default=0)
+
+
+class TableVersion(Base):
+    """Per-table change counter bumped by triggers on every row write (see utils/versions.py)."""
+
+    __tablename__ = "table_versions"
+
+    table_name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class AssetChange(Base):
+    """Asset change sequence for the change feed; appended by triggers (see utils/change_feed.py)."""
+
+    __tablename__ = "asset_changes"
+    # AUTOINCREMENT 保证清理旧记录后序号也不会复用
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq = Column(Integer, primary_key=True)
+    asset_id = Column(Integer, nullable=False)
+    asset_code = Column(String)
+    action = Column(String, nullable=False)
+    changed_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class AssetHistory(Base):
+    """Asset versions with their validity interval; maintained by triggers (see utils/history.py)."""
+
+    __tablename__ = "asset_history"
+
+    history_id = Column(Integer, primary_key=True)
+    asset_id = Column(Integer, nullable=False)
+    asset_code = Column(String, nullable=False)
+    category = Column(String, nullable=False)
+    brand = Column(String)
+    model = Column(String)
+    serial_number = Column(String)
+    location = Column(String)
+    owner_dept = Column(String)
+    ip_address = Column(String)
+    mac_address = Column(String)
+    ip_packed = Column(LargeBinary(16))
+    mac_normalized = Column(String(12))
+    os_or_firmware = Column(String)
+    status = Column(String, nullable=False)
+    note = Column(Text)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    version = Column(Integer, nullable=False)
+    # [valid_from, valid_to)；当前版本的 valid_to 为空
+    valid_from = Column(DateTime, nullable=False)
+    valid_to = Column(DateTime)
+
+    # 两个索引都以资产 ID 开头：时点快照按资产 ID 顺序扫描，区间判断只读索引；单个资产的历史按写入顺序读取
+    __table_args__ = (
+        Index("ix_asset_history_as_of", "asset_id", "valid_from", "valid_to"),
+        Index("ix_asset_history_asset_id", "asset_id", "history_id"),
+    )
 
 
 class AuditLog(Base):
@@ -65,7 +173,34 @@ class AuditLog(Base):
     action = Column(String, nullable=False)
     target_table = Column(String)
     target_id = Column(Integer)
+    asset_code = Column(String)
     detail = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     user = relationship("User", back_populates="audit_logs")
+    changes = relationship("AuditChange", back_populates="audit_log", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_audit_logs_created_at_id", "created_at", "id"),
+        Index("ix_audit_logs_user_created", "user_id", "created_at", "id"),
+        Index("ix_audit_logs_target_created", "target_table", "target_id", "created_at", "id"),
+        Index("ix_audit_logs_action_created", "action", "created_at", "id"),
+        Index("ix_audit_logs_asset_code_created", "asset_code", "created_at", "id"),
+    )
+
+
+class AuditChange(Base):
+    __tablename__ = "audit_changes"
+
+    id = Column(Integer, primary_key=True)
+    audit_log_id = Column(Integer, ForeignKey("audit_logs.id", ondelete="CASCADE"), nullable=False, index=True)
+    target_table = Column(String)
+    target_id = Column(Integer)
+    field = Column(String, nullable=False)
+    old_value = Column(Text)
+    new_value = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    audit_log = relationship("AuditLog", back_populates="changes")
+
+    __table_args__ = (Index("ix_audit_changes_field_value_created", "target_table", "field", "new_value", "created_at"),)
@@ -1,69 +1,697 @@
-from typing import List, Optional
+import io
+import tempfile
+from datetime import datetime, timedelta
+from typing import Callable, Iterator, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 
 from .. import models, schemas
-from ..database import get_db
+from ..async_database import get_async_db
+from ..config import get_settings
+from ..database import SessionLocal, engine, get_db
 from ..dependencies import require_permission
-from ..utils.audit import create_audit_log
+from ..utils.asset_io import encode_csv, encode_jsonl, import_assets
+from ..utils.asset_scan import ScanTerms, asset_scan, ipv4_value
+from ..utils.audit import create_audit_log, create_audit_logs, diff_changes
+from ..utils.change_feed import (
+    ChangesExpired,
+    change_notifier,
+    changes_supported,
+    current_seq,
+    read_changes,
+    run_with_session,
+)
+from ..utils.fast_json import RowEncoder
+from ..utils.history import HISTORY_TABLE, history_fields, history_supported, to_utc, valid_at
+from ..utils.http_cache import if_match_satisfied, row_etag
+from ..utils.network import cidr_range, ip_prefix_range, mac_prefix_range, normalize_mac, pack_ip
+from ..utils.pagination import decode_cursor, encode_cursor
+from ..utils.reconcile import RECONCILE_FIELDS, SCAN_FORMATS, ReconcileConflict, parse_sources, reconcile, scope_ranges
+from ..utils.response_cache import cached_response, cached_response_async, encode_json
+from ..utils.search import build_match_expression, fts_searchable, ranked_matches, search_filter
+from ..utils.stats import DIMENSIONS as STATS_DIMENSIONS, asset_stats
 
 router = APIRouter(prefix="/api/assets", tags=["assets"])
+settings = get_settings()
+asset_encoder = RowEncoder(schemas.AssetOut, models.Asset)
+snapshot_encoder = RowEncoder(schemas.AssetOut, history_fields)
+version_encoder = RowEncoder(schemas.AssetVersionOut, history_fields)
 
+CONFLICT_DETAIL = "资产已被其他用户修改，请刷新后重试"
+# 以 (updated_at, id) 结尾的复合索引的等值前缀列；恰好按这些列过滤时 SQL 沿索引有序读取一页，比整列扫描快
+ORDERED_FILTERS = {
+    frozenset(columns[:-2])
+    for columns in ([column.name for column in index.columns] for index in models.Asset.__table__.indexes)
+    if columns[-2:] == ["updated_at", "id"]
+}
 
-@router.get("", response_model=List[schemas.AssetOut])
-def list_assets(
+
+class AssetFilterParams:
+    def __init__(
+        self,
+        asset_code: Optional[str] = None,
+        ip_address: Optional[str] = None,
+        ip_prefix: Optional[str] = None,
+        cidr: Optional[str] = None,
+        mac_address: Optional[str] = None,
+        category: Optional[str] = None,
+        status_filter: Optional[str] = None,
+        owner_dept: Optional[str] = None,
+        q: Optional[str] = None,
+    ):
+        self.asset_code = asset_code
+        self.ip_address = ip_address
+        self.ip_prefix = ip_prefix
+        self.cidr = cidr
+        self.mac_address = mac_address
+        self.category = category
+        self.status_filter = status_filter
+        self.owner_dept = owner_dept
+        self.q = q.strip() if q and q.strip() else None
+
+    def apply(self, query, search: bool = True, model=models.Asset):
+        # model 也可以是同名列的资产历史表
+        if self.asset_code:
+            query = query.filter(model.asset_code.contains(self.asset_code))
+        if self.ip_address:
+            packed = pack_ip(self.ip_address)
+            if packed is not None:
+                query = query.filter(model.ip_packed == packed)
+            else:
+                query = query.filter(model.ip_address.contains(self.ip_address))
+        if self.ip_prefix or self.cidr:
+            try:
+                low, high = ip_prefix_range(self.ip_prefix) if self.ip_prefix else cidr_range(self.cidr)
+            except ValueError:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的 IP 网段")
+            query = query.filter(model.ip_packed.between(low, high))
+        if self.mac_address:
+            try:
+                low, high = mac_prefix_range(self.mac_address)
+            except ValueError:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的 MAC 地址")
+            if len(low) == 12:
+                query = query.filter(model.mac_normalized == low)
+            else:
+                query = query.filter(model.mac_normalized >= low, model.mac_normalized < high)
+        if self.category:
+            query = query.filter(model.category == self.category)
+        if self.status_filter:
+            query = query.filter(model.status == self.status_filter)
+        if self.owner_dept:
+            query = query.filter(model.owner_dept == self.owner_dept)
+        if self.q and search:
+            query = query.filter(search_filter(query.session.get_bind(), self.q))
+        return query
+
+    def scan_terms(self) -> Optional[ScanTerms]:
+        """The filters as columnar-scan terms, or ``None`` when SQL answers them as well or better."""
+        # 编号与 MAC 的模糊匹配、全文检索不在快照中；IP 精确匹配走 ip_packed 索引只读几行
+        if self.asset_code or self.mac_address or self.q or self.ip_address:
+            return None
+        ip_range = None
+        if self.ip_prefix or self.cidr:
+            try:
+                low, high = (ipv4_value(value) for value in (ip_prefix_range(self.ip_prefix) if self.ip_prefix else cidr_range(self.cidr)))
+            except ValueError:
+                return None
+            if low is None or high is None:
+                return None
+            ip_range = (low, high)
+        equals = {"category": self.category, "status": self.status_filter, "owner_dept": self.owner_dept}
+        equals = {name: value for name, value in equals.items() if value}
+        if ip_range is None and frozenset(equals) in ORDERED_FILTERS:
+            return None
+        return ScanTerms(equals, ip_range)
+
+
+def asset_filters(
     asset_code: Optional[str] = Query(None, description="资产编号"),
-    ip_address: Optional[str] = Query(None, description="IP地址"),
+    ip_address: Optional[str] = Query(None, description="IP地址，完整地址精确匹配，否则模糊匹配"),
+    ip_prefix: Optional[str] = Query(None, description="IPv4 网段前缀，如 10.12"),
+    cidr: Optional[str] = Query(None, description="CIDR 网段，如 10.12.0.0/16"),
+    mac_address: Optional[str] = Query(None, description="MAC 地址或前缀（如 OUI）"),
     category: Optional[str] = Query(None, description="类别"),
     status_filter: Optional[str] = Query(None, alias="status", description="状态"),
+    owner_dept: Optional[str] = Query(None, description="使用部门"),
+    q: Optional[str] = Query(None, description="全文检索关键字，多个词以空格分隔"),
+) -> AssetFilterParams:
+    # 查询参数的声明放在依赖函数中，AssetFilterParams 本身可以在批量操作、脚本中直接构造
+    return AssetFilterParams(asset_code, ip_address, ip_prefix, cidr, mac_address, category, status_filter, owner_dept, q)
+
+
+def _keyset_query(db: Session, filters: AssetFilterParams, cursor: Optional[str]):
+    # 查询结果为 (Asset, 排序键)：全文检索按相关度升序，其余按更新时间倒序
+    try:
+        sort_key, last_id = decode_cursor(cursor) if cursor else (None, None)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的分页游标")
+    if filters.q and fts_searchable(db.get_bind(), filters.q):
+        matches = ranked_matches(build_match_expression(filters.q))
+        query = filters.apply(db.query(models.Asset, matches.c.rank), search=False)
+        query = query.join(matches, matches.c.asset_id == models.Asset.id)
+        if cursor:
+            query = query.filter(tuple_(matches.c.rank, models.Asset.id) > tuple_(sort_key, last_id))
+        return query.order_by(matches.c.rank, models.Asset.id)
+    query = filters.apply(db.query(models.Asset, models.Asset.updated_at))
+    if cursor:
+        query = query.filter(tuple_(models.Asset.updated_at, models.Asset.id) < tuple_(sort_key, last_id))
+    return query.order_by(models.Asset.updated_at.desc(), models.Asset.id.desc())
+
+
+def _scan_ids(db: Session, filters: AssetFilterParams, cursor: Optional[str], limit: int) -> Optional[List[int]]:
+    # 列式快照给出本页的资产 ID，None 表示本次请求仍查询 SQL
+    terms = filters.scan_terms() if asset_scan is not None else None
+    if terms is None:
+        return None
+    after = decode_cursor(cursor) if cursor else None
+    if after is not None and not isinstance(after[0], datetime):
+        return None
+    return asset_scan.select(db, terms, after, limit)
+
+
+def _stream_assets(query, encode: Callable[[List[models.Asset], bool], str]) -> Iterator[bytes]:
+    db = SessionLocal()
+    try:
+        chunk: List[models.Asset] = []
+        first = True
+        for asset, _ in query.with_session(db).execution_options(stream_results=True).yield_per(settings.stream_chunk_size):
+            chunk.append(asset)
+            if len(chunk) >= settings.stream_chunk_size:
+                yield encode(chunk, first).encode()
+                chunk, first = [], False
+        if chunk or first:
+            yield encode(chunk, first).encode()
+    finally:
+        db.close()
+
+
+@router.get("", response_model=List[schemas.AssetOut])
+def list_assets(
+    request: Request,
+    filters: AssetFilterParams = Depends(asset_filters),
+    cursor: Optional[str] = Query(None, description="分页游标，取自上一页的 X-Next-Cursor 响应头"),
+    limit: Optional[int] = Query(None, ge=1, description="每页条数"),
+    output_format: str = Query("json", alias="format", regex="^(json|ndjson)$", description="json 或 ndjson 流式输出"),
+    as_of: Optional[datetime] = Query(None, description="返回该时刻的资产清单（历史快照），按资产 ID 升序分页"),
+    db: Session = Depends(get_db),
+    current_user: schemas.Principal = Depends(require_permission("can_read_asset")),
+):
+    if as_of is not None:
+        if output_format != "json":
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="历史快照仅支持 json 格式")
+        return _snapshot_response(request, db, current_user, filters, to_utc(as_of), cursor, limit)
+    query = _keyset_query(db, filters, cursor)
+    if output_format == "ndjson":
+        return StreamingResponse(_stream_assets(query, encode_jsonl), media_type="application/x-ndjson")
+    # 未指定 limit 与 cursor 时与旧版一致返回全部匹配资产；大数据量请使用分页或 ndjson
+    paged = limit is not None or cursor is not None
+    limit = min(limit or settings.asset_page_default_limit, settings.asset_page_max_limit)
+
+    def render():
+        # 只查询输出所需的列，按元组直接编码，不构造 ORM 对象也不逐行做 pydantic 校验
+        columns = (*asset_encoder.columns, query.column_descriptions[1]["expr"])
+        if not paged:
+            return asset_encoder.dumps(query.with_entities(*columns).all()), {}, None
+        ids = _scan_ids(db, filters, cursor, limit + 1)
+        if ids is None:
+            rows = query.with_entities(*columns).limit(limit + 1).all()
+        else:
+            # 按主键取回本页的行，顺序以快照为准；其间被删除的资产直接跳过
+            found = {row.id: row for row in db.query(*columns).filter(models.Asset.id.in_(ids))} if ids else {}
+            rows = [found[asset_id] for asset_id in ids if asset_id in found]
+        return _asset_page(rows, limit)
+
+    return cached_response(request, db, current_user, models.Asset.__tablename__, render)
+
+
+def _asset_page(rows, limit: int):
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1][-1], rows[-1].id)
+    return asset_encoder.dumps(rows), headers, None
+
+
+def _scan_ids_sync(filters: AssetFilterParams, cursor: Optional[str], limit: int) -> Optional[List[int]]:
+    db = SessionLocal()
+    try:
+        return _scan_ids(db, filters, cursor, limit)
+    finally:
+        db.close()
+
+
+async def list_assets_async(
+    request: Request,
+    filters: AssetFilterParams = Depends(asset_filters),
+    cursor: Optional[str] = Query(None, description="分页游标，取自上一页的 X-Next-Cursor 响应头"),
+    limit: Optional[int] = Query(None, ge=1, description="每页条数"),
+    output_format: str = Query("json", alias="format", regex="^(json|ndjson)$", description="json 或 ndjson 流式输出"),
+    as_of: Optional[datetime] = Query(None, description="返回该时刻的资产清单（历史快照），按资产 ID 升序分页"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.Principal = Depends(require_permission("can_read_asset")),
+):
+    """``list_assets`` for ``DB_ASYNC``: the JSON list awaits ``AsyncSession.execute`` and is encoded after the query."""
+    if as_of is not None or output_format == "ndjson":
+        # 历史快照与流式导出不是热点路径，沿用同步实现
+        return await db.run_sync(
+            lambda session: list_assets(request, filters, cursor, limit, output_format, as_of, session, current_user)
+        )
+    # 语句借用底层同步 Session 构造，不产生 IO
+    query = _keyset_query(db.sync_session, filters, cursor)
+    paged = limit is not None or cursor is not None
+    limit = min(limit or settings.asset_page_default_limit, settings.asset_page_max_limit)
+    columns = (*asset_encoder.columns, query.column_descriptions[1]["expr"])
+    query = query.with_entities(*columns)
+
+    async def render():
+        if not paged:
+            return asset_encoder.dumps((await db.execute(query.statement)).all()), {}, None
+        # 列式快照的刷新与扫描是 CPU 密集的，放到线程池中执行
+        ids = await run_in_threadpool(_scan_ids_sync, filters, cursor, limit + 1) if asset_scan is not None else None
+        if ids is None:
+            rows = (await db.execute(query.limit(limit + 1).statement)).all()
+        else:
+            found = {row.id: row for row in await db.execute(select(*columns).where(models.Asset.id.in_(ids)))} if ids else {}
+            rows = [found[asset_id] for asset_id in ids if asset_id in found]
+        return _asset_page(rows, limit)
+
+    return await cached_response_async(request, db, current_user, models.Asset.__tablename__, render)
+
+
+def _require_history(as_of: Optional[datetime] = None) -> None:
+    if not history_supported(engine):
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="当前数据库不支持资产历史")
+    if as_of is not None and settings.asset_history_retention_days:
+        if as_of < datetime.utcnow() - timedelta(days=settings.asset_history_retention_days):
+            raise HTTPException(status_code=status.HTTP_410_GONE, detail="该时刻早于资产历史的保留期")
+
+
+def _snapshot_response(
+    request: Request,
+    db: Session,
+    current_user: schemas.Principal,
+    filters: AssetFilterParams,
+    as_of: datetime,
+    cursor: Optional[str],
+    limit: Optional[int],
+) -> Response:
+    _require_history(as_of)
+    if filters.q:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="历史快照不支持全文检索")
+    # 游标记录快照时刻，换了 as_of 的游标不能续用
+    try:
+        cursor_as_of, last_id = decode_cursor(cursor) if cursor else (as_of, 0)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的分页游标")
+    if cursor_as_of != as_of:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="分页游标与 as_of 不一致")
+    limit = min(limit or settings.asset_page_default_limit, settings.asset_page_max_limit)
+    history = models.AssetHistory
+
+    def render():
+        # 沿 (asset_id, valid_from, valid_to) 索引扫描，区间判断在索引上完成，每页的开销与页大小成正比
+        query = filters.apply(db.query(*snapshot_encoder.columns, history.asset_id), search=False, model=history)
+        rows = (
+            query.filter(valid_at(as_of), history.asset_id > last_id)
+            .order_by(history.asset_id)
+            .limit(limit + 1)
+            .all()
+        )
+        headers = {}
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers["X-Next-Cursor"] = encode_cursor(as_of, rows[-1][-1])
+        return snapshot_encoder.dumps(rows), headers, None
+
+    return cached_response(request, db, current_user, HISTORY_TABLE, render)
+
+
+@router.get("/stats", response_model=schemas.AssetStats)
+def asset_statistics(
+    request: Request,
+    dimension: List[str] = Query(list(STATS_DIMENSIONS), description="返回分组计数的维度"),
+    group_by: List[str] = Query([], description="两个及以上维度时返回交叉统计"),
+    category: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    owner_dept: Optional[str] = None,
+    location: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_permission("can_read_asset")),
+    current_user: schemas.Principal = Depends(require_permission("can_read_asset")),
+):
+    unsupported = (set(dimension) | set(group_by)) - set(STATS_DIMENSIONS)
+    if unsupported:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"不支持的统计维度：{', '.join(sorted(unsupported))}")
+    filters = {"category": category, "status": status_filter, "owner_dept": owner_dept, "location": location}
+
+    def render():
+        stats = asset_stats(db, dimension, group_by, {name: value for name, value in filters.items() if value is not None})
+        return orjson.dumps(stats), {}, None
+
+    return cached_response(request, db, current_user, models.Asset.__tablename__, render)
+
+
+def _require_change_feed() -> None:
+    if not changes_supported(engine):
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="当前数据库不支持变更订阅")
+
+
+async def _read_changes(since: int, limit: int) -> schemas.AssetChangePage:
+    try:
+        return await run_with_session(read_changes, since, limit)
+    except ChangesExpired:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="变更记录已过期清理，请重新全量同步")
+
+
+@router.get("/changes", response_model=schemas.AssetChangePage)
+async def asset_changes(
+    since: Optional[int] = Query(None, ge=0, description="上次响应中的 next；不传则只返回当前位置"),
+    limit: int = Query(settings.change_feed_page_size, ge=1, le=settings.change_feed_page_size),
+    wait: float = Query(0, ge=0, le=settings.change_feed_max_wait, description="没有新变更时最多等待的秒数（长轮询）"),
+    current_user: schemas.Principal = Depends(require_permission("can_read_asset")),
 ):
-    query = db.query(models.Asset)
-    if asset_code:
-        query = query.filter(models.Asset.asset_code.contains(asset_code))
-    if ip_address:
-        query = query.filter(models.Asset.ip_address.contains(ip_address))
-    if category:
-        query = query.filter(models.Asset.category == category)
-    if status_filter:
-        query = query.filter(models.Asset.status == status_filter)
-    return query.order_by(models.Asset.updated_at.desc()).all()
+    _require_change_feed()
+    if since is None:
+        return schemas.AssetChangePage(changes=[], next=await run_with_session(current_seq), has_more=False)
+    page = await _read_changes(since, limit)
+    if not page.changes and wait:
+        await change_notifier.wait(since, wait)
+        page = await _read_changes(since, limit)
+    return page
+
+
+@router.get("/changes/stream")
+async def stream_asset_changes(
+    request: Request,
+    since: Optional[int] = Query(None, ge=0, description="起始位置；不传则从当前位置开始"),
+    last_event_id: Optional[str] = Header(None, description="断线重连时由 EventSource 自动携带"),
+    current_user: schemas.Principal = Depends(require_permission("can_read_asset")),
+):
+    _require_change_feed()
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+    if since is None:
+        since = await run_with_session(current_seq)
+    # 起始位置已被清理时在建立流之前返回 410
+    first = await _read_changes(since, settings.change_feed_page_size)
+
+    async def events():
+        page, cursor = first, since
+        yield f"retry: {int(settings.change_feed_poll_interval * 1000) or 1000}\n\n"
+        while True:
+            # 每次只持有一页变更，发送受客户端读取速度制约，单连接内存有上限
+            for change in page.changes:
+                yield f"id: {change.seq}\ndata: {encode_json(change).decode()}\n\n"
+            cursor = page.next
+            if not page.has_more:
+                head = await change_notifier.wait(cursor, settings.change_feed_max_wait)
+                if await request.is_disconnected():
+                    return
+                if head is None or head <= cursor:
+                    yield ": keepalive\n\n"
+            try:
+                page = await run_with_session(read_changes, cursor, settings.change_feed_page_size)
+            except ChangesExpired:
+                yield "event: expired\ndata: {}\n\n"
+                return
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/export")
+def export_assets(
+    filters: AssetFilterParams = Depends(asset_filters),
+    output_format: str = Query("csv", alias="format", regex="^(csv|jsonl)$", description="csv 或 jsonl"),
+    db: Session = Depends(get_db),
+    current_user: schemas.Principal = Depends(require_permission("can_read_asset")),
+):
+    query = _keyset_query(db, filters, None)
+    encode, media_type = (encode_csv, "text/csv; charset=utf-8") if output_format == "csv" else (encode_jsonl, "application/x-ndjson")
+    return StreamingResponse(
+        _stream_assets(query, encode),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="assets.{output_format}"'},
+    )
+
+
+@router.post("/bulk", response_model=schemas.BulkImportResult)
+async def bulk_import_assets(
+    request: Request,
+    input_format: str = Query("csv", alias="format", regex="^(csv|jsonl)$", description="csv（首行为表头）或 jsonl"),
+    db: Session = Depends(get_db),
+    current_user: schemas.Principal = Depends(require_permission("can_create_asset")),
+):
+    # 请求体先流式落盘（超过阈值才写临时文件），再分批解析入库，内存占用与文件大小无关
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        stream = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+        try:
+            return await run_in_threadpool(
+                import_assets, db, stream, input_format, current_user.id, settings.bulk_batch_size
+            )
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="文件须为 UTF-8 编码")
+        finally:
+            stream.detach()
+
+
+def _reconcile_file(db: Session, path: str, scan_format: str, fields: List[str], scope, apply: bool, user_id: int):
+    observations = parse_sources([(scan_format, path)])
+    try:
+        report = reconcile(db, observations, fields=fields, scope=scope, apply=apply, user_id=user_id)
+    except ReconcileConflict:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=CONFLICT_DETAIL)
+    if apply:
+        db.commit()
+    return report
+
+
+@router.post("/reconcile", response_model=schemas.ReconcileReport)
+async def reconcile_scan(
+    request: Request,
+    scan_format: str = Query(..., alias="format", regex=f"^({'|'.join(SCAN_FORMATS)})$", description="nmap（-oX 输出）、arp、dhcp、mac-table 或 csv"),
+    scope: Optional[List[str]] = Query(None, description="扫描覆盖的网段（CIDR，可重复）；指定后报告其中未发现的在用资产"),
+    fields: List[str] = Query(["ip_address", "mac_address"], description="比对与更新的字段"),
+    apply: bool = Query(False, description="按对账结果批量更新发生变化的资产"),
+    db: Session = Depends(get_db),
+    current_user: schemas.Principal = Depends(require_permission("can_read_asset")),
+):
+    if apply and not current_user.can_update_asset:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="权限不足")
+    if not set(fields) <= set(RECONCILE_FIELDS):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"比对字段只能是 {', '.join(RECONCILE_FIELDS)}")
+    try:
+        ranges = scope_ranges(scope)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的 IP 网段")
+    # 扫描文件先落盘，解析进程按文件路径与字节区间并行读取
+    with tempfile.NamedTemporaryFile(suffix=f".{scan_format}") as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.flush()
+        try:
+            return await run_in_threadpool(_reconcile_file, db, spool.name, scan_format, fields, ranges, apply, current_user.id)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
+def _batch_targets(db: Session, payload: schemas.AssetBatchDelete, *columns):
+    if payload.ids is None and not (payload.filter and payload.filter.dict(exclude_none=True)):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="须指定资产 ID 列表或筛选条件")
+    query = db.query(models.Asset.id, models.Asset.asset_code, *columns)
+    if payload.ids is not None:
+        query = query.filter(models.Asset.id.in_(payload.ids))
+    if payload.filter is not None:
+        conditions = payload.filter.dict()
+        conditions["status_filter"] = conditions.pop("status")
+        query = AssetFilterParams(**conditions).apply(query)
+    rows = query.order_by(models.Asset.id).limit(settings.asset_batch_max_size + 1).all()
+    if len(rows) > settings.asset_batch_max_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"匹配的资产超过 {settings.asset_batch_max_size} 条，请缩小范围",
+        )
+    return rows
+
+
+@router.patch("/batch", response_model=schemas.AssetBatchResult)
+def batch_update_assets(
+    payload: schemas.AssetBatchUpdate,
+    db: Session = Depends(get_db),
+    current_user: schemas.Principal = Depends(require_permission("can_update_asset")),
+):
+    update_data = payload.changes.dict(exclude_unset=True)
+    if not update_data:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="未指定要修改的字段")
+    if "asset_code" in update_data:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="批量修改不支持资产编号")
+    rows = _batch_targets(db, payload, models.Asset.version, *(getattr(models.Asset, field) for field in update_data))
+    # 只更新确有变化的资产，审计记录按资产逐条记录字段变更，与单条修改一致
+    entries = []
+    for row in rows:
+        changes = {field: [row._mapping[field], value] for field, value in update_data.items() if row._mapping[field] != value}
+        if changes:
+            entries.append(
+                {
+                    "user_id": current_user.id,
+                    "action": "UPDATE",
+                    "target_table": "assets",
+                    "target_id": row.id,
+                    "asset_code": row.asset_code,
+                    "changes": changes,
+                }
+            )
+    ids = [entry["target_id"] for entry in entries]
+    if ids:
+        versions = {row.id: row.version for row in rows}
+        values = {**update_data, "updated_at": datetime.utcnow(), "version": models.Asset.version + 1}
+        if "ip_address" in update_data:
+            values["ip_packed"] = pack_ip(update_data["ip_address"])
+        if "mac_address" in update_data:
+            values["mac_normalized"] = normalize_mac(update_data["mac_address"])
+        # 以读取时的版本号为条件，期间被他人修改过的资产不会被覆盖，整批回滚后由调用方重试
+        statement = (
+            update(models.Asset)
+            .where(tuple_(models.Asset.id, models.Asset.version).in_([(row_id, versions[row_id]) for row_id in ids]))
+            .values(**values)
+        )
+        if db.execute(statement.execution_options(synchronize_session=False)).rowcount != len(ids):
+            db.rollback()
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=CONFLICT_DETAIL)
+        create_audit_logs(db, entries)
+        db.commit()
+    return schemas.AssetBatchResult(matched=len(rows), affected=len(ids), ids=ids)
+
+
+@router.post("/batch-delete", response_model=schemas.AssetBatchResult)
+def batch_delete_assets(
+    payload: schemas.AssetBatchDelete,
+    db: Session = Depends(get_db),
+    current_user: schemas.Principal = Depends(require_permission("can_delete_asset")),
+):
+    rows = _batch_targets(db, payload)
+    ids = [row.id for row in rows]
+    if ids:
+        db.execute(delete(models.Asset).where(models.Asset.id.in_(ids)).execution_options(synchronize_session=False))
+        create_audit_logs(
+            db,
+            [
+                {
+                    "user_id": current_user.id,
+                    "action": "DELETE",
+                    "target_table": "assets",
+                    "target_id": row.id,
+                    "asset_code": row.asset_code,
+                    "detail": {"asset_code": row.asset_code},
+                }
+                for row in rows
+            ],
+        )
+        db.commit()
+    return schemas.AssetBatchResult(matched=len(rows), affected=len(ids), ids=ids)
 
 
 @router.get("/{asset_id}", response_model=schemas.AssetOut)
 def get_asset(
     asset_id: int,
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_permission("can_read_asset")),
+    current_user: schemas.Principal = Depends(require_permission("can_read_asset")),
 ):
-    asset = db.get(models.Asset, asset_id)
-    if not asset:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="资产不存在")
-    return asset
+    def render():
+        asset = db.get(models.Asset, asset_id)
+        if not asset:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="资产不存在")
+        etag = row_etag(asset.id, asset.version, asset.updated_at)
+        return encode_json(schemas.AssetOut.from_orm(asset)), {"ETag": etag}, asset.updated_at
+
+    return cached_response(request, db, current_user, models.Asset.__tablename__, render)
+
+
+async def get_asset_async(
+    asset_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.Principal = Depends(require_permission("can_read_asset")),
+):
+    async def render():
+        asset = await db.get(models.Asset, asset_id)
+        if not asset:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="资产不存在")
+        etag = row_etag(asset.id, asset.version, asset.updated_at)
+        return encode_json(schemas.AssetOut.from_orm(asset)), {"ETag": etag}, asset.updated_at
+
+    return await cached_response_async(request, db, current_user, models.Asset.__tablename__, render)
+
+
+@router.get("/{asset_id}/history", response_model=List[schemas.AssetVersionOut])
+def asset_history(
+    asset_id: int,
+    request: Request,
+    cursor: Optional[str] = Query(None, description="分页游标，取自上一页的 X-Next-Cursor 响应头"),
+    limit: Optional[int] = Query(None, ge=1, description="每页条数"),
+    db: Session = Depends(get_db),
+    current_user: schemas.Principal = Depends(require_permission("can_read_asset")),
+):
+    _require_history()
+    try:
+        _, last_id = decode_cursor(cursor) if cursor else (None, None)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的分页游标")
+    limit = min(limit or settings.asset_page_default_limit, settings.asset_page_max_limit)
+    history = models.AssetHistory
+
+    def render():
+        # 新版本在前；已删除资产的历史仍可查询
+        query = db.query(*version_encoder.columns, history.valid_from, history.history_id).filter(history.asset_id == asset_id)
+        if last_id is not None:
+            query = query.filter(history.history_id < last_id)
+        rows = query.order_by(history.history_id.desc()).limit(limit + 1).all()
+        if not rows and last_id is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="资产不存在")
+        headers = {}
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers["X-Next-Cursor"] = encode_cursor(rows[-1][-2], rows[-1][-1])
+        return version_encoder.dumps(rows), headers, None
+
+    return cached_response(request, db, current_user, HISTORY_TABLE, render)
 
 
 @router.post("", response_model=schemas.AssetOut, status_code=status.HTTP_201_CREATED)
 def create_asset(
     payload: schemas.AssetCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_permission("can_create_asset")),
+    current_user: schemas.Principal = Depends(require_permission("can_create_asset")),
 ):
     if db.query(models.Asset).filter(models.Asset.asset_code == payload.asset_code).first():
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="资产编号已存在")
     asset = models.Asset(**payload.dict())
     db.add(asset)
-    db.commit()
-    db.refresh(asset)
+    db.flush()
     create_audit_log(
         db,
         user_id=current_user.id,
         action="CREATE",
         target_table="assets",
         target_id=asset.id,
+        asset_code=asset.asset_code,
         detail=payload.dict(),
     )
+    db.commit()
+    db.refresh(asset)
     return asset
 
 
@@ -71,12 +699,16 @@ def create_asset(
 def update_asset(
     asset_id: int,
     payload: schemas.AssetUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="读取时得到的 ETag，版本不一致返回 409"),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_permission("can_update_asset")),
+    current_user: schemas.Principal = Depends(require_permission("can_update_asset")),
 ):
     asset = db.get(models.Asset, asset_id)
     if not asset:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="资产不存在")
+    if not if_match_satisfied(if_match, row_etag(asset.id, asset.version, asset.updated_at)):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=CONFLICT_DETAIL)
     update_data = payload.dict(exclude_unset=True)
     if "asset_code" in update_data:
         duplicate = (
@@ -86,38 +718,56 @@ def update_asset(
         )
         if duplicate:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="资产编号已存在")
+    changes = diff_changes(asset, update_data)
     for key, value in update_data.items():
         setattr(asset, key, value)
-    db.commit()
-    db.refresh(asset)
+    try:
+        # UPDATE ... WHERE version = ? 未命中说明读取后已被并发修改；严格审计模式下写审计也会触发 flush，须在其之前
+        db.flush()
+    except StaleDataError:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=CONFLICT_DETAIL)
     create_audit_log(
         db,
         user_id=current_user.id,
         action="UPDATE",
         target_table="assets",
         target_id=asset.id,
-        detail=update_data,
+        asset_code=asset.asset_code,
+        changes=changes,
     )
+    db.commit()
+    db.refresh(asset)
+    response.headers["ETag"] = row_etag(asset.id, asset.version, asset.updated_at)
     return asset
 
 
 @router.delete("/{asset_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_asset(
     asset_id: int,
+    if_match: Optional[str] = Header(None, description="读取时得到的 ETag，版本不一致返回 409"),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_permission("can_delete_asset")),
+    current_user: schemas.Principal = Depends(require_permission("can_delete_asset")),
 ):
     asset = db.get(models.Asset, asset_id)
     if not asset:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="资产不存在")
+    if not if_match_satisfied(if_match, row_etag(asset.id, asset.version, asset.updated_at)):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=CONFLICT_DETAIL)
     db.delete(asset)
-    db.commit()
+    try:
+        db.flush()
+    except StaleDataError:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=CONFLICT_DETAIL)
     create_audit_log(
         db,
         user_id=current_user.id,
         action="DELETE",
         target_table="assets",
         target_id=asset.id,
+        asset_code=asset.asset_code,
         detail={"asset_code": asset.asset_code},
     )
+    db.commit()
     return None
@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session, selectinload
+
+from .. import models, schemas
+from ..config import get_settings
+from ..database import get_db
+from ..dependencies import require_permission
+from ..utils.pagination import decode_cursor, encode_cursor
+
+router = APIRouter(prefix="/api/audit", tags=["audit"])
+settings = get_settings()
+
+
+@router.get("", response_model=List[schemas.AuditLogOut])
+def list_audit_logs(
+    response: Response,
+    user_id: Optional[int] = Query(None, description="操作人ID"),
+    target_table: Optional[str] = Query(None, description="目标表，如 assets、users"),
+    target_id: Optional[int] = Query(None, description="目标记录ID，需同时指定 target_table"),
+    action: Optional[str] = Query(None, description="操作类型，如 CREATE、UPDATE、DELETE、LOGIN"),
+    asset_code: Optional[str] = Query(None, description="资产编号"),
+    field: Optional[str] = Query(None, description="变更字段名，如 status"),
+    new_value: Optional[str] = Query(None, description="变更后的值，需同时指定 field"),
+    start: Optional[datetime] = Query(None, description="起始时间（含）"),
+    end: Optional[datetime] = Query(None, description="结束时间（不含）"),
+    cursor: Optional[str] = Query(None, description="分页游标，取自上一页的 X-Next-Cursor 响应头"),
+    limit: Optional[int] = Query(None, ge=1, description="每页条数"),
+    db: Session = Depends(get_db),
+    current_user: schemas.Principal = Depends(require_permission("can_manage_users")),
+):
+    if target_id is not None and not target_table:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="按目标记录查询时须指定 target_table")
+    if new_value is not None and not field:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="按变更值查询时须指定 field")
+    query = db.query(models.AuditLog).options(selectinload(models.AuditLog.changes))
+    if field:
+        changed = db.query(models.AuditChange.audit_log_id).filter(models.AuditChange.field == field)
+        if target_table:
+            changed = changed.filter(models.AuditChange.target_table == target_table)
+        if new_value is not None:
+            changed = changed.filter(models.AuditChange.new_value == new_value)
+        if start:
+            changed = changed.filter(models.AuditChange.created_at >= start)
+        if end:
+            changed = changed.filter(models.AuditChange.created_at < end)
+        query = query.filter(models.AuditLog.id.in_(changed))
+    if asset_code:
+        query = query.filter(models.AuditLog.asset_code == asset_code)
+    if user_id is not None:
+        query = query.filter(models.AuditLog.user_id == user_id)
+    if target_table:
+        query = query.filter(models.AuditLog.target_table == target_table)
+    if target_id is not None:
+        query = query.filter(models.AuditLog.target_id == target_id)
+    if action:
+        query = query.filter(models.AuditLog.action == action)
+    if start:
+        query = query.filter(models.AuditLog.created_at >= start)
+    if end:
+        query = query.filter(models.AuditLog.created_at < end)
+    if cursor:
+        try:
+            created_at, last_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的分页游标")
+        query = query.filter(tuple_(models.AuditLog.created_at, models.AuditLog.id) < tuple_(created_at, last_id))
+    limit = min(limit or settings.asset_page_default_limit, settings.asset_page_max_limit)
+    logs = query.order_by(models.AuditLog.created_at.desc(), models.AuditLog.id.desc()).limit(limit + 1).all()
+    if len(logs) > limit:
+        logs = logs[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(logs[-1].created_at, logs[-1].id)
+    return logs
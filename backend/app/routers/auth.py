@@ -1,24 +1,33 @@
 from datetime import timedelta
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, joinedload
 
 from .. import models, schemas
-from ..auth import create_access_token, verify_password
+from ..auth import PasswordPoolBusy, create_access_token, run_password_task, verify_and_update_password
 from ..config import get_settings
 from ..database import get_db
 from ..dependencies import get_current_user
 from ..utils.audit import create_audit_log
+from ..utils.roles import user_out
+from ..utils.ratelimit import SlidingWindowLimiter
 
 router = APIRouter(prefix="/api", tags=["auth"])
 settings = get_settings()
 
+login_ip_limiter = SlidingWindowLimiter(settings.login_ip_limit, settings.login_ip_window_seconds)
+login_failure_limiter = SlidingWindowLimiter(settings.login_user_failure_limit, settings.login_user_failure_window_seconds)
 
-@router.post("/login", response_model=schemas.LoginResponse)
-def login(payload: schemas.LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.username == payload.username).first()
-    if not user or not verify_password(payload.password, user.password_hash) or not user.is_active:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="用户名或密码错误")
+
+def _load_user(db: Session, username: str) -> Optional[models.User]:
+    return db.query(models.User).options(joinedload(models.User.role)).filter(models.User.username == username).first()
+
+
+def _complete_login(db: Session, user: models.User, new_hash: Optional[str]) -> schemas.LoginResponse:
+    if new_hash:
+        user.password_hash = new_hash
     access_token = create_access_token(user.username, expires_delta=timedelta(minutes=settings.access_token_expire_minutes))
     create_audit_log(
         db,
@@ -28,12 +37,46 @@ def login(payload: schemas.LoginRequest, db: Session = Depends(get_db)):
         target_id=user.id,
         detail="用户登录",
     )
+    # 角色已随用户一并加载；在提交使对象过期之前构造响应，避免提交后重新查询用户和角色
+    db.flush()
+    user_info = schemas.UserOut.from_orm(user)
+    db.commit()
     return schemas.LoginResponse(
         token=schemas.Token(access_token=access_token),
-        user=user,
+        user=user_info,
     )
 
 
+@router.post("/login", response_model=schemas.LoginResponse)
+async def login(payload: schemas.LoginRequest, request: Request, db: Session = Depends(get_db)):
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = max(login_ip_limiter.retry_after(client_ip), login_failure_limiter.retry_after(payload.username))
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="登录尝试过于频繁，请稍后再试",
+            headers={"Retry-After": str(retry_after)},
+        )
+    login_ip_limiter.hit(client_ip)
+
+    user = await run_in_threadpool(_load_user, db, payload.username)
+    verified, new_hash = False, None
+    if user:
+        try:
+            verified, new_hash = await run_password_task(verify_and_update_password, payload.password, user.password_hash)
+        except PasswordPoolBusy:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="登录请求过多，请稍后重试",
+                headers={"Retry-After": "1"},
+            )
+    if not user or not verified or not user.is_active:
+        login_failure_limiter.hit(payload.username)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="用户名或密码错误")
+    login_failure_limiter.reset(payload.username)
+    return await run_in_threadpool(_complete_login, db, user, new_hash)
+
+
 @router.get("/me", response_model=schemas.UserOut)
-def read_current_user(current_user: models.User = Depends(get_current_user)):
-    return current_user
+def read_current_user(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    return user_out(db, current_user)
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends
+
+from .. import schemas
+from ..auth import password_pool_stats
+from ..bootstrap import startup_report
+from ..dependencies import principal_cache, require_permission
+from ..utils.asset_scan import asset_scan
+from ..utils.response_cache import response_cache
+
+router = APIRouter(prefix="/api/system", tags=["system"])
+
+
+@router.get("/cache")
+def cache_stats(current_user: schemas.Principal = Depends(require_permission("can_manage_users"))):
+    return {
+        "principal": principal_cache.stats(),
+        "response": response_cache.stats() if response_cache is not None else None,
+        "password_pool": password_pool_stats(),
+        "asset_scan": asset_scan.stats() if asset_scan is not None else None,
+    }
+
+
+@router.get("/startup")
+def startup_stats(current_user: schemas.Principal = Depends(require_permission("can_manage_users"))):
+    """Cold-start timings of the worker process that served this request."""
+    return startup_report
@@ -1,54 +1,68 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 
 from .. import models, schemas
-from ..auth import get_password_hash
+from ..auth import PasswordPoolBusy, get_password_hash, run_password_task
 from ..database import get_db
-from ..dependencies import require_permission
-from ..utils.audit import create_audit_log
+from ..dependencies import principal_cache, require_permission
+from ..utils.audit import create_audit_log, diff_changes
+from ..utils.fast_json import RowEncoder
+from ..utils.http_cache import if_match_satisfied, row_etag
+from ..utils.roles import role_cache, user_out
 
 router = APIRouter(prefix="/api/users", tags=["users"])
+user_encoder = RowEncoder(schemas.UserOut, models.User, nested={"role": (schemas.RoleInfo, models.Role)})
+
+CONFLICT_DETAIL = "用户已被其他管理员修改，请刷新后重试"
 
 
 @router.get("/roles", response_model=List[schemas.RoleInfo])
 def list_roles(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_permission("can_manage_users")),
+    current_user: schemas.Principal = Depends(require_permission("can_manage_users")),
 ):
-    return db.query(models.Role).order_by(models.Role.id).all()
+    return role_cache.all(db)
 
 
 @router.get("", response_model=List[schemas.UserOut])
 def list_users(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_permission("can_manage_users")),
+    current_user: schemas.Principal = Depends(require_permission("can_manage_users")),
 ):
-    return db.query(models.User).order_by(models.User.created_at.desc()).all()
+    rows = db.query(*user_encoder.columns).join(models.User.role).order_by(models.User.created_at.desc()).all()
+    return Response(user_encoder.dumps(rows), media_type="application/json")
 
 
-@router.post("", response_model=schemas.UserOut, status_code=status.HTTP_201_CREATED)
-def create_user(
-    payload: schemas.UserCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_permission("can_manage_users")),
-):
+async def _hash_password(password: str) -> str:
+    # 与登录共用 bcrypt 进程池及其排队上限，哈希计算不占用线程池和事件循环
+    try:
+        return await run_password_task(get_password_hash, password)
+    except PasswordPoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="请求过多，请稍后重试",
+            headers={"Retry-After": "1"},
+        )
+
+
+def _create_user(db: Session, payload: schemas.UserCreate, password_hash: str, current_user: schemas.Principal) -> schemas.UserOut:
     if db.query(models.User).filter(models.User.username == payload.username).first():
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="用户名已存在")
-    role = db.get(models.Role, payload.role_id)
-    if not role:
+    if not role_cache.get(db, payload.role_id):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="角色不存在")
     user = models.User(
         username=payload.username,
         display_name=payload.display_name,
         dept=payload.dept,
         role_id=payload.role_id,
-        password_hash=get_password_hash(payload.password),
+        password_hash=password_hash,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    db.flush()
     create_audit_log(
         db,
         user_id=current_user.id,
@@ -57,36 +71,73 @@ def create_user(
         target_id=user.id,
         detail={"username": payload.username, "role_id": payload.role_id},
     )
-    return user
+    # 提交前构造响应：提交会使对象过期，之后读取字段和角色都要再查库
+    result = user_out(db, user)
+    db.commit()
+    return result
 
 
-@router.put("/{user_id}", response_model=schemas.UserOut)
-def update_user(
-    user_id: int,
-    payload: schemas.UserUpdate,
+@router.post("", response_model=schemas.UserOut, status_code=status.HTTP_201_CREATED)
+async def create_user(
+    payload: schemas.UserCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_permission("can_manage_users")),
+    current_user: schemas.Principal = Depends(require_permission("can_manage_users")),
 ):
+    password_hash = await _hash_password(payload.password)
+    return await run_in_threadpool(_create_user, db, payload, password_hash, current_user)
+
+
+def _update_user(
+    db: Session,
+    user_id: int,
+    update_data: dict,
+    response: Response,
+    if_match: Optional[str],
+    current_user: schemas.Principal,
+) -> schemas.UserOut:
     user = db.get(models.User, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在")
-    update_data = payload.dict(exclude_unset=True)
+    if not if_match_satisfied(if_match, row_etag(user.id, user.version, user.updated_at)):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=CONFLICT_DETAIL)
     if "role_id" in update_data:
-        role = db.get(models.Role, update_data["role_id"])
-        if not role:
+        if not role_cache.get(db, update_data["role_id"]):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="角色不存在")
-    if "password" in update_data:
-        update_data["password_hash"] = get_password_hash(update_data.pop("password"))
+    changes = diff_changes(user, update_data, masked=("password_hash",))
     for key, value in update_data.items():
         setattr(user, key, value)
-    db.commit()
-    db.refresh(user)
+    try:
+        # UPDATE ... WHERE version = ? 在这里执行；严格审计模式下写审计也会触发 flush，须在其之前
+        db.flush()
+    except StaleDataError:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=CONFLICT_DETAIL)
     create_audit_log(
         db,
         user_id=current_user.id,
         action="UPDATE",
         target_table="users",
         target_id=user.id,
-        detail=update_data,
+        changes=changes,
     )
-    return user
+    result = user_out(db, user)
+    db.commit()
+    if update_data.keys() & {"role_id", "password_hash", "is_active"}:
+        principal_cache.invalidate(result.username)
+    response.headers["ETag"] = row_etag(result.id, result.version, result.updated_at)
+    return result
+
+
+@router.put("/{user_id}", response_model=schemas.UserOut)
+async def update_user(
+    user_id: int,
+    payload: schemas.UserUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="读取时得到的 ETag，版本不一致返回 409"),
+    db: Session = Depends(get_db),
+    current_user: schemas.Principal = Depends(require_permission("can_manage_users")),
+):
+    update_data = payload.dict(exclude_unset=True)
+    if "password" in update_data:
+        update_data["password_hash"] = await _hash_password(update_data.pop("password"))
+    return await run_in_threadpool(_update_user, db, user_id, update_data, response, if_match, current_user)
@@ -1,7 +1,8 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+import orjson
+from pydantic import BaseModel, Field, validator
 
 
 class Token(BaseModel):
@@ -14,6 +15,21 @@ class TokenPayload(BaseModel):
     exp: int
 
 
+PERMISSION_FIELDS = ("can_create_asset", "can_read_asset", "can_update_asset", "can_delete_asset", "can_manage_users")
+
+
+class Principal(BaseModel):
+    id: int
+    username: str
+    is_active: bool
+    role_id: int
+    can_create_asset: bool
+    can_read_asset: bool
+    can_update_asset: bool
+    can_delete_asset: bool
+    can_manage_users: bool
+
+
 class RoleInfo(BaseModel):
     id: int
     role_name: str
@@ -55,6 +71,7 @@ class UserOut(UserBase):
     role: RoleInfo
     created_at: datetime
     updated_at: datetime
+    version: int
 
     class Config:
         orm_mode = True
@@ -98,11 +115,163 @@ class AssetOut(AssetBase):
     id: int
     created_at: datetime
     updated_at: datetime
+    version: int
+
+    class Config:
+        orm_mode = True
+
+
+class AssetVersionOut(AssetOut):
+    valid_from: datetime
+    # 当前版本为 null；资产删除后最后一个版本在删除时结束
+    valid_to: Optional[datetime]
+
+
+class AssetFilter(BaseModel):
+    asset_code: Optional[str]
+    ip_address: Optional[str]
+    ip_prefix: Optional[str]
+    cidr: Optional[str]
+    mac_address: Optional[str]
+    category: Optional[str]
+    status: Optional[str]
+    owner_dept: Optional[str]
+    q: Optional[str]
+
+
+class AssetBatchDelete(BaseModel):
+    # ids 与 filter 同时给出时取交集，至少指定其一
+    ids: Optional[List[int]]
+    filter: Optional[AssetFilter]
+
+
+class AssetBatchUpdate(AssetBatchDelete):
+    changes: AssetUpdate
+
+
+class AssetBatchResult(BaseModel):
+    matched: int
+    affected: int
+    ids: List[int]
+
+
+class AssetChangeOut(BaseModel):
+    seq: int
+    action: str
+    asset_id: int
+    asset_code: Optional[str]
+    changed_at: datetime
+    # 资产的当前状态；已删除的资产为 null
+    asset: Optional[AssetOut]
+
+
+class AssetChangePage(BaseModel):
+    changes: List[AssetChangeOut]
+    # 下次请求的 since
+    next: int
+    has_more: bool
+
+
+class AuditChangeOut(BaseModel):
+    field: str
+    old_value: Optional[str]
+    new_value: Optional[str]
+
+    class Config:
+        orm_mode = True
+
+
+class AuditLogOut(BaseModel):
+    id: int
+    user_id: Optional[int]
+    action: str
+    target_table: Optional[str]
+    target_id: Optional[int]
+    asset_code: Optional[str]
+    detail: Optional[Any]
+    changes: List[AuditChangeOut] = []
+    created_at: datetime
+
+    @validator("detail", pre=True)
+    def _parse_detail(cls, value):
+        # 早期记录为 Python repr 字符串，无法解析时原样返回
+        if isinstance(value, str):
+            try:
+                return orjson.loads(value)
+            except orjson.JSONDecodeError:
+                return value
+        return value
 
     class Config:
         orm_mode = True
 
 
+class BulkImportError(BaseModel):
+    row: int
+    asset_code: Optional[str]
+    error: str
+
+
+class BulkImportResult(BaseModel):
+    total: int = 0
+    created: int = 0
+    failed: int = 0
+    errors: List[BulkImportError] = []
+
+
+class DiscoveredHost(BaseModel):
+    ip_address: Optional[str]
+    mac_address: Optional[str]
+    serial_number: Optional[str]
+    os_or_firmware: Optional[str]
+    hostname: Optional[str]
+    switch_port: Optional[str]
+    sources: List[str]
+
+
+class ReconcileDrift(BaseModel):
+    asset_id: int
+    asset_code: str
+    matched_by: str
+    # 字段 -> [台账中的值, 扫描到的值]
+    changes: Dict[str, List[Optional[str]]]
+
+
+class ReconcileMissing(BaseModel):
+    asset_id: int
+    asset_code: str
+    ip_address: Optional[str]
+    mac_address: Optional[str]
+
+
+class ReconcileReport(BaseModel):
+    observations: int
+    hosts: int
+    matched: int
+    unchanged: int
+    changed_total: int
+    unknown_total: int
+    missing_total: int
+    applied: int
+    # 明细最多各列出 RECONCILE_REPORT_LIMIT 条，总数见 *_total
+    changed: List[ReconcileDrift]
+    unknown: List[DiscoveredHost]
+    missing: List[ReconcileMissing]
+
+
+class StatsBucket(BaseModel):
+    value: Optional[str]
+    count: int
+
+
+class AssetStats(BaseModel):
+    total: int
+    # 每个维度的分组计数，按数量倒序
+    dimensions: Dict[str, List[StatsBucket]]
+    # group_by 指定多个维度时的交叉统计，每行包含各维度取值与 count
+    crosstab: List[Dict[str, Any]] = []
+
+
 class LoginRequest(BaseModel):
     username: str
     password: str
@@ -0,0 +1,147 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import IO, Any, Dict, Iterable, Iterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .. import models, schemas
+from .audit import create_audit_logs
+from .network import shadow_columns
+
+IMPORT_FIELDS = list(schemas.AssetCreate.__fields__)
+EXPORT_FIELDS = list(schemas.AssetOut.__fields__)
+
+
+def _read_csv(stream: IO[str]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    reader = csv.DictReader(stream)
+    for row in reader:
+        # 空单元格视为未填写，交由 Pydantic 处理必填校验
+        yield reader.line_num, {key: (value if value != "" else None) for key, value in row.items() if key}
+
+
+def _read_jsonl(stream: IO[str]) -> Iterator[Tuple[int, Any]]:
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError as exc:
+            yield line_no, exc
+
+
+def _format_errors(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors())
+
+
+def _batches(rows: Iterable[Tuple[int, Any]], size: int) -> Iterator[List[Tuple[int, Any]]]:
+    batch: List[Tuple[int, Any]] = []
+    for item in rows:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert_batch(db: Session, valid: List[Tuple[int, schemas.AssetCreate]], user_id: int) -> None:
+    now = datetime.utcnow()
+    rows = [
+        {**payload.dict(), **shadow_columns(payload.ip_address, payload.mac_address), "created_at": now, "updated_at": now}
+        for _, payload in valid
+    ]
+    db.execute(insert(models.Asset), rows)
+    codes = [payload.asset_code for _, payload in valid]
+    ids = dict(db.execute(select(models.Asset.asset_code, models.Asset.id).where(models.Asset.asset_code.in_(codes))).all())
+    create_audit_logs(
+        db,
+        [
+            {
+                "user_id": user_id,
+                "action": "CREATE",
+                "target_table": "assets",
+                "target_id": ids.get(payload.asset_code),
+                "asset_code": payload.asset_code,
+                "detail": payload.dict(),
+            }
+            for _, payload in valid
+        ],
+    )
+
+
+def import_assets(db: Session, stream: IO[str], file_format: str, user_id: int, batch_size: int) -> schemas.BulkImportResult:
+    result = schemas.BulkImportResult()
+    rows = _read_csv(stream) if file_format == "csv" else _read_jsonl(stream)
+    for batch in _batches(rows, batch_size):
+        result.total += len(batch)
+        valid: List[Tuple[int, schemas.AssetCreate]] = []
+        for row_no, raw in batch:
+            try:
+                if isinstance(raw, Exception):
+                    raise ValueError(f"JSON 解析失败：{raw}")
+                if not isinstance(raw, dict):
+                    raise ValueError("每行必须是一个 JSON 对象")
+                valid.append((row_no, schemas.AssetCreate.parse_obj(raw)))
+            except ValidationError as exc:
+                result.errors.append(schemas.BulkImportError(row=row_no, asset_code=raw.get("asset_code"), error=_format_errors(exc)))
+            except ValueError as exc:
+                result.errors.append(schemas.BulkImportError(row=row_no, error=str(exc)))
+
+        codes = [payload.asset_code for _, payload in valid]
+        existing = set(db.execute(select(models.Asset.asset_code).where(models.Asset.asset_code.in_(codes))).scalars())
+        accepted: List[Tuple[int, schemas.AssetCreate]] = []
+        for row_no, payload in valid:
+            if payload.asset_code in existing:
+                result.errors.append(schemas.BulkImportError(row=row_no, asset_code=payload.asset_code, error="资产编号已存在"))
+                continue
+            existing.add(payload.asset_code)
+            accepted.append((row_no, payload))
+        if not accepted:
+            continue
+
+        try:
+            _insert_batch(db, accepted, user_id)
+            db.commit()
+            result.created += len(accepted)
+        except IntegrityError:
+            # 与并发写入冲突时逐行重试，定位具体失败的行
+            db.rollback()
+            for row_no, payload in accepted:
+                try:
+                    _insert_batch(db, [(row_no, payload)], user_id)
+                    db.commit()
+                    result.created += 1
+                except IntegrityError:
+                    db.rollback()
+                    result.errors.append(schemas.BulkImportError(row=row_no, asset_code=payload.asset_code, error="资产编号已存在"))
+    # 各校验环节分批发现错误，按行号排序后与逐行导入时的报告顺序一致
+    result.errors.sort(key=lambda error: error.row)
+    result.failed = len(result.errors)
+    return result
+
+
+def encode_csv(assets: Iterable[models.Asset], header: bool) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    for asset in assets:
+        writer.writerow([_csv_value(getattr(asset, field)) for field in EXPORT_FIELDS])
+    return buffer.getvalue()
+
+
+def encode_jsonl(assets: Iterable[models.Asset], header: bool) -> str:
+    return "".join(schemas.AssetOut.from_orm(asset).json() + "\n" for asset in assets)
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
@@ -0,0 +1,384 @@
+import json
+import logging
+import mmap
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..config import get_settings
+from ..database import engine
+from .change_feed import CHANGES_TABLE, changes_supported
+from .versions import VERSIONS_TABLE
+
+try:
+    import numpy as np
+except ImportError:  # 可选依赖，未安装时列式扫描不可用
+    np = None
+try:
+    import fcntl
+except ImportError:  # 非 POSIX 平台无法在进程间加锁
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+MAGIC = 0x4E41435354455341  # "ASSETSCAN"
+LAYOUT = 1
+HEADER_BYTES = 4096
+# 头部为 int64 数组，各槽位的含义
+_MAGIC, _LAYOUT, _GEN, _SEQ, _VERSION, _CAPACITY, _RETIRED, _DICT_VERSION, _DICT_BYTES, _DICT_CAPACITY = range(10)
+# 以资产 ID 作为下标；按元素宽度从大到小排列，各列起点自然对齐
+COLUMNS = (("updated_at", "<i8"), ("ip", "<u4"), ("category", "<u2"), ("status", "<u2"), ("owner_dept", "<u2"), ("ip_kind", "u1"))
+DICT_COLUMNS = ("category", "status", "owner_dept")
+IP_NONE, IP_V4, IP_OTHER = 0, 4, 6
+_IPV4_MAPPED = b"\x00" * 10 + b"\xff\xff"
+
+POSITION_SQL = (
+    f"SELECT (SELECT max(seq) FROM {CHANGES_TABLE}), "
+    f"(SELECT version FROM {VERSIONS_TABLE} WHERE table_name = '{models.Asset.__tablename__}')"
+)
+_ROW_COLUMNS = "category, status, owner_dept, ip_packed, updated_at"
+
+
+def scan_supported(bind) -> bool:
+    return np is not None and fcntl is not None and changes_supported(bind)
+
+
+class ScanTerms(NamedTuple):
+    """Filters the snapshot can answer: equality on dictionary columns and an IPv4 range."""
+
+    equals: Dict[str, str]
+    ip_range: Optional[Tuple[int, int]] = None
+
+
+def ipv4_value(packed: Optional[bytes]) -> Optional[int]:
+    """The IPv4 address of a 16-byte ``ip_packed`` value as an integer, ``None`` for IPv6."""
+    if packed is None or len(packed) != 16 or packed[:12] != _IPV4_MAPPED:
+        return None
+    return int.from_bytes(packed[12:], "big")
+
+
+def _micros(values: List[Optional[str]]):
+    # 存储格式 "YYYY-MM-DD HH:MM:SS.ffffff" 由 numpy 直接解析；NULL 为 NaT，即 int64 最小值，倒序时排在最后
+    return np.array(values, dtype="datetime64[us]").astype("<i8")
+
+
+def to_micros(value) -> int:
+    return int(np.datetime64(value, "us").astype("<i8"))
+
+
+class _View(NamedTuple):
+    mm: mmap.mmap
+    header: Any
+    columns: Dict[str, Any]
+
+
+class AssetScan:
+    """Columnar copy of the asset filter columns in a memory-mapped file shared by all workers.
+
+    Category, status and department are dictionary-encoded and IPv4 addresses
+    stored as integers, one slot per asset ID, so list filters are answered with
+    vectorized scans instead of SQLite queries. Before each use the snapshot is
+    compared with the change-log head and the ``assets`` table version; one
+    worker at a time (file lock) applies the new changes in place, and readers
+    detect concurrent writes with a generation counter (odd while writing) and
+    fall back to SQL rather than wait.
+    """
+
+    def __init__(self, path: str, max_changes: int):
+        self.path = Path(path)
+        self.lock_path = Path(f"{path}.lock")
+        self.max_changes = max_changes
+        self._view: Optional[_View] = None
+        self._codes: Dict[str, Dict[str, int]] = {}
+        # 字典所属的映射与版本；换了文件后版本号会从头计数
+        self._dict_key: Optional[Tuple[mmap.mmap, int]] = None
+        self._lock = threading.Lock()
+        self.scans = 0
+        self.fallbacks = 0
+        self.rebuilds = 0
+        self.applied = 0
+
+    def stats(self) -> Dict[str, Any]:
+        view = self._view
+        return {
+            "path": str(self.path),
+            "seq": int(view.header[_SEQ]) if view is not None else None,
+            "capacity": int(view.header[_CAPACITY]) if view is not None else None,
+            "scans": self.scans,
+            "fallbacks": self.fallbacks,
+            "rebuilds": self.rebuilds,
+            "applied_changes": self.applied,
+        }
+
+    # ---- 文件映射 ----
+
+    @contextmanager
+    def _file_lock(self, blocking: bool) -> Iterator[bool]:
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+            yield True
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _map(path: Path) -> Optional[_View]:
+        try:
+            fd = os.open(path, os.O_RDWR)
+        except FileNotFoundError:
+            return None
+        try:
+            if os.fstat(fd).st_size < HEADER_BYTES:
+                return None
+            mm = mmap.mmap(fd, 0)
+        finally:
+            os.close(fd)
+        header = np.frombuffer(mm, "<i8", 16, 0)
+        if header[_MAGIC] != MAGIC or header[_LAYOUT] != LAYOUT:
+            return None
+        capacity = int(header[_CAPACITY])
+        offset = HEADER_BYTES + int(header[_DICT_CAPACITY])
+        columns = {}
+        for name, dtype in COLUMNS:
+            columns[name] = np.frombuffer(mm, dtype, capacity, offset)
+            offset += capacity * columns[name].itemsize
+        return _View(mm, header, columns)
+
+    def _load_codes(self, view: _View) -> None:
+        key = (view.mm, int(view.header[_DICT_VERSION]))
+        if self._dict_key is not None and self._dict_key[0] is key[0] and self._dict_key[1] == key[1]:
+            return
+        start = HEADER_BYTES
+        values = json.loads(bytes(view.mm[start:start + int(view.header[_DICT_BYTES])]))
+        # 编码从 1 开始，0 表示空值（分类为 0 表示该 ID 没有资产）
+        self._codes = {name: {value: code for code, value in enumerate(values[name], 1)} for name in DICT_COLUMNS}
+        self._dict_key = key
+
+    def _write_codes(self, view: _View) -> bool:
+        """Store the dictionaries in the file; ``False`` when they no longer fit."""
+        values = {name: sorted(codes, key=codes.get) for name, codes in self._codes.items()}
+        raw = json.dumps(values, ensure_ascii=False).encode()
+        if len(raw) > view.header[_DICT_CAPACITY]:
+            return False
+        view.mm[HEADER_BYTES:HEADER_BYTES + len(raw)] = raw
+        view.header[_DICT_BYTES] = len(raw)
+        view.header[_DICT_VERSION] += 1
+        self._dict_key = (view.mm, int(view.header[_DICT_VERSION]))
+        return True
+
+    def _code(self, name: str, value: Optional[str]) -> int:
+        if value is None:
+            return 0
+        codes = self._codes[name]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes) + 1
+        return code
+
+    # ---- 构建与增量刷新（持有文件锁） ----
+
+    def _build(self, conn: Connection, position: Tuple[int, int]) -> None:
+        rows = conn.exec_driver_sql(f"SELECT id, {_ROW_COLUMNS} FROM assets").all()
+        max_id = max((row[0] for row in rows), default=0)
+        # 预留空间给新增资产；超出容量或字典区写满时整体重建
+        capacity = -(-int(max_id * 1.25 + 1024) // 64) * 64
+        self._codes = {name: {} for name in DICT_COLUMNS}
+        ids = np.fromiter((row[0] for row in rows), "<i8", len(rows))
+        encoded = {name: np.fromiter((self._code(name, row[index]) for row in rows), "<u2", len(rows)) for index, name in enumerate(DICT_COLUMNS, 1)}
+        addresses = [ipv4_value(row[4]) for row in rows]
+        kinds = np.fromiter((IP_NONE if row[4] is None else IP_OTHER if ip is None else IP_V4 for row, ip in zip(rows, addresses)), "u1", len(rows))
+        ip = np.fromiter((ip or 0 for ip in addresses), "<u4", len(rows))
+        updated = _micros([row[5] for row in rows])
+
+        values = json.dumps({name: list(codes) for name, codes in self._codes.items()}, ensure_ascii=False).encode()
+        dict_capacity = -(-max(len(values) * 4, 65536) // 4096) * 4096
+        size = HEADER_BYTES + dict_capacity + capacity * sum(np.dtype(dtype).itemsize for _, dtype in COLUMNS)
+        temporary = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(temporary, "wb") as handle:
+            handle.truncate(size)
+        view = self._map_new(temporary, capacity, dict_capacity)
+        for name, column in (("updated_at", updated), ("ip", ip), ("ip_kind", kinds), *encoded.items()):
+            view.columns[name][ids] = column
+        self._write_codes(view)
+        view.header[_SEQ], view.header[_VERSION] = position
+        view.header[_MAGIC], view.header[_LAYOUT] = MAGIC, LAYOUT
+        view.mm.flush()
+
+        previous = self._map(self.path)
+        os.replace(temporary, self.path)
+        # 通知仍映射旧文件的 worker 重新打开
+        if previous is not None:
+            previous.header[_RETIRED] = 1
+        self._view = view
+        self.rebuilds += 1
+
+    @staticmethod
+    def _map_new(path: Path, capacity: int, dict_capacity: int) -> _View:
+        fd = os.open(path, os.O_RDWR)
+        try:
+            mm = mmap.mmap(fd, 0)
+        finally:
+            os.close(fd)
+        header = np.frombuffer(mm, "<i8", 16, 0)
+        header[_CAPACITY], header[_DICT_CAPACITY], header[_DICT_VERSION] = capacity, dict_capacity, 0
+        columns, offset = {}, HEADER_BYTES + dict_capacity
+        for name, dtype in COLUMNS:
+            columns[name] = np.frombuffer(mm, dtype, capacity, offset)
+            offset += capacity * columns[name].itemsize
+        columns["updated_at"][:] = np.iinfo("<i8").min
+        return _View(mm, header, columns)
+
+    def _apply(self, conn: Connection, view: _View, position: Tuple[int, int]) -> bool:
+        """Apply changes up to ``position`` in place; ``False`` when a rebuild is needed instead.
+
+        The generation counter stays odd if this fails halfway, so readers fall
+        back to SQL until the rebuild replaces the file.
+        """
+        seq = int(view.header[_SEQ])
+        head, version = position
+        oldest = conn.exec_driver_sql(f"SELECT min(seq) FROM {CHANGES_TABLE}").scalar()
+        # 序号回退（变更表被清空）、所需变更已被清理，或变更过多时重建比逐条更新更快
+        if head < seq or head - seq > self.max_changes or (oldest is not None and oldest > seq + 1):
+            return False
+        rows = conn.exec_driver_sql(
+            f"SELECT c.asset_id, {', '.join(f'a.{name}' for name in _ROW_COLUMNS.split(', '))} FROM {CHANGES_TABLE} c "
+            f"LEFT JOIN assets a ON a.id = c.asset_id WHERE c.seq > ? AND c.seq <= ? ORDER BY c.seq",
+            (seq, head),
+        ).all()
+        capacity = int(view.header[_CAPACITY])
+        if any(row[0] >= capacity for row in rows):
+            return False
+        self._load_codes(view)
+        dict_size = sum(len(codes) for codes in self._codes.values())
+        columns = view.columns
+        view.header[_GEN] += 1
+        for asset_id, category, status, owner_dept, ip_packed, updated_at in rows:
+            # 已删除的资产联表结果为空，分类编码置 0 即不再匹配任何过滤
+            columns["category"][asset_id] = self._code("category", category)
+            columns["status"][asset_id] = self._code("status", status)
+            columns["owner_dept"][asset_id] = self._code("owner_dept", owner_dept)
+            address = ipv4_value(ip_packed)
+            columns["ip"][asset_id] = address or 0
+            columns["ip_kind"][asset_id] = IP_NONE if ip_packed is None else IP_OTHER if address is None else IP_V4
+            columns["updated_at"][asset_id] = _micros([updated_at])[0]
+        if sum(len(codes) for codes in self._codes.values()) != dict_size and not self._write_codes(view):
+            return False
+        view.header[_SEQ], view.header[_VERSION] = head, version
+        view.header[_GEN] += 1
+        self.applied += len(rows)
+        return True
+
+    def _refresh(self, conn: Connection) -> None:
+        position = self._position(conn)
+        view = self._map(self.path)
+        if view is not None and not view.header[_RETIRED] and view.header[_GEN] % 2 == 0:
+            self._view = view
+            if (int(view.header[_SEQ]), int(view.header[_VERSION])) == position:
+                return
+            # 序号未变而表版本变了，说明有绕过触发器的写入，只能重建
+            if int(view.header[_SEQ]) != position[0] and self._apply(conn, view, position):
+                return
+        self._build(conn, position)
+
+    # ---- 读取 ----
+
+    @staticmethod
+    def _position(bind) -> Tuple[int, int]:
+        # 一条语句读取两个值，得到同一时刻的变更序号与表版本
+        head, version = bind.execute(text(POSITION_SQL)).first()
+        return int(head or 0), int(version or 0)
+
+    def warm(self, target: Engine) -> None:
+        """Open or build the snapshot at startup, waiting for another worker that is building it."""
+        with self._file_lock(blocking=True), target.connect() as conn:
+            self._refresh(conn)
+
+    def _current(self, db: Session) -> Optional[_View]:
+        head, version = self._position(db)
+        view = self._view
+        # 其他 worker 可能已经刷新到更新的位置，比本请求读到的位置新也可以使用
+        if view is not None and not view.header[_RETIRED] and view.header[_SEQ] >= head and view.header[_VERSION] >= version:
+            return view
+        # 另一线程或 worker 正在刷新时不等待，本次请求走 SQL
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            with self._file_lock(blocking=False) as locked:
+                if not locked:
+                    return None
+                self._refresh(db.connection())
+        finally:
+            self._lock.release()
+        return self._view
+
+    def select(self, db: Session, terms: ScanTerms, after: Optional[Tuple[Any, int]], limit: int) -> Optional[List[int]]:
+        """IDs of the first ``limit`` matches ordered by ``(updated_at, id)`` descending, after the ``after`` key.
+
+        ``None`` means the snapshot could not be used for this request and the caller should query SQL.
+        """
+        view = self._current(db)
+        if view is None:
+            self.fallbacks += 1
+            return None
+        generation = int(view.header[_GEN])
+        if generation % 2:
+            self.fallbacks += 1
+            return None
+        self._load_codes(view)
+        columns = view.columns
+        mask = None
+        for name, value in terms.equals.items():
+            code = self._codes[name].get(value)
+            if code is None:
+                self.scans += 1
+                return []
+            matched = columns[name] == code
+            mask = matched if mask is None else mask & matched
+        if mask is None:
+            mask = columns["category"] != 0
+        if terms.ip_range is not None:
+            low, high = terms.ip_range
+            mask &= (columns["ip_kind"] == IP_V4) & (columns["ip"] >= low) & (columns["ip"] <= high)
+        ids = np.flatnonzero(mask)
+        keys = columns["updated_at"][ids]
+        if after is not None:
+            key, last_id = to_micros(after[0]), after[1]
+            before = (keys < key) | ((keys == key) & (ids < last_id))
+            ids, keys = ids[before], keys[before]
+        if len(ids) > limit:
+            # 先按更新时间取前 limit 大（包含与临界值相同的全部记录），再对这一小部分精确排序
+            threshold = keys[np.argpartition(keys, len(keys) - limit)[len(keys) - limit]]
+            top = keys >= threshold
+            ids, keys = ids[top], keys[top]
+        order = np.lexsort((ids, keys))[::-1][:limit]
+        result = ids[order].tolist()
+        if int(view.header[_GEN]) != generation:
+            self.fallbacks += 1
+            return None
+        self.scans += 1
+        return result
+
+
+def load_asset_scan(target: Engine) -> Optional[AssetScan]:
+    if not settings.asset_scan_enabled:
+        return None
+    if not scan_supported(target):
+        logger.warning("资产列式扫描需要 numpy、POSIX 文件锁与 SQLite 变更序号，当前环境不满足，已关闭")
+        return None
+    Path(settings.asset_scan_path).parent.mkdir(parents=True, exist_ok=True)
+    return AssetScan(settings.asset_scan_path, settings.asset_scan_max_changes)
+
+
+asset_scan: Optional[AssetScan] = load_asset_scan(engine)
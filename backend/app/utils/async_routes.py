@@ -0,0 +1,80 @@
+import inspect
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from fastapi import APIRouter, Depends, Response
+from fastapi.routing import APIRoute
+from pydantic import parse_obj_as
+
+from ..async_database import get_async_db
+
+
+def _run_on_async_session(endpoint: Callable[..., Any], response_model: Optional[Any]) -> Callable[..., Any]:
+    signature = inspect.signature(endpoint)
+
+    def call(session, kwargs):
+        result = endpoint(db=session, **kwargs)
+        # 在 greenlet 内完成响应模型转换，避免序列化阶段触发关系属性的惰性加载
+        if response_model is not None and not isinstance(result, Response):
+            result = parse_obj_as(response_model, result)
+        return result
+
+    async def wrapper(**kwargs: Any) -> Any:
+        db = kwargs.pop("db")
+        # run_sync 在 greenlet 中执行原有的同步处理函数，数据库 IO 走异步驱动，不占用线程池
+        return await db.run_sync(call, kwargs)
+
+    parameters = [
+        parameter.replace(default=Depends(get_async_db)) if name == "db" else parameter
+        for name, parameter in signature.parameters.items()
+    ]
+    wrapper.__signature__ = signature.replace(parameters=parameters)
+    wrapper.__name__ = endpoint.__name__
+    wrapper.__doc__ = endpoint.__doc__
+    return wrapper
+
+
+def asyncify_router(
+    router: APIRouter, threaded: Iterable[str] = (), native: Optional[Dict[str, Callable[..., Any]]] = None
+) -> APIRouter:
+    """Re-register ``router``'s sync endpoints as async endpoints on an ``AsyncSession``.
+
+    Endpoints that are already ``async def``, do not take a ``db`` session, or are
+    named in ``threaded`` (CPU-bound handlers that would stall the event loop) are
+    registered unchanged, so both modes share a single handler implementation.
+    ``native`` maps route names to hand-written ``async def`` replacements that
+    await the session directly instead of running the sync handler in a greenlet.
+    """
+    threaded = set(threaded)
+    native = native or {}
+    async_router = APIRouter()
+    for route in router.routes:
+        if not isinstance(route, APIRoute):
+            async_router.routes.append(route)
+            continue
+        endpoint = route.endpoint
+        if route.name in native:
+            endpoint = native[route.name]
+        elif (
+            route.name not in threaded
+            and not inspect.iscoroutinefunction(endpoint)
+            and "db" in inspect.signature(endpoint).parameters
+        ):
+            endpoint = _run_on_async_session(endpoint, route.response_model)
+        async_router.add_api_route(
+            route.path,
+            endpoint,
+            response_model=route.response_model,
+            status_code=route.status_code,
+            tags=route.tags,
+            summary=route.summary,
+            description=route.description,
+            response_description=route.response_description,
+            responses=route.responses,
+            deprecated=route.deprecated,
+            methods=route.methods,
+            operation_id=route.operation_id,
+            include_in_schema=route.include_in_schema,
+            response_class=route.response_class,
+            name=route.name,
+        )
+    return async_router
@@ -1,8 +1,352 @@
-from typing import Any, Optional
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+import orjson
+from sqlalchemy import event, insert
 from sqlalchemy.orm import Session
 
 from .. import models
+from ..config import get_settings
+from ..database import SessionLocal
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PENDING_KEY = "pending_audit_events"
+SPOOL_SUFFIX = ".jsonl"
+CLAIM_SUFFIX = ".replay"
+
+
+def _to_json(value: Any) -> str:
+    return orjson.dumps(value, default=str).decode()
+
+
+def _value_text(value: Any) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return _to_json(value)
+
+
+def diff_changes(obj: Any, update_data: Dict[str, Any], masked: Iterable[str] = ()) -> Dict[str, List[Any]]:
+    """Field-level ``{field: [old, new]}`` for the values that actually change."""
+    changes: Dict[str, List[Any]] = {}
+    for field, new in update_data.items():
+        old = getattr(obj, field, None)
+        if old == new:
+            continue
+        changes[field] = ["***", "***"] if field in masked else [old, new]
+    return changes
+
+
+def _build_event(
+    user_id: Optional[int],
+    action: str,
+    target_table: Optional[str],
+    target_id: Optional[int],
+    detail: Optional[Any],
+    asset_code: Optional[str] = None,
+    changes: Optional[Dict[str, List[Any]]] = None,
+) -> Dict[str, Any]:
+    if detail is None and changes is not None:
+        detail = changes
+    return {
+        "user_id": user_id,
+        "action": action,
+        "target_table": target_table,
+        "target_id": target_id,
+        "asset_code": asset_code,
+        "detail": _to_json(detail) if detail is not None else None,
+        "created_at": datetime.utcnow(),
+        "changes": [
+            {"field": field, "old_value": _value_text(old), "new_value": _value_text(new)}
+            for field, (old, new) in (changes or {}).items()
+        ],
+    }
+
+
+def _write_events(session: Session, events: List[Dict[str, Any]]) -> None:
+    plain = [{key: value for key, value in item.items() if key != "changes"} for item in events if not item["changes"]]
+    if plain:
+        session.execute(insert(models.AuditLog), plain)
+    # 带字段变更的事件需要回填主键关联明细，走 ORM 写入
+    for item in events:
+        if not item["changes"]:
+            continue
+        log = models.AuditLog(**{key: value for key, value in item.items() if key != "changes"})
+        log.changes = [
+            models.AuditChange(
+                target_table=item["target_table"], target_id=item["target_id"], created_at=item["created_at"], **change
+            )
+            for change in item["changes"]
+        ]
+        session.add(log)
+    session.flush()
+
+
+class AuditWriter:
+    """Background writer that persists audit events in batched transactions."""
+
+    def __init__(
+        self,
+        max_queue_size: int,
+        batch_size: int,
+        flush_interval: float,
+        enqueue_timeout: float,
+        retries: int = 3,
+        retry_backoff: float = 0.2,
+        retry_backoff_max: float = 2.0,
+        spool_dir: Optional[str] = None,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self.spool_dir = Path(spool_dir) if spool_dir else None
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._spool_lock = threading.Lock()
+        self._spool_sequence = itertools.count()
+        self._spool_pending = True
+        # 本进程启动之前被认领、认领进程已不在的补写文件视为中途崩溃遗留
+        self._started_at = time.time()
+        # 计数器由写线程与同步落库的请求线程共同更新
+        self._counter_lock = threading.Lock()
+        self.written = 0
+        self.overflow_writes = 0
+        self.retried = 0
+        self.spooled = 0
+        self.lost = 0
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._counter_lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._spool_pending = True
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        if not self.running:
+            return
+        # 哨兵排在所有已入队事件之后，写线程处理完剩余事件后才会退出
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def enqueue(self, events: List[Dict[str, Any]]) -> None:
+        for index, item in enumerate(events):
+            if not self.running:
+                self._flush(events[index:])
+                return
+            try:
+                self._queue.put(item, timeout=self.enqueue_timeout)
+            except queue.Full:
+                # 队列持续积压时由调用方同步落库，形成背压而不是丢弃审计记录
+                self._count("overflow_writes")
+                self._flush(events[index:])
+                return
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self) -> None:
+        # 启动时先补写上次运行遗留的暂存事件
+        self._replay_spool()
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batch: List[Dict[str, Any]] = []
+            # 收到首条事件后在时间窗口内继续攒批，达到批量上限或窗口结束即落库
+            deadline = time.monotonic() + self.flush_interval
+            while item is not None:
+                batch.append(item)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            else:
+                stopping = True
+            self._flush(batch)
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        session = SessionLocal()
+        try:
+            _write_events(session, batch)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _write_with_retry(self, batch: List[Dict[str, Any]]) -> bool:
+        delay = self.retry_backoff
+        for attempt in range(self.retries + 1):
+            try:
+                self._write(batch)
+                return True
+            except Exception as exc:
+                if attempt == self.retries:
+                    logger.error("审计日志写入失败（已重试 %d 次）：%d 条，目标 %s，%s", attempt, len(batch), _targets(batch), exc)
+                    return False
+                self._count("retried")
+                logger.warning("审计日志写入失败，%.1f 秒后重试：%d 条，%s", delay, len(batch), exc)
+                time.sleep(delay)
+                delay = min(delay * 2, self.retry_backoff_max)
+        return False
+
+    def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+        if not self._write_with_retry(batch):
+            self._spool(batch)
+            return
+        self._count("written", len(batch))
+        if self._spool_pending:
+            self._replay_spool()
+
+    def _spool(self, batch: List[Dict[str, Any]]) -> None:
+        if self.spool_dir is None:
+            self._count("lost", len(batch))
+            logger.error("审计日志丢失 %d 条，目标 %s", len(batch), _targets(batch))
+            return
+        name = f"{time.time_ns()}-{os.getpid()}-{threading.get_ident()}-{next(self._spool_sequence)}"
+        path = self.spool_dir / (name + SPOOL_SUFFIX)
+        try:
+            self.spool_dir.mkdir(parents=True, exist_ok=True)
+            # 先写临时文件再改名，补写时不会读到写了一半的文件
+            temp = path.with_suffix(".tmp")
+            temp.write_bytes(b"".join(orjson.dumps(item, default=str) + b"\n" for item in batch))
+            os.replace(temp, path)
+        except OSError:
+            self._count("lost", len(batch))
+            logger.exception("审计日志暂存失败，丢失 %d 条，目标 %s", len(batch), _targets(batch))
+            return
+        self._count("spooled", len(batch))
+        self._spool_pending = True
+        logger.warning("审计日志 %d 条已暂存到 %s，数据库恢复后补写", len(batch), path)
+
+    def _spool_files(self) -> List[Tuple[Path, Path]]:
+        """``(file, pending name)`` to replay, oldest first.
+
+        Besides new spool files this picks up ``.replay`` files claimed before this
+        process started by a process that is gone, i.e. one that died mid-replay.
+        """
+        files = [(path, path) for path in self.spool_dir.glob("*" + SPOOL_SUFFIX)]
+        for path in self.spool_dir.glob("*" + CLAIM_SUFFIX):
+            base, _, owner = path.name[: -len(CLAIM_SUFFIX)].rpartition(".")
+            try:
+                # 改名会更新 ctime；容器重启后进程号可能与崩溃前相同
+                stranded = path.stat().st_ctime < self._started_at and (int(owner) == os.getpid() or not _process_alive(int(owner)))
+            except (OSError, ValueError):
+                continue
+            if stranded:
+                files.append((path, path.with_name(base + SPOOL_SUFFIX)))
+        return sorted(files, key=lambda item: item[1].name)
+
+    def _replay_spool(self) -> None:
+        if self.spool_dir is None or not self._spool_lock.acquire(blocking=False):
+            return
+        try:
+            self._spool_pending = False
+            for path, pending in self._spool_files() if self.spool_dir.is_dir() else []:
+                # 改名认领文件，多个 worker 共用暂存目录时同一文件只会被补写一次
+                claimed = pending.with_suffix(f".{os.getpid()}{CLAIM_SUFFIX}")
+                try:
+                    os.replace(path, claimed)
+                except FileNotFoundError:
+                    continue
+                batch = [_load_event(line) for line in claimed.read_bytes().splitlines() if line]
+                try:
+                    self._write(batch)
+                except Exception as exc:
+                    os.replace(claimed, pending)
+                    self._spool_pending = True
+                    logger.warning("审计日志暂存文件 %s 补写失败，稍后重试：%s", pending.name, exc)
+                    return
+                claimed.unlink()
+                self._count("written", len(batch))
+                logger.info("审计日志暂存文件 %s 已补写 %d 条", pending.name, len(batch))
+        finally:
+            self._spool_lock.release()
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _targets(batch: List[Dict[str, Any]], limit: int = 20) -> str:
+    # 日志只记录条数与目标，不输出事件内容
+    targets = sorted({f"{item['target_table']}:{item['target_id']}" for item in batch if item["target_id"] is not None})
+    if not targets:
+        return "无"
+    text = ", ".join(targets[:limit])
+    return f"{text} 等 {len(targets)} 个" if len(targets) > limit else text
+
+
+def _load_event(line: bytes) -> Dict[str, Any]:
+    item = orjson.loads(line)
+    item["created_at"] = datetime.fromisoformat(item["created_at"])
+    return item
+
+
+audit_writer = AuditWriter(
+    max_queue_size=settings.audit_queue_size,
+    batch_size=settings.audit_batch_size,
+    flush_interval=settings.audit_flush_interval,
+    enqueue_timeout=settings.audit_enqueue_timeout,
+    retries=settings.audit_flush_retries,
+    retry_backoff=settings.audit_retry_backoff,
+    retry_backoff_max=settings.audit_retry_backoff_max,
+    spool_dir=settings.audit_spool_dir,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_pending_events(session: Session) -> None:
+    events = session.info.pop(PENDING_KEY, None)
+    if events:
+        audit_writer.enqueue(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_events(session: Session) -> None:
+    session.info.pop(PENDING_KEY, None)
+
+
+def _record(db: Session, events: List[Dict[str, Any]]) -> None:
+    if settings.audit_mode == "strict":
+        _write_events(db, events)
+    elif not db.in_transaction():
+        audit_writer.enqueue(events)
+    else:
+        # 异步模式下事件随事务提交后才入队，回滚的变更不会留下审计记录
+        db.info.setdefault(PENDING_KEY, []).extend(events)
 
 
 def create_audit_log(
@@ -13,15 +357,32 @@ def create_audit_log(
     target_table: Optional[str] = None,
     target_id: Optional[int] = None,
     detail: Optional[Any] = None,
-) -> models.AuditLog:
-    log = models.AuditLog(
-        user_id=user_id,
-        action=action,
-        target_table=target_table,
-        target_id=target_id,
-        detail=str(detail) if detail is not None else None,
+    asset_code: Optional[str] = None,
+    changes: Optional[Dict[str, List[Any]]] = None,
+) -> None:
+    """Record an audit event as part of ``db``'s current transaction; the caller commits.
+
+    ``detail`` is stored as JSON and defaults to ``changes`` (see ``diff_changes``),
+    whose fields are also written to ``audit_changes`` for indexed lookups.
+    """
+    _record(db, [_build_event(user_id, action, target_table, target_id, detail, asset_code, changes)])
+
+
+def create_audit_logs(db: Session, entries: List[Dict[str, Any]]) -> None:
+    if not entries:
+        return
+    _record(
+        db,
+        [
+            _build_event(
+                entry.get("user_id"),
+                entry["action"],
+                entry.get("target_table"),
+                entry.get("target_id"),
+                entry.get("detail"),
+                entry.get("asset_code"),
+                entry.get("changes"),
+            )
+            for entry in entries
+        ],
     )
-    db.add(log)
-    db.commit()
-    db.refresh(log)
-    return log
@@ -0,0 +1,74 @@
+import gzip
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.engine import Engine
+
+from .. import models
+
+
+def _month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def _next_month(value: datetime) -> datetime:
+    return datetime(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def _archive_path(directory: Path, month: datetime) -> Path:
+    # 同一月份多次归档时追加序号，已有文件不会被覆盖
+    path = directory / f"audit-{month:%Y-%m}.jsonl.gz"
+    part = 1
+    while path.exists():
+        part += 1
+        path = directory / f"audit-{month:%Y-%m}.part{part}.jsonl.gz"
+    return path
+
+
+def archive_audit_logs(engine: Engine, before: datetime, directory: Path, batch_size: int = 5000) -> List[Tuple[str, int, Path]]:
+    """Move audit rows older than ``before`` into one gzip JSONL file per month.
+
+    Every batch is written to the archive before it is deleted, and each batch
+    commits on its own, so archiving never holds a long write lock.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    table = models.AuditLog.__table__
+    changes_table = models.AuditChange.__table__
+    columns = [column.name for column in table.columns]
+    change_columns = ["field", "old_value", "new_value"]
+    with engine.connect() as conn:
+        oldest = conn.execute(select(func.min(table.c.created_at)).where(table.c.created_at < before)).scalar()
+    results: List[Tuple[str, int, Path]] = []
+    month = _month_start(oldest) if oldest else None
+    while month is not None and month < before:
+        month_end = min(_next_month(month), before)
+        path, count, last = None, 0, None
+        while True:
+            query = select(table).where(table.c.created_at >= month, table.c.created_at < month_end)
+            if last is not None:
+                query = query.where(table.c.id > last)
+            with engine.begin() as conn:
+                rows = conn.execute(query.order_by(table.c.id).limit(batch_size)).fetchall()
+                if not rows:
+                    break
+                ids = [row.id for row in rows]
+                changes: Dict[int, List[Dict[str, Any]]] = {}
+                for change in conn.execute(select(changes_table).where(changes_table.c.audit_log_id.in_(ids))):
+                    changes.setdefault(change.audit_log_id, []).append({name: getattr(change, name) for name in change_columns})
+                path = path or _archive_path(directory, month)
+                with gzip.open(path, "at", encoding="utf-8") as archive:
+                    for row in rows:
+                        record = {name: getattr(row, name) for name in columns}
+                        record["changes"] = changes.get(row.id, [])
+                        archive.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                conn.execute(delete(changes_table).where(changes_table.c.audit_log_id.in_(ids)))
+                conn.execute(delete(table).where(table.c.id.in_(ids)))
+            count += len(rows)
+            last = rows[-1].id
+        if count:
+            results.append((f"{month:%Y-%m}", count, path))
+        month = _next_month(month)
+    return results
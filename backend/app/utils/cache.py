@@ -0,0 +1,136 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy.orm import Session
+
+from .versions import table_version
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """Thread-safe LRU cache whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: V) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key: Hashable, value: V) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+class VersionedTTLCache(TTLCache[V]):
+    """``TTLCache`` that is also emptied when any of ``tables`` changes, in this worker or another.
+
+    At most every ``revalidate_interval`` seconds ``revalidate`` compares the
+    ``table_versions`` counters (one primary-key lookup per table), like ``RoleCache``.
+    Values loaded while a change was detected are not stored; see ``generation``.
+    Where the counters are not maintained entries simply expire after ``ttl``.
+    """
+
+    def __init__(self, max_size: int, ttl: float, tables: Sequence[str], revalidate_interval: float):
+        super().__init__(max_size, ttl)
+        self.tables = tuple(tables)
+        self.revalidate_interval = revalidate_interval
+        self._versions: Optional[Tuple[int, ...]] = None
+        self._checked_at: Optional[float] = None
+        self._generation = 0
+        self._check_lock = threading.Lock()
+        self.revalidations = 0
+
+    @property
+    def generation(self) -> int:
+        """Read before loading a value and pass to ``set``, so a load that raced a change is dropped."""
+        return self._generation
+
+    def needs_revalidation(self) -> bool:
+        return self.enabled and (self._checked_at is None or time.monotonic() - self._checked_at >= self.revalidate_interval)
+
+    def revalidate(self, db: Session) -> None:
+        # 异步模式下查询在 greenlet 中让出事件循环，阻塞等锁会卡住事件循环；已有检查在进行时直接返回
+        if not self._check_lock.acquire(blocking=False):
+            return
+        try:
+            if not self.needs_revalidation():
+                return
+            current = [table_version(db, table) for table in self.tables]
+            versions = None if None in current else tuple(version for version, _ in current)
+            with self._lock:
+                if versions is not None and self._versions is not None and versions != self._versions:
+                    self.invalidations += len(self._entries)
+                    self._entries.clear()
+                    self._generation += 1
+                self._versions = versions
+            self.revalidations += 1
+            self._checked_at = time.monotonic()
+        finally:
+            self._check_lock.release()
+
+    def set(self, key: Hashable, value: V, generation: Optional[int] = None) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._store(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "revalidations": self.revalidations}
@@ -0,0 +1,157 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from .. import models, schemas
+from ..config import get_settings
+from ..database import SessionLocal
+
+settings = get_settings()
+
+CHANGES_TABLE = models.AssetChange.__tablename__
+
+
+class ChangesExpired(Exception):
+    """The requested position is older than the retained change log; the client must resync."""
+
+
+def changes_supported(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def create_change_log(conn: Connection) -> None:
+    """Create ``asset_changes`` and the triggers that append one row per asset insert/update/delete."""
+    models.AssetChange.__table__.create(conn, checkfirst=True)
+    if not changes_supported(conn):
+        return
+    # 触发器与业务写入同一事务提交；SQLite 写入串行，序号顺序即提交顺序，不会出现“后分配先可见”的空洞
+    # %f 只精确到毫秒，补足 6 位小数以符合 SQLAlchemy 读取 DateTime 的格式
+    now = "strftime('%Y-%m-%d %H:%M:%f', 'now') || '000'"
+    for suffix, operation, action, row in (
+        ("ai", "INSERT", "CREATE", "new"),
+        ("au", "UPDATE", "UPDATE", "new"),
+        ("ad", "DELETE", "DELETE", "old"),
+    ):
+        conn.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS assets_change_{suffix} AFTER {operation} ON assets BEGIN "
+            f"INSERT INTO {CHANGES_TABLE} (asset_id, asset_code, action, changed_at) "
+            f"VALUES ({row}.id, {row}.asset_code, '{action}', {now}); END"
+        )
+
+
+def current_seq(db: Session) -> int:
+    return db.execute(select(func.max(models.AssetChange.seq))).scalar() or 0
+
+
+def read_changes(db: Session, since: int, limit: int) -> schemas.AssetChangePage:
+    """Changes after ``since`` in sequence order, each with the asset's current state."""
+    oldest = db.execute(select(func.min(models.AssetChange.seq))).scalar()
+    if oldest is not None and since < oldest - 1:
+        raise ChangesExpired(since)
+    rows = (
+        db.query(models.AssetChange, models.Asset)
+        .outerjoin(models.Asset, models.Asset.id == models.AssetChange.asset_id)
+        .filter(models.AssetChange.seq > since)
+        .order_by(models.AssetChange.seq)
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(rows) > limit
+    changes = [
+        schemas.AssetChangeOut(
+            seq=change.seq,
+            action=change.action,
+            asset_id=change.asset_id,
+            asset_code=change.asset_code,
+            changed_at=change.changed_at,
+            asset=schemas.AssetOut.from_orm(asset) if asset is not None else None,
+        )
+        for change, asset in rows[:limit]
+    ]
+    return schemas.AssetChangePage(changes=changes, next=changes[-1].seq if changes else since, has_more=has_more)
+
+
+def prune_changes(bind, before: datetime) -> int:
+    """Delete changes recorded before ``before``, always keeping the newest one so the sequence head survives."""
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            return prune_changes(conn, before)
+    table = models.AssetChange.__table__
+    head = select(func.max(table.c.seq)).scalar_subquery()
+    return bind.execute(table.delete().where(table.c.changed_at < before, table.c.seq < head)).rowcount
+
+
+def _call_with_session(fn: Callable[..., Any], *args: Any) -> Any:
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+
+async def run_with_session(fn: Callable[..., Any], *args: Any) -> Any:
+    """Run ``fn(db, *args)`` with a short-lived session, off the event loop."""
+    if settings.db_async:
+        from ..async_database import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            return await db.run_sync(fn, *args)
+    return await run_in_threadpool(_call_with_session, fn, *args)
+
+
+class ChangeNotifier:
+    """Wakes waiting feed connections when the change sequence advances.
+
+    A single polling task per worker process reads the sequence head and is shared by
+    all waiters, so database load does not grow with the number of open connections;
+    it runs only while someone is waiting. Writes from other workers are seen through
+    the database within one poll interval.
+    """
+
+    def __init__(self, poll_interval: float):
+        self.poll_interval = poll_interval
+        self.head: Optional[int] = None
+        self.polls = 0
+        self._waiters = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._condition: Optional[asyncio.Condition] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def wait(self, since: int, timeout: float) -> Optional[int]:
+        """Wait until the head passes ``since`` or ``timeout`` elapses; returns the last head seen."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._condition, self._task = loop, asyncio.Condition(), None
+        if self.head is not None and self.head > since:
+            return self.head
+        self._waiters += 1
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._watch())
+        try:
+            async with self._condition:
+                await asyncio.wait_for(
+                    self._condition.wait_for(lambda: self.head is not None and self.head > since), timeout
+                )
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._waiters -= 1
+        return self.head
+
+    async def _watch(self) -> None:
+        while self._waiters:
+            head = await run_with_session(current_seq)
+            self.polls += 1
+            if head != self.head:
+                self.head = head
+                async with self._condition:
+                    self._condition.notify_all()
+            await asyncio.sleep(self.poll_interval)
+
+
+change_notifier = ChangeNotifier(settings.change_feed_poll_interval)
@@ -0,0 +1,45 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Type, Union
+
+import orjson
+from pydantic import BaseModel
+
+Layout = List[Tuple[str, Union[int, "Layout"]]]
+
+
+def _layout(schema: Type[BaseModel], model: Any, nested: Dict[str, Tuple[Type[BaseModel], Any]], columns: List[Any]) -> Layout:
+    layout: Layout = []
+    for name in schema.__fields__:
+        if name in nested:
+            layout.append((name, _layout(*nested[name], {}, columns)))
+        else:
+            layout.append((name, len(columns)))
+            columns.append(getattr(model, name))
+    return layout
+
+
+def _build(layout: Layout, row: Sequence[Any]) -> Dict[str, Any]:
+    return {name: _build(spec, row) if isinstance(spec, list) else row[spec] for name, spec in layout}
+
+
+class RowEncoder:
+    """Encode plain column tuples as ``schema`` JSON without ORM objects or per-row pydantic validation.
+
+    ``columns`` lists the mapped columns to select, in the schema's field order;
+    ``nested`` maps relationship fields to ``(schema, model)`` whose columns are
+    appended, so the caller joins those tables. Output is byte-identical to
+    FastAPI's ``JSONResponse`` for the same ``response_model`` as long as the
+    database already stores values of the declared types.
+    """
+
+    def __init__(self, schema: Type[BaseModel], model: Any, nested: Optional[Dict[str, Tuple[Type[BaseModel], Any]]] = None):
+        self.columns: List[Any] = []
+        self._layout = _layout(schema, model, nested or {}, self.columns)
+        self._fields = None if nested else [name for name, _ in self._layout]
+
+    def dumps(self, rows: Iterable[Sequence[Any]]) -> bytes:
+        # 行中超出 columns 的尾部列（如分页排序键）不会输出
+        if self._fields is not None:
+            fields = self._fields
+            return orjson.dumps([dict(zip(fields, row)) for row in rows])
+        layout = self._layout
+        return orjson.dumps([_build(layout, row) for row in rows])
@@ -0,0 +1,110 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import and_, bindparam, func, or_, select
+from sqlalchemy.engine import Connection, Engine
+
+from .. import models
+from .versions import track_table
+
+HISTORY_TABLE = models.AssetHistory.__tablename__
+# 与资产表同名、随每个版本保存的列
+SNAPSHOT_COLUMNS = [
+    column.name
+    for column in models.AssetHistory.__table__.columns
+    if column.name not in ("history_id", "asset_id", "valid_from", "valid_to")
+]
+# 供 RowEncoder 按字段名取列：id 对应资产 ID，其余字段与历史表同名
+history_fields = SimpleNamespace(
+    **{name: getattr(models.AssetHistory, name) for name in models.AssetHistory.__table__.columns.keys()},
+    id=models.AssetHistory.asset_id,
+)
+# 同一语句内 'now' 取值不变，旧版本的结束时间与新版本的开始时间相同，区间首尾相接
+_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now') || '000'"
+
+
+def history_supported(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def create_asset_history(conn: Connection) -> None:
+    """Create ``asset_history``, the triggers that version every asset write, and one open version per existing asset."""
+    models.AssetHistory.__table__.create(conn, checkfirst=True)
+    if not history_supported(conn):
+        return
+    # 历史查询的响应缓存按本表版本校验，合并与清理后也会失效
+    track_table(conn, HISTORY_TABLE)
+    now = _NOW
+    columns = ", ".join(SNAPSHOT_COLUMNS)
+    new_values = ", ".join(f"new.{name}" for name in SNAPSHOT_COLUMNS)
+    insert = f"INSERT INTO {HISTORY_TABLE} (asset_id, {columns}, valid_from) VALUES (new.id, {new_values}, {now});"
+    close = f"UPDATE {HISTORY_TABLE} SET valid_to = {now} WHERE asset_id = old.id AND valid_to IS NULL;"
+    for suffix, operation, body in (
+        ("ai", "INSERT", insert),
+        ("au", "UPDATE", close + " " + insert),
+        ("ad", "DELETE", close),
+    ):
+        conn.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS assets_history_{suffix} AFTER {operation} ON assets BEGIN {body} END")
+    backfill_history(conn)
+
+
+def backfill_history(conn: Connection) -> None:
+    """Open a version for every asset that has none, e.g. after loading rows with the triggers dropped."""
+    # 启用前的修改无从还原：现有资产以当前内容作为自创建起生效的版本
+    columns = ", ".join(SNAPSHOT_COLUMNS)
+    conn.exec_driver_sql(
+        f"INSERT INTO {HISTORY_TABLE} (asset_id, {columns}, valid_from) "
+        f"SELECT id, {columns}, COALESCE(created_at, {_NOW}) FROM assets "
+        f"WHERE NOT EXISTS (SELECT 1 FROM {HISTORY_TABLE} WHERE asset_id = assets.id)"
+    )
+
+
+def to_utc(value: datetime) -> datetime:
+    """Naive UTC, as stored; ``as_of`` values with an offset are converted first."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def valid_at(as_of: datetime):
+    history = models.AssetHistory
+    return and_(history.valid_from <= as_of, or_(history.valid_to.is_(None), history.valid_to > as_of))
+
+
+def prune_history(bind, before: datetime) -> int:
+    """Delete versions that ended before ``before``; current versions are always kept."""
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            return prune_history(conn, before)
+    table = models.AssetHistory.__table__
+    return bind.execute(table.delete().where(table.c.valid_to < before)).rowcount
+
+
+def compact_history(bind, before: datetime) -> int:
+    """Merge each asset's versions that ended before ``before`` into one version per day.
+
+    The last version of the day is kept and extended back to the first one's start,
+    so point-in-time reads in the compacted range return the end-of-day state.
+    Returns the number of versions removed.
+    """
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            return compact_history(conn, before)
+    table = models.AssetHistory.__table__
+    closed = table.c.valid_to < before
+    day = func.date(table.c.valid_from)
+    groups = bind.execute(
+        select(func.max(table.c.history_id).label("keep"), func.min(table.c.valid_from).label("start"))
+        .where(closed)
+        .group_by(table.c.asset_id, day)
+        .having(func.count() > 1)
+    ).all()
+    if not groups:
+        return 0
+    # 保留版本的开始时间仍在同一天，先改开始时间不影响下面按天分组
+    bind.execute(
+        table.update().where(table.c.history_id == bindparam("keep")).values(valid_from=bindparam("start")),
+        [{"keep": keep, "start": start} for keep, start in groups],
+    )
+    kept = select(func.max(table.c.history_id)).where(closed).group_by(table.c.asset_id, day)
+    return bind.execute(table.delete().where(closed, table.c.history_id.notin_(kept))).rowcount
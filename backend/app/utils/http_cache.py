@@ -0,0 +1,33 @@
+import hashlib
+from datetime import datetime
+from typing import Optional
+
+
+def make_etag(body: bytes) -> str:
+    return '"{}"'.format(hashlib.sha1(body).hexdigest())
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison per RFC 9110, as required for ``If-None-Match``."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+
+
+def row_etag(row_id: int, version: int, updated_at: Optional[datetime]) -> str:
+    """Strong validator for one row: ``"<id>-<version>-<updated_at>"``.
+
+    SQLite reuses the primary key of a deleted row and the new row starts again at
+    version 1, so the id and write time are part of the tag as well.
+    """
+    stamp = updated_at.strftime("%Y%m%d%H%M%S%f") if updated_at else "0"
+    return f'"{row_id}-{version}-{stamp}"'
+
+
+def if_match_satisfied(if_match: Optional[str], etag: str) -> bool:
+    """Strong comparison per RFC 9110, as required for ``If-Match``; no header always matches."""
+    if not if_match or if_match.strip() == "*":
+        return True
+    return etag in {candidate.strip() for candidate in if_match.split(",")}
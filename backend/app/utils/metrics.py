@@ -0,0 +1,295 @@
+import logging
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+
+from ..config import get_settings
+from .profiler import SamplingProfiler
+
+settings = get_settings()
+slow_query_logger = logging.getLogger("app.sql.slow")
+logger = logging.getLogger(__name__)
+
+# 秒；覆盖从缓存命中的亚毫秒响应到导出、对账等长请求
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return super().render() + [f"{self.name}{_labels(self.label_names, labels)} {value:g}" for labels, value in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: Tuple[str, ...] = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+        # 每组标签：[各桶计数（非累积，最后一格为 +Inf）, 总和, 次数]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((labels, (list(counts), total, count)) for labels, (counts, total, count) in self._values.items())
+        lines = super().render()
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {total:g}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: List[_Metric] = []
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self.metrics for line in metric.render()) + "\n"
+
+
+registry = Registry()
+http_requests = registry.add(Counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status")))
+http_latency = registry.add(Histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route")))
+http_in_flight = registry.add(Gauge("http_requests_in_flight", "HTTP requests being processed", ("method", "route")))
+request_statements = registry.add(
+    Histogram("http_request_db_statements", "SQL statements per HTTP request", ("method", "route"), STATEMENT_BUCKETS)
+)
+request_db_time = registry.add(Histogram("http_request_db_seconds", "Database time per HTTP request", ("method", "route")))
+db_statements = registry.add(Counter("db_statements_total", "SQL statements executed, including background work"))
+db_time = registry.add(Counter("db_statement_seconds_total", "Time spent executing SQL statements"))
+db_slow = registry.add(Counter("db_slow_statements_total", "SQL statements slower than SLOW_QUERY_MS"))
+
+
+class RequestStats:
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+# 线程池中执行的同步接口会复制上下文，共享同一个 RequestStats 对象
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def _format_parameters(parameters) -> str:
+    text = repr(parameters)
+    return text if len(text) <= 500 else text[:500] + "..."
+
+
+def instrument_engine(target: Engine) -> None:
+    """Count statements and database time per request and log slow statements, via cursor events.
+
+    Nothing is registered when both metrics and the slow-query log are off.
+    """
+    collect = settings.metrics_enabled
+    slow_threshold = settings.slow_query_ms / 1000 if settings.slow_query_ms > 0 else None
+    if not collect and slow_threshold is None:
+        return
+
+    @event.listens_for(target, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._started_at = time.perf_counter()
+
+    @event.listens_for(target, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._started_at
+        if collect:
+            db_statements.inc()
+            db_time.inc(amount=elapsed)
+            stats = current_request.get()
+            if stats is not None:
+                stats.statements += 1
+                stats.db_seconds += elapsed
+        if slow_threshold is not None and elapsed >= slow_threshold:
+            db_slow.inc()
+            slow_query_logger.warning(
+                "慢查询 %.1fms：%s%s",
+                elapsed * 1000,
+                " ".join(statement.split()),
+                f" 参数：{_format_parameters(parameters)}" if settings.slow_query_log_params else "",
+            )
+
+
+# 同一时间只允许一个请求采样，避免互相干扰
+_profile_lock = threading.Lock()
+
+
+def _profiler(scope) -> Optional[SamplingProfiler]:
+    if not settings.profile_token:
+        return None
+    for name, value in scope["headers"]:
+        if name == b"x-profile":
+            if value.decode("latin-1") == settings.profile_token and _profile_lock.acquire(blocking=False):
+                return SamplingProfiler(settings.profile_interval_ms / 1000)
+            return None
+    return None
+
+
+class InstrumentedRoute:
+    """Wraps one route's ASGI app: request metrics under its path template and the ``X-Profile`` hook.
+
+    Wrapping after routing gives the template label without matching the path
+    a second time; requests no route matched share the ``unmatched`` label.
+    """
+
+    def __init__(self, app, route: str):
+        self.app = app
+        self.route = route
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profiler = _profiler(scope)
+        if not settings.metrics_enabled and profiler is None:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self.route
+        labels = (method, route)
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status_code = 500
+        profile_file = None
+        if profiler is not None:
+            slug = re.sub(r"[^0-9A-Za-z]+", "_", route).strip("_") or "root"
+            profile_file = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{os.getpid()}-{method}-{slug}.folded"
+            profiler.start()
+        if settings.metrics_enabled:
+            http_in_flight.inc(labels)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                elapsed = (time.perf_counter() - started) * 1000
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} queries", app;dur={elapsed:.2f}',
+                )
+                if profile_file is not None:
+                    headers.append("X-Profile-File", profile_file)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        except HTTPException as exc:
+            # 未匹配路由时 404 以异常形式抛出，由外层异常中间件生成响应
+            status_code = exc.status_code
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request.reset(token)
+            if settings.metrics_enabled:
+                http_in_flight.dec(labels)
+                http_requests.inc((method, route, str(status_code)))
+                http_latency.observe(labels, elapsed)
+                request_statements.observe(labels, stats.statements)
+                request_db_time.observe(labels, stats.db_seconds)
+            if profiler is not None:
+                try:
+                    _save_profile(profiler, profile_file, method, route, elapsed)
+                finally:
+                    _profile_lock.release()
+
+
+def _save_profile(profiler: SamplingProfiler, name: str, method: str, route: str, elapsed: float) -> None:
+    folded = profiler.stop()
+    directory = Path(settings.profile_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / name).write_text(folded, encoding="utf-8")
+    logger.info("%s %s 耗时 %.1fms，采样 %d 次，火焰图数据：%s", method, route, elapsed * 1000, profiler.samples, directory / name)
+
+
+def instrument_routes(app) -> None:
+    """Wrap every route registered so far, plus the router's not-found handler; call after all routes are added."""
+    for route in app.router.routes:
+        if hasattr(route, "app") and not isinstance(route.app, InstrumentedRoute):
+            route.app = InstrumentedRoute(route.app, route.path)
+    if not isinstance(app.router.default, InstrumentedRoute):
+        app.router.default = InstrumentedRoute(app.router.default, "unmatched")
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    if settings.metrics_token and request.headers.get("authorization") != f"Bearer {settings.metrics_token}":
+        return PlainTextResponse("Unauthorized", status_code=401)
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,23 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple, Union
+
+SortKey = Union[datetime, float]
+
+
+def encode_cursor(sort_key: SortKey, row_id: int) -> str:
+    value = sort_key.isoformat() if isinstance(sort_key, datetime) else sort_key
+    raw = json.dumps([value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[SortKey, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_key, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if isinstance(sort_key, str):
+            return datetime.fromisoformat(sort_key), int(row_id)
+        return float(sort_key), int(row_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("invalid cursor") from exc
@@ -0,0 +1,62 @@
+import os
+import sys
+import threading
+from collections import Counter
+from typing import Optional
+
+# 栈顶为这些函数的线程处于空闲等待（事件循环 select、线程池取任务等），不计入采样
+_IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+}
+_MAX_DEPTH = 128
+
+
+def _is_idle(frame) -> bool:
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in _IDLE_FRAMES
+
+
+def _folded(frame) -> str:
+    names = []
+    while frame is not None and len(names) < _MAX_DEPTH:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """Sample the stacks of all busy threads from a background thread.
+
+    The result is in Brendan Gregg's folded format (``frame;frame;frame count``),
+    ready for flamegraph.pl or speedscope. Threads serving other requests at the
+    same time are sampled too, so profile on an otherwise idle instance.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = max(interval, 0.0005)
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own or _is_idle(frame):
+                    continue
+                self._stacks[_folded(frame)] += 1
+            self.samples += 1
+
+    def stop(self) -> str:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
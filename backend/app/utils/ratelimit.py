@@ -0,0 +1,45 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Hashable
+
+
+class SlidingWindowLimiter:
+    """In-process sliding-window counter; tracks at most ``max_keys`` keys (LRU)."""
+
+    def __init__(self, limit: int, window_seconds: float, max_keys: int = 100000):
+        self.limit = limit
+        self.window = window_seconds
+        self.max_keys = max_keys
+        self._hits: "OrderedDict[Hashable, Deque[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _prune(self, key: Hashable, now: float) -> Deque[float]:
+        hits = self._hits.get(key)
+        if hits is None:
+            hits = self._hits[key] = deque()
+            while len(self._hits) > self.max_keys:
+                self._hits.popitem(last=False)
+        self._hits.move_to_end(key)
+        while hits and hits[0] <= now - self.window:
+            hits.popleft()
+        return hits
+
+    def retry_after(self, key: Hashable) -> int:
+        """Seconds until ``key`` may try again; 0 when it is under the limit."""
+        if self.limit <= 0:
+            return 0
+        with self._lock:
+            now = time.monotonic()
+            hits = self._prune(key, now)
+            if len(hits) < self.limit:
+                return 0
+            return max(1, int(hits[0] + self.window - now) + 1)
+
+    def hit(self, key: Hashable) -> None:
+        with self._lock:
+            self._prune(key, time.monotonic()).append(time.monotonic())
+
+    def reset(self, key: Hashable) -> None:
+        with self._lock:
+            self._hits.pop(key, None)
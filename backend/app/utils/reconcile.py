@@ -0,0 +1,469 @@
+import csv
+import io
+import re
+import threading
+import xml.etree.ElementTree as ElementTree
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from .. import models, schemas
+from ..config import get_settings
+from .audit import create_audit_logs
+from .network import cidr_range, normalize_mac, pack_ip
+
+settings = get_settings()
+
+# 逐行解析的格式可按字节切块并行解析；其余格式以文件为单位解析
+LINE_FORMATS = {"arp", "mac-table"}
+SCAN_FORMATS = ("nmap", "arp", "dhcp", "mac-table", "csv")
+RECONCILE_FIELDS = ("ip_address", "mac_address", "os_or_firmware")
+# 只采用可信度不低于该值的 nmap 操作系统识别结果
+NMAP_OS_MIN_ACCURACY = 90
+
+_IPV4 = re.compile(r"(?<![\d.])(\d{1,3}(?:\.\d{1,3}){3})(?![\d.])")
+# aa:bb:cc:dd:ee:ff、aa-bb-cc-dd-ee-ff、aabb.ccdd.eeff（Cisco）、aabb-ccdd-eeff（华为/H3C）
+_MAC = re.compile(
+    r"(?<![0-9a-f])([0-9a-f]{2}(?:[:-][0-9a-f]{2}){5}|[0-9a-f]{4}([.-])[0-9a-f]{4}\2[0-9a-f]{4})(?![0-9a-f])",
+    re.IGNORECASE,
+)
+# 交换机端口名，如 Gi1/0/1、GE0/0/1、Eth1/1、ge-0/0/1、Po1
+_PORT = re.compile(r"(?<!\S)([A-Za-z][A-Za-z\-]*\d+(?:/\d+)+|Po\d+|Eth-Trunk\d+)(?!\S)")
+_IGNORED_MACS = {"ffffffffffff", "000000000000"}
+
+
+class ReconcileConflict(Exception):
+    """An asset changed between reading the inventory and applying the scan results."""
+
+
+class Observation(NamedTuple):
+    ip: Optional[str]
+    mac: Optional[str]
+    serial: Optional[str]
+    os: Optional[str]
+    hostname: Optional[str]
+    port: Optional[str]
+    source: str
+
+
+def _usable_mac(value: Optional[str]) -> Optional[str]:
+    mac = normalize_mac(value)
+    # 组播与广播地址（首字节最低位为 1）不对应具体设备
+    if mac is None or mac in _IGNORED_MACS or int(mac[1], 16) & 1:
+        return None
+    return mac
+
+
+def _usable_ip(value: Optional[str]) -> Optional[str]:
+    return value.strip() if value and pack_ip(value) is not None else None
+
+
+def _parse_line(kind: str, line: str) -> Optional[Observation]:
+    mac_match = _MAC.search(line)
+    mac = _usable_mac(mac_match.group(1)) if mac_match else None
+    if mac is None:
+        return None
+    if kind == "mac-table":
+        port = _PORT.search(line)
+        return Observation(None, mac, None, None, None, port.group(1) if port else None, kind)
+    ip_match = _IPV4.search(line)
+    ip = _usable_ip(ip_match.group(1)) if ip_match else None
+    if ip is None:
+        return None
+    return Observation(ip, mac, None, None, None, None, kind)
+
+
+def _parse_lines(kind: str, lines: Iterable[str]) -> List[Observation]:
+    observations = []
+    for line in lines:
+        observation = _parse_line(kind, line)
+        if observation is not None:
+            observations.append(observation)
+    return observations
+
+
+def _parse_chunk(kind: str, path: str, start: int, end: int) -> List[Observation]:
+    with open(path, "rb") as stream:
+        stream.seek(start)
+        data = stream.read(end - start)
+    return _parse_lines(kind, data.decode("utf-8", errors="replace").splitlines())
+
+
+def _parse_nmap(path: str) -> List[Observation]:
+    observations = []
+    try:
+        # 按 host 元素流式解析并及时释放，内存与文件大小无关
+        for _, element in ElementTree.iterparse(path, events=("end",)):
+            if element.tag != "host":
+                continue
+            status = element.find("status")
+            if status is None or status.get("state") == "up":
+                addresses = {item.get("addrtype"): item.get("addr") for item in element.iter("address")}
+                hostname = element.find("hostnames/hostname")
+                os_name = None
+                osmatch = element.find("os/osmatch")
+                if osmatch is not None and int(osmatch.get("accuracy", "0")) >= NMAP_OS_MIN_ACCURACY:
+                    os_name = osmatch.get("name")
+                ip = _usable_ip(addresses.get("ipv4") or addresses.get("ipv6"))
+                mac = _usable_mac(addresses.get("mac"))
+                if ip or mac:
+                    observations.append(
+                        Observation(ip, mac, None, os_name, hostname.get("name") if hostname is not None else None, None, "nmap")
+                    )
+            element.clear()
+    except ElementTree.ParseError as exc:
+        raise ValueError(f"nmap XML 解析失败：{exc}") from exc
+    return observations
+
+
+def _parse_dhcp(path: str) -> List[Observation]:
+    # ISC dhcpd.leases 按租约块解析，同一 IP 以文件中最后一个有效租约为准；其他每行一条的格式（dnsmasq、Windows 导出）逐行解析
+    leases: Dict[str, Observation] = {}
+    observations = []
+    lease: Optional[Dict[str, Optional[str]]] = None
+    with open(path, encoding="utf-8", errors="replace") as stream:
+        for raw in stream:
+            line = raw.strip()
+            if lease is not None:
+                if line.startswith("hardware ethernet"):
+                    lease["mac"] = line.split()[2].rstrip(";")
+                elif line.startswith("client-hostname"):
+                    lease["hostname"] = line.split(None, 1)[1].rstrip(";").strip('"')
+                elif line.startswith("binding state"):
+                    lease["state"] = line.split()[2].rstrip(";")
+                elif line == "}":
+                    ip, mac = _usable_ip(lease["ip"]), _usable_mac(lease.get("mac"))
+                    if lease.get("state", "active") == "active" and ip and mac:
+                        leases[ip] = Observation(ip, mac, None, None, lease.get("hostname"), None, "dhcp")
+                    else:
+                        leases.pop(lease["ip"] or "", None)
+                    lease = None
+                continue
+            if line.startswith("lease ") and line.endswith("{"):
+                lease = {"ip": line.split()[1]}
+                continue
+            observation = _parse_line("dhcp", line)
+            if observation is not None:
+                observations.append(observation)
+    return observations + list(leases.values())
+
+
+def _parse_csv(path: str) -> List[Observation]:
+    # 表头与资产字段同名：ip_address、mac_address、serial_number、os_or_firmware，另可有 hostname
+    observations = []
+    with open(path, encoding="utf-8-sig", errors="replace", newline="") as stream:
+        for row in csv.DictReader(stream):
+            ip = _usable_ip(row.get("ip_address"))
+            mac = _usable_mac(row.get("mac_address"))
+            serial = (row.get("serial_number") or "").strip() or None
+            if ip or mac or serial:
+                observations.append(
+                    Observation(ip, mac, serial, (row.get("os_or_firmware") or "").strip() or None, row.get("hostname") or None, None, "csv")
+                )
+    return observations
+
+
+_FILE_PARSERS = {"nmap": _parse_nmap, "dhcp": _parse_dhcp, "csv": _parse_csv}
+
+
+def _parse_file(kind: str, path: str) -> List[Observation]:
+    return _FILE_PARSERS[kind](path)
+
+
+def _line_ranges(path: str, chunk_bytes: int) -> List[Tuple[int, int]]:
+    # 切分点对齐到行首，每块独立解析
+    ranges = []
+    with open(path, "rb") as stream:
+        size = stream.seek(0, io.SEEK_END)
+        start = 0
+        while start < size:
+            stream.seek(min(start + chunk_bytes, size))
+            stream.readline()
+            end = min(stream.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if settings.reconcile_workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=settings.reconcile_workers)
+        return _pool
+
+
+def shutdown_reconcile_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def parse_sources(sources: Sequence[Tuple[str, str]], chunk_bytes: Optional[int] = None) -> List[Observation]:
+    """Parse ``(format, path)`` scan files, in the parse process pool when there is more than one task.
+
+    Line-based formats are split into chunks of ``chunk_bytes`` at line boundaries;
+    nmap XML, DHCP lease files and CSV are parsed one task per file.
+    """
+    chunk_bytes = chunk_bytes or settings.reconcile_chunk_bytes
+    tasks: List[tuple] = []
+    for kind, path in sources:
+        if kind not in SCAN_FORMATS:
+            raise ValueError(f"不支持的扫描格式：{kind}")
+        if kind in LINE_FORMATS:
+            tasks.extend((_parse_chunk, kind, path, start, end) for start, end in _line_ranges(path, chunk_bytes))
+        else:
+            tasks.append((_parse_file, kind, path))
+    pool = _get_pool() if len(tasks) > 1 else None
+    if pool is None:
+        results = [fn(*args) for fn, *args in tasks]
+    else:
+        futures = [pool.submit(fn, *args) for fn, *args in tasks]
+        results = [future.result() for future in futures]
+    return [observation for result in results for observation in result]
+
+
+class _Host:
+    __slots__ = ("ip", "mac", "serial", "os", "hostname", "port", "sources")
+
+    def __init__(self) -> None:
+        self.ip = self.mac = self.serial = self.os = self.hostname = self.port = None
+        self.sources: Set[str] = set()
+
+    def merge(self, observation: Observation) -> None:
+        for name in ("ip", "mac", "serial", "os", "hostname", "port"):
+            value = getattr(observation, name)
+            if value is not None:
+                setattr(self, name, value)
+        self.sources.add(observation.source)
+
+    def out(self) -> schemas.DiscoveredHost:
+        return schemas.DiscoveredHost(
+            ip_address=self.ip,
+            mac_address=_format_mac(self.mac),
+            serial_number=self.serial,
+            os_or_firmware=self.os,
+            hostname=self.hostname,
+            switch_port=self.port,
+            sources=sorted(self.sources),
+        )
+
+
+def _format_mac(mac: Optional[str]) -> Optional[str]:
+    return ":".join(mac[index:index + 2] for index in range(0, 12, 2)) if mac else None
+
+
+def merge_observations(observations: Iterable[Observation]) -> List[_Host]:
+    """Combine observations of the same device from different sources, keyed by MAC, then IP, then serial."""
+    by_mac: Dict[str, _Host] = {}
+    by_ip: Dict[bytes, _Host] = {}
+    by_serial: Dict[str, _Host] = {}
+    hosts: List[_Host] = []
+    for observation in observations:
+        packed = pack_ip(observation.ip)
+        host = (
+            (by_mac.get(observation.mac) if observation.mac else None)
+            or (by_ip.get(packed) if packed else None)
+            or (by_serial.get(observation.serial.upper()) if observation.serial else None)
+        )
+        # 同一 IP 先后出现不同 MAC（地址被重新分配）时视为两台设备
+        if host is None or (observation.mac and host.mac and host.mac != observation.mac):
+            host = _Host()
+            hosts.append(host)
+        host.merge(observation)
+        if host.mac:
+            by_mac[host.mac] = host
+        if packed:
+            by_ip[packed] = host
+        if host.serial:
+            by_serial[host.serial.upper()] = host
+    return hosts
+
+
+class _Inventory:
+    """Hash indexes over the asset table's serial number, MAC and IP, built in one pass."""
+
+    COLUMNS = (
+        models.Asset.id,
+        models.Asset.asset_code,
+        models.Asset.serial_number,
+        models.Asset.mac_normalized,
+        models.Asset.ip_packed,
+        models.Asset.ip_address,
+        models.Asset.mac_address,
+        models.Asset.os_or_firmware,
+        models.Asset.status,
+        models.Asset.version,
+    )
+
+    def __init__(self, db: Session):
+        self.rows = db.execute(select(*self.COLUMNS).order_by(models.Asset.id)).all()
+        self.by_serial: Dict[str, tuple] = {}
+        self.by_mac: Dict[str, tuple] = {}
+        self.by_ip: Dict[bytes, tuple] = {}
+        # 键重复时保留 ID 最小的资产
+        for row in self.rows:
+            if row.serial_number:
+                self.by_serial.setdefault(row.serial_number.strip().upper(), row)
+            if row.mac_normalized:
+                self.by_mac.setdefault(row.mac_normalized, row)
+            if row.ip_packed:
+                self.by_ip.setdefault(row.ip_packed, row)
+
+    def match(self, host: _Host) -> Tuple[Optional[tuple], Optional[str]]:
+        if host.serial and host.serial.upper() in self.by_serial:
+            return self.by_serial[host.serial.upper()], "serial_number"
+        if host.mac and host.mac in self.by_mac:
+            return self.by_mac[host.mac], "mac_address"
+        row = self.by_ip.get(pack_ip(host.ip)) if host.ip else None
+        # 仅 IP 相同而台账中记录了另一个 MAC，更可能是地址被其他设备占用，不作匹配
+        if row is not None and not (host.mac and row.mac_normalized and row.mac_normalized != host.mac):
+            return row, "ip_address"
+        return None, None
+
+
+def _drift(row, host: _Host, fields: Sequence[str]) -> Dict[str, List[Optional[str]]]:
+    changes: Dict[str, List[Optional[str]]] = {}
+    if "ip_address" in fields and host.ip and pack_ip(host.ip) != row.ip_packed:
+        changes["ip_address"] = [row.ip_address, host.ip]
+    if "mac_address" in fields and host.mac and host.mac != row.mac_normalized:
+        changes["mac_address"] = [row.mac_address, _format_mac(host.mac)]
+    if "os_or_firmware" in fields and host.os and host.os != row.os_or_firmware:
+        changes["os_or_firmware"] = [row.os_or_firmware, host.os]
+    return changes
+
+
+def scope_ranges(scope: Optional[Sequence[str]]) -> List[Tuple[bytes, bytes]]:
+    return [cidr_range(cidr) for cidr in scope or []]
+
+
+def reconcile(
+    db: Session,
+    observations: Sequence[Observation],
+    fields: Sequence[str] = ("ip_address", "mac_address"),
+    scope: Sequence[Tuple[bytes, bytes]] = (),
+    apply: bool = False,
+    user_id: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> schemas.ReconcileReport:
+    """Diff merged scan results against the inventory and optionally apply the drift.
+
+    Assets are matched by serial number, then MAC, then IP. ``missing`` lists
+    in-use assets whose IP lies in ``scope`` but that no host matched; it stays
+    empty without a scope, since a scan says nothing about networks it did not
+    cover. Report lists are capped at ``limit`` entries; the totals are not.
+    With ``apply`` the caller commits.
+    """
+    limit = settings.reconcile_report_limit if limit is None else limit
+    hosts = merge_observations(observations)
+    inventory = _Inventory(db)
+    matched: Set[int] = set()
+    plan: List[Tuple[tuple, Dict[str, List[Optional[str]]]]] = []
+    changed: List[schemas.ReconcileDrift] = []
+    unknown: List[schemas.DiscoveredHost] = []
+    unknown_total = 0
+    for host in hosts:
+        row, matched_by = inventory.match(host)
+        if row is None or row.id in matched:
+            # 同一资产被多台设备匹配时只采用第一台，其余按未登记设备报告
+            unknown_total += 1
+            if len(unknown) < limit:
+                unknown.append(host.out())
+            continue
+        matched.add(row.id)
+        changes = _drift(row, host, fields)
+        if changes:
+            plan.append((row, changes))
+            if len(changed) < limit:
+                changed.append(
+                    schemas.ReconcileDrift(asset_id=row.id, asset_code=row.asset_code, matched_by=matched_by, changes=changes)
+                )
+    missing: List[schemas.ReconcileMissing] = []
+    missing_total = 0
+    if scope:
+        for row in inventory.rows:
+            if row.id in matched or row.status != "in_use" or row.ip_packed is None:
+                continue
+            if any(low <= row.ip_packed <= high for low, high in scope):
+                missing_total += 1
+                if len(missing) < limit:
+                    missing.append(
+                        schemas.ReconcileMissing(
+                            asset_id=row.id, asset_code=row.asset_code, ip_address=row.ip_address, mac_address=row.mac_address
+                        )
+                    )
+    applied = apply_drift(db, plan, user_id) if apply else 0
+    return schemas.ReconcileReport(
+        observations=len(observations),
+        hosts=len(hosts),
+        matched=len(matched),
+        unchanged=len(matched) - len(plan),
+        changed_total=len(plan),
+        unknown_total=unknown_total,
+        missing_total=missing_total,
+        applied=applied,
+        changed=changed,
+        unknown=unknown,
+        missing=missing,
+    )
+
+
+def apply_drift(db: Session, plan: Sequence[Tuple[tuple, Dict[str, List[Optional[str]]]]], user_id: Optional[int]) -> int:
+    """Write the planned changes with one executemany UPDATE per combination of changed fields.
+
+    Each row is guarded by the version read with the inventory; if any asset was
+    modified meanwhile, :class:`ReconcileConflict` is raised and nothing should be
+    committed.
+    """
+    groups: Dict[Tuple[str, ...], List[dict]] = {}
+    now = datetime.utcnow()
+    for row, changes in plan:
+        values = {field: value for field, (_, value) in changes.items()}
+        if "ip_address" in changes:
+            values["ip_packed"] = pack_ip(values["ip_address"])
+        if "mac_address" in changes:
+            values["mac_normalized"] = normalize_mac(values["mac_address"])
+        # 绑定参数不能与 SET 的列同名，统一加前缀
+        params = {f"new_{column}": value for column, value in values.items()}
+        params.update(target_id=row.id, target_version=row.version, new_updated_at=now)
+        groups.setdefault(tuple(sorted(values)), []).append(params)
+    applied = 0
+    for columns, rows in groups.items():
+        statement = (
+            update(models.Asset)
+            .where(models.Asset.id == bindparam("target_id"), models.Asset.version == bindparam("target_version"))
+            .values(
+                **{column: bindparam(f"new_{column}") for column in columns},
+                updated_at=bindparam("new_updated_at"),
+                version=models.Asset.version + 1,
+            )
+        )
+        applied += db.execute(statement.execution_options(synchronize_session=False), rows).rowcount
+    if applied != len(plan):
+        raise ReconcileConflict(len(plan) - applied)
+    create_audit_logs(
+        db,
+        [
+            {
+                "user_id": user_id,
+                "action": "UPDATE",
+                "target_table": "assets",
+                "target_id": row.id,
+                "asset_code": row.asset_code,
+                "changes": changes,
+            }
+            for row, changes in plan
+        ],
+    )
+    return applied
@@ -0,0 +1,146 @@
+import hashlib
+import importlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Protocol, Tuple
+
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .. import schemas
+from ..config import Settings, get_settings
+from .cache import TTLCache
+from .http_cache import etag_matches, make_etag
+from .versions import table_version, table_version_async
+
+settings = get_settings()
+
+
+class CachedResponse(NamedTuple):
+    version: int
+    body: bytes
+    etag: str
+    last_modified: Optional[str]
+    headers: Tuple[Tuple[str, str], ...]
+
+
+class CacheBackend(Protocol):
+    """Storage for rendered responses. Shared backends (Redis, memcached) must pickle ``CachedResponse``."""
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        ...
+
+    def set(self, key: str, value: CachedResponse) -> None:
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        ...
+
+
+def load_backend(config: Settings) -> Optional[CacheBackend]:
+    spec = config.response_cache_backend
+    if spec in ("", "none"):
+        return None
+    if spec == "memory":
+        return TTLCache(max_size=config.response_cache_max_entries, ttl=config.response_cache_ttl_seconds)
+    # 形如 "package.module:factory"，factory 接收 Settings 返回后端实例
+    module_name, _, attribute = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)(config)
+
+
+response_cache: Optional[CacheBackend] = load_backend(settings)
+
+
+def encode_json(content: Any) -> bytes:
+    # 与 FastAPI 默认的 JSONResponse 输出逐字节一致
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+def _not_modified(request: Request, entry: CachedResponse) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, entry.etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and entry.last_modified:
+        try:
+            return parsedate_to_datetime(entry.last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _cache_key(request: Request, principal: schemas.Principal) -> str:
+    # 查询参数排序后参与计算，参数顺序不同的相同请求共用缓存；权限范围不同的用户互不共享
+    scope = "".join("1" if getattr(principal, field) else "0" for field in schemas.PERMISSION_FIELDS)
+    params = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    return hashlib.sha1(f"{request.url.path}?{params}#{scope}".encode()).hexdigest()
+
+
+Rendered = Tuple[bytes, Dict[str, str], Optional[datetime]]
+Renderer = Callable[[], Rendered]
+
+
+def _lookup(request: Request, principal: schemas.Principal, current: Optional[Tuple[int, datetime]]) -> Tuple[Optional[str], Optional[CachedResponse]]:
+    key = _cache_key(request, principal) if current is not None else None
+    entry = response_cache.get(key) if response_cache is not None and key is not None else None
+    if entry is None or entry.version != current[0]:
+        return key, None
+    return key, entry
+
+
+def _store(key: Optional[str], current: Optional[Tuple[int, datetime]], rendered: Rendered) -> CachedResponse:
+    body, headers, last_modified = rendered
+    etag = headers.pop("ETag", None) or make_etag(body)
+    if last_modified is None and current is not None:
+        last_modified = current[1]
+    entry = CachedResponse(
+        version=current[0] if current is not None else -1,
+        body=body,
+        etag=etag,
+        last_modified=http_date(last_modified) if last_modified else None,
+        headers=tuple(headers.items()),
+    )
+    if response_cache is not None and key is not None:
+        response_cache.set(key, entry)
+    return entry
+
+
+def _reply(request: Request, entry: CachedResponse) -> Response:
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache", **dict(entry.headers)}
+    if entry.last_modified:
+        headers["Last-Modified"] = entry.last_modified
+    if _not_modified(request, entry):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
+
+
+def cached_response(request: Request, db: Session, principal: schemas.Principal, table: str, render: Renderer) -> Response:
+    """Serve a GET from the response cache, revalidated against ``table``'s version counter.
+
+    ``render`` returns ``(body, extra headers, last modified)``; when it gives no
+    last-modified time, the table's last write time is used. An ``ETag`` in the
+    extra headers replaces the default body hash.
+    """
+    current = table_version(db, table)
+    key, entry = _lookup(request, principal, current)
+    if entry is None:
+        entry = _store(key, current, render())
+    return _reply(request, entry)
+
+
+async def cached_response_async(
+    request: Request, db: AsyncSession, principal: schemas.Principal, table: str, render: Callable[[], Awaitable[Rendered]]
+) -> Response:
+    """``cached_response`` for native async handlers; ``render`` is awaited."""
+    current = await table_version_async(db, table)
+    key, entry = _lookup(request, principal, current)
+    if entry is None:
+        entry = _store(key, current, await render())
+    return _reply(request, entry)
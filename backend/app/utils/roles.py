@@ -0,0 +1,69 @@
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from .. import models, schemas
+from ..config import get_settings
+from .versions import table_version
+
+settings = get_settings()
+
+
+class RoleCache:
+    """In-process copy of the small, rarely changing ``roles`` table.
+
+    Reads are served from memory for ``ttl`` seconds, then revalidated against the
+    ``table_versions`` counter (one primary-key lookup) and reloaded only when the
+    roles actually changed, in this worker or another. Where the counter is not
+    maintained the table is simply reloaded after ``ttl``.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._roles: Optional[Dict[int, schemas.RoleInfo]] = None
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def _load(self, db: Session) -> Dict[int, schemas.RoleInfo]:
+        roles = db.query(models.Role).order_by(models.Role.id).all()
+        self.loads += 1
+        return {role.id: schemas.RoleInfo.from_orm(role) for role in roles}
+
+    def _refresh(self, db: Session) -> Dict[int, schemas.RoleInfo]:
+        roles = self._roles
+        if roles is not None and time.monotonic() - self._checked_at < self.ttl:
+            return roles
+        # 异步模式下查询在 greenlet 中让出事件循环，阻塞等锁会卡住事件循环：
+        # 已有调用方在刷新时直接使用旧数据，首次加载时各自查询
+        if not self._lock.acquire(blocking=False):
+            return roles if roles is not None else self._load(db)
+        try:
+            current = table_version(db, models.Role.__tablename__)
+            version = current[0] if current is not None else None
+            if self._roles is None or version is None or version != self._version:
+                self._roles = self._load(db)
+                self._version = version
+            self._checked_at = time.monotonic()
+            return self._roles
+        finally:
+            self._lock.release()
+
+    def all(self, db: Session) -> List[schemas.RoleInfo]:
+        return list(self._refresh(db).values())
+
+    def get(self, db: Session, role_id: int) -> Optional[schemas.RoleInfo]:
+        return self._refresh(db).get(role_id)
+
+
+# 与登录态缓存的有效期一致：角色权限变更最迟在该时间后对所有 worker 生效
+role_cache = RoleCache(ttl=settings.principal_cache_ttl_seconds)
+
+
+def user_out(db: Session, user: models.User) -> schemas.UserOut:
+    """``UserOut`` for a loaded ``user``, taking the role from the cache instead of a lazy load."""
+    fields = {name: getattr(user, name) for name in schemas.UserOut.__fields__ if name != "role"}
+    return schemas.UserOut(**fields, role=role_cache.get(db, user.role_id))
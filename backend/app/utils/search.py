@@ -0,0 +1,100 @@
+import re
+from typing import Optional
+
+from sqlalchemy import Float, Integer, and_, column, literal_column, or_, select, table
+from sqlalchemy.engine import Connection, Engine
+
+from .. import models
+
+FTS_TABLE = "assets_fts"
+# 列顺序与 bm25 权重一一对应，编号、序列号、IP 命中时排名更靠前
+FTS_COLUMNS = {
+    "asset_code": 10.0,
+    "serial_number": 8.0,
+    "ip_address": 8.0,
+    "mac_address": 8.0,
+    "brand": 3.0,
+    "model": 3.0,
+    "os_or_firmware": 2.0,
+    "location": 2.0,
+    "owner_dept": 1.0,
+    "note": 1.0,
+}
+
+fts_table = table(FTS_TABLE, column("rowid", Integer), column(FTS_TABLE))
+# unicode61 分词器不切分中日韩文字，连续的汉字整体成为一个词，词中间的子串在索引中查不到
+CJK = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af]")
+
+
+def fts_supported(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def fts_searchable(bind, q: str) -> bool:
+    """Whether ``q`` is answered from the FTS index; queries with CJK text use the LIKE substring match."""
+    return fts_supported(bind) and not CJK.search(q)
+
+
+def create_search_index(conn: Connection) -> None:
+    if not fts_supported(conn):
+        return
+    columns = ", ".join(FTS_COLUMNS)
+    old_values = ", ".join(f"old.{name}" for name in FTS_COLUMNS)
+    new_values = ", ".join(f"new.{name}" for name in FTS_COLUMNS)
+    conn.exec_driver_sql(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5({columns}, content='assets', content_rowid='id', "
+        "tokenize = \"unicode61 remove_diacritics 2 tokenchars '-_.:/'\")"
+    )
+    conn.exec_driver_sql(
+        f"CREATE TRIGGER IF NOT EXISTS assets_fts_ai AFTER INSERT ON assets BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+    )
+    conn.exec_driver_sql(
+        f"CREATE TRIGGER IF NOT EXISTS assets_fts_ad AFTER DELETE ON assets BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END"
+    )
+    conn.exec_driver_sql(
+        f"CREATE TRIGGER IF NOT EXISTS assets_fts_au AFTER UPDATE OF {columns} ON assets BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+    )
+    rebuild_search_index(conn)
+
+
+def rebuild_search_index(bind) -> None:
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            rebuild_search_index(conn)
+        return
+    if fts_supported(bind):
+        bind.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def build_match_expression(q: str) -> Optional[str]:
+    # 每个词按前缀匹配，多个词之间为 AND；用双引号包裹避免用户输入被解析为 FTS 语法
+    terms = ['"{}"*'.format(term.replace('"', '""')) for term in q.split()]
+    return " ".join(terms) or None
+
+
+def ranked_matches(match: str):
+    weights = ", ".join(str(weight) for weight in FTS_COLUMNS.values())
+    return (
+        select(fts_table.c.rowid.label("asset_id"), literal_column(f"bm25({FTS_TABLE}, {weights})", Float).label("rank"))
+        .select_from(fts_table)
+        .where(fts_table.c[FTS_TABLE].op("MATCH")(match))
+        .subquery("search_matches")
+    )
+
+
+def search_filter(bind, q: str):
+    if fts_searchable(bind, q):
+        matches = ranked_matches(build_match_expression(q))
+        return models.Asset.id.in_(select(matches.c.asset_id))
+    return and_(*like_fallback(q))
+
+
+def like_fallback(q: str):
+    clauses = []
+    for term in q.split():
+        clauses.append(or_(*(getattr(models.Asset, name).contains(term) for name in FTS_COLUMNS)))
+    return clauses
@@ -0,0 +1,113 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from .. import models
+
+DIMENSIONS = ("category", "status", "owner_dept", "location")
+
+# 汇总表 -> 维度列；部门/位置为空时以空字符串计入
+SUMMARY_TABLES = {
+    models.AssetStat.__table__: ("category", "status", "owner_dept"),
+    models.AssetLocationStat.__table__: ("location",),
+}
+
+
+def _key_expr(prefix: str, name: str) -> str:
+    return f"{prefix}.{name}" if name in ("category", "status") else f"coalesce({prefix}.{name}, '')"
+
+
+def _summary_triggers(conn: Connection, table: str, names: Sequence[str]) -> None:
+    key = ", ".join(names)
+    match_old = " AND ".join(f"{name} = {_key_expr('old', name)}" for name in names)
+    increment = (
+        f"INSERT INTO {table} ({key}, asset_count) VALUES ({', '.join(_key_expr('new', name) for name in names)}, 1) "
+        f"ON CONFLICT ({key}) DO UPDATE SET asset_count = asset_count + 1;"
+    )
+    decrement = (
+        f"UPDATE {table} SET asset_count = asset_count - 1 WHERE {match_old}; "
+        f"DELETE FROM {table} WHERE {match_old} AND asset_count <= 0;"
+    )
+    changed = " OR ".join(f"old.{name} IS NOT new.{name}" for name in names)
+    conn.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS {table}_ai AFTER INSERT ON assets BEGIN {increment} END")
+    conn.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS {table}_ad AFTER DELETE ON assets BEGIN {decrement} END")
+    conn.exec_driver_sql(
+        f"CREATE TRIGGER IF NOT EXISTS {table}_au AFTER UPDATE OF {key} ON assets "
+        f"WHEN {changed} BEGIN {decrement} {increment} END"
+    )
+
+
+def stats_supported(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def create_stats_tables(conn: Connection) -> None:
+    for table, names in SUMMARY_TABLES.items():
+        table.create(conn, checkfirst=True)
+        if stats_supported(conn):
+            _summary_triggers(conn, table.name, names)
+    rebuild_stats(conn)
+
+
+def rebuild_stats(bind) -> None:
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            rebuild_stats(conn)
+        return
+    if not stats_supported(bind):
+        return
+    for table, names in SUMMARY_TABLES.items():
+        keys = ", ".join(_key_expr("assets", name) for name in names)
+        bind.exec_driver_sql(f"DELETE FROM {table.name}")
+        bind.exec_driver_sql(
+            f"INSERT INTO {table.name} ({', '.join(names)}, asset_count) "
+            f"SELECT {keys}, count(*) FROM assets GROUP BY {keys}"
+        )
+
+
+def _source(db: Session, names: Sequence[str]):
+    """Smallest relation exposing ``names`` plus ``asset_count``."""
+    if stats_supported(db.get_bind()):
+        for table, columns in SUMMARY_TABLES.items():
+            if set(names) <= set(columns):
+                return table
+    # 跨汇总表的组合（如位置 × 类别）或其他数据库：直接对资产表分组
+    columns = [func.coalesce(getattr(models.Asset, name), "").label(name) for name in names]
+    return select(*columns, func.count().label("asset_count")).group_by(*columns).subquery("asset_counts")
+
+
+def _label(value: str) -> Optional[str]:
+    return value or None
+
+
+def asset_stats(
+    db: Session,
+    dimensions: Sequence[str] = DIMENSIONS,
+    group_by: Sequence[str] = (),
+    filters: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    """Grouped counts, read from the summary tables where possible so cost grows with groups."""
+    filters = filters or {}
+
+    def grouped(names: Sequence[str]) -> List[Any]:
+        source = _source(db, [*names, *filters])
+        count = func.coalesce(func.sum(source.c.asset_count), 0)
+        columns = [source.c[name] for name in names]
+        query = select(*columns, count.label("count")).where(*(source.c[name] == value for name, value in filters.items()))
+        return db.execute(query.group_by(*columns).order_by(count.desc(), *columns)).all()
+
+    result: Dict[str, Any] = {
+        "total": grouped([])[0].count,
+        "dimensions": {
+            name: [{"value": _label(row[0]), "count": row.count} for row in grouped([name])] for name in dimensions
+        },
+        "crosstab": [],
+    }
+    if len(group_by) > 1:
+        result["crosstab"] = [
+            {**{name: _label(row[index]) for index, name in enumerate(group_by)}, "count": row.count}
+            for row in grouped(group_by)
+        ]
+    return result
@@ -0,0 +1,54 @@
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .. import models
+
+VERSIONS_TABLE = models.TableVersion.__tablename__
+
+
+def versions_supported(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def track_table(conn: Connection, table: str) -> None:
+    """Create the counter row for ``table`` and the triggers that bump it on every insert/update/delete."""
+    models.TableVersion.__table__.create(conn, checkfirst=True)
+    if not versions_supported(conn):
+        return
+    conn.exec_driver_sql(
+        f"INSERT OR IGNORE INTO {VERSIONS_TABLE} (table_name, version, updated_at) VALUES (?, 0, datetime('now'))",
+        (table,),
+    )
+    # 更新时间精确到秒，与 HTTP Last-Modified 的精度一致
+    bump = (
+        f"UPDATE {VERSIONS_TABLE} SET version = version + 1, updated_at = datetime('now') "
+        f"WHERE table_name = '{table}';"
+    )
+    for suffix, operation in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE")):
+        conn.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_version_{suffix} AFTER {operation} ON {table} BEGIN {bump} END"
+        )
+
+
+def _version_query(table: str):
+    return select(models.TableVersion.version, models.TableVersion.updated_at).where(models.TableVersion.table_name == table)
+
+
+def table_version(db: Session, table: str) -> Optional[Tuple[int, datetime]]:
+    """``(version, last write time)`` of ``table``, or ``None`` when changes are not tracked."""
+    if not versions_supported(db.get_bind()):
+        return None
+    row = db.execute(_version_query(table)).first()
+    return (row.version, row.updated_at) if row else None
+
+
+async def table_version_async(db: AsyncSession, table: str) -> Optional[Tuple[int, datetime]]:
+    if not versions_supported(db.bind):
+        return None
+    row = (await db.execute(_version_query(table))).first()
+    return (row.version, row.updated_at) if row else None
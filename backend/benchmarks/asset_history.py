@@ -0,0 +1,116 @@
+"""Point-in-time listing and per-asset history as the history table grows, plus the write cost of versioning.
+
+    python -m benchmarks.asset_history --size 50000 --versions 1 4 16
+
+For each ``--versions`` value a fresh database gets ``size`` assets and then
+``versions - 1`` set-based updates of every asset, so the history table holds
+``size * versions`` rows. Query latency should stay flat across the runs: it
+depends on the page size, not on how much history has accumulated.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from .common import ASGIDriver, percentiles, run_isolated, seed_assets, use_database
+
+
+def _write_cost(conn, updates: int) -> float:
+    started = time.perf_counter()
+    for asset_id in range(1, updates + 1):
+        conn.exec_driver_sql("UPDATE assets SET note = 'bench', version = version + 1 WHERE id = ?", (asset_id,))
+    return round((time.perf_counter() - started) * 1000 / updates, 4)
+
+
+async def _measure(args) -> dict:
+    from sqlalchemy import func, select
+
+    from app import models
+    from app.database import engine
+    from app.main import app
+
+    marks = []
+    with engine.begin() as conn:
+        for round_index in range(1, args.versions):
+            marks.append(datetime.utcnow())
+            conn.exec_driver_sql("UPDATE assets SET location = ?, version = version + 1", (f"R{round_index}",))
+    with engine.connect() as conn:
+        history_rows = conn.execute(select(func.count()).select_from(models.AssetHistory)).scalar()
+
+    result = {"size": args.size, "versions": args.versions, "history_rows": history_rows}
+    # 当前时刻与最早一轮修改之前的时刻；后者需要跳过每个资产之后的全部版本
+    points = {"now": datetime.utcnow(), "oldest": marks[0] if marks else datetime.utcnow()}
+    async with ASGIDriver(app) as driver:
+        headers = await driver.login()
+        targets = {f"as_of_{name}": f"/api/assets?limit={args.page}&as_of={value.isoformat()}" for name, value in points.items()}
+        targets["as_of_now_filtered"] = f"/api/assets?limit={args.page}&status=in_use&as_of={points['now'].isoformat()}"
+        targets["asset_history"] = f"/api/assets/{args.size // 2}/history?limit={args.page}"
+        for label, path in targets.items():
+            samples = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                status, _, body = await driver.request("GET", path, headers)
+                samples.append((time.perf_counter() - started) * 1000)
+                if status != 200:
+                    raise RuntimeError(f"{path}: {status} {body[:200]!r}")
+            result[label] = percentiles(samples)
+
+    # 单行修改的耗时，含历史触发器与去掉历史触发器各测一次
+    with engine.begin() as conn:
+        result["update_ms_with_history"] = _write_cost(conn, args.updates)
+        for suffix in ("ai", "au", "ad"):
+            conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS assets_history_{suffix}")
+        result["update_ms_without_history"] = _write_cost(conn, args.updates)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=50000)
+    parser.add_argument("--versions", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        args.versions = args.versions[0]
+        os.environ["RESPONSE_CACHE_BACKEND"] = "none"
+        os.environ.setdefault("ADMIN_DEFAULT_PASSWORD", "Admin@123")
+        path = use_database(f"history-{args.size}-{args.versions}")
+        for suffix in ("", "-wal", "-shm"):
+            candidate = path.with_name(path.name + suffix)
+            if candidate.exists():
+                candidate.unlink()
+        seed_assets(args.size)
+        print(json.dumps(asyncio.run(_measure(args))))
+        return
+
+    results = []
+    for versions in args.versions:
+        result = run_isolated(
+            "benchmarks.asset_history",
+            "--child",
+            "--size", str(args.size),
+            "--versions", str(versions),
+            "--page", str(args.page),
+            "--repeat", str(args.repeat),
+            "--updates", str(args.updates),
+        )
+        results.append(result)
+        print(
+            f"history rows {result['history_rows']:>9}  "
+            f"as_of now p50 {result['as_of_now']['p50_ms']:>7.2f}ms  oldest {result['as_of_oldest']['p50_ms']:>7.2f}ms  "
+            f"filtered {result['as_of_now_filtered']['p50_ms']:>7.2f}ms  history {result['asset_history']['p50_ms']:>6.2f}ms  "
+            f"update {result['update_ms_with_history']:.3f} vs {result['update_ms_without_history']:.3f} ms",
+            file=sys.stderr,
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""Asset list filters answered by SQL versus the shared columnar snapshot, with 1..N worker processes.
+
+    python -m benchmarks.asset_scan --size 1000000 --workers 1 4 --updates-per-sec 20
+
+Every worker is a separate interpreter that issues ``GET /api/assets`` requests
+for a fixed mix of filters (response cache off) through the in-process ASGI
+driver; all workers start together and share the database and, in ``scan``
+mode, the memory-mapped snapshot. With ``--updates-per-sec`` one more process
+updates random assets during the run, so the snapshot is refreshed from the
+change log while it is being read. The snapshot is built once beforehand; the
+build time and the cost of applying 1000 queued changes are reported separately.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+from .common import BACKEND_DIR, DATA_DIR, STATUSES, ASGIDriver, percentiles, run_isolated, use_database
+from .generate import ensure_inventory
+
+MIXES = {
+    "category": "category=server",
+    "status": "status=repair",
+    "category_status": "category=server&status=in_use",
+    "dept_status": "owner_dept=财务部&status=repair",
+    "category_dept": "category=switch&owner_dept=研发部",
+    "ip_prefix": "ip_prefix=10.1",
+    "cidr_status": "cidr=10.1.0.0/20&status=spare",
+    "ip_exact": "ip_address=10.0.3.7",
+}
+MODES = {"sql": "false", "scan": "true"}
+
+
+def _environment(args, mode: str) -> None:
+    use_database(f"inventory-{args.size}")
+    os.environ["ASSET_SCAN_ENABLED"] = MODES[mode]
+    os.environ["ASSET_SCAN_PATH"] = str(DATA_DIR / f"asset-scan-{args.size}.bin")
+    os.environ["RESPONSE_CACHE_BACKEND"] = "none"
+    os.environ.setdefault("ADMIN_DEFAULT_PASSWORD", "Admin@123")
+
+
+def _update(conn, rng: random.Random, size: int) -> None:
+    stamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f")
+    conn.exec_driver_sql(
+        "UPDATE assets SET status = ?, updated_at = ?, version = version + 1 WHERE id = ?",
+        (rng.choice(STATUSES), stamp, rng.randint(1, size)),
+    )
+
+
+def _prepare(args) -> Dict[str, Any]:
+    from app.database import SessionLocal, engine
+    from app.utils.asset_scan import ScanTerms, asset_scan
+
+    # 快照文件已是最新时只需打开，否则全量构建
+    started = time.perf_counter()
+    asset_scan.warm(engine)
+    build_seconds = time.perf_counter() - started
+    # 排队 1000 条变更后第一次查询的耗时，包括增量刷新
+    rng = random.Random(7)
+    with engine.begin() as conn:
+        for _ in range(1000):
+            _update(conn, rng, args.size)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        asset_scan.select(db, ScanTerms({"status": "repair"}), None, 51)
+        apply_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        asset_scan.select(db, ScanTerms({"status": "repair"}), None, 51)
+        select_ms = (time.perf_counter() - started) * 1000
+    finally:
+        db.close()
+    return {
+        "build_seconds": round(build_seconds, 2),
+        "file_mb": round(asset_scan.path.stat().st_size / (1024 * 1024), 1),
+        "apply_1000_changes_ms": round(apply_ms - select_ms, 2),
+        **asset_scan.stats(),
+    }
+
+
+async def _reader(args) -> Dict[str, Any]:
+    from app.main import app
+    from app.utils.asset_scan import asset_scan
+
+    samples: Dict[str, List[float]] = {name: [] for name in MIXES}
+    async with ASGIDriver(app) as driver:
+        headers = await driver.login()
+        for query in MIXES.values():
+            await driver.request("GET", f"/api/assets?limit=50&{query}", headers)
+        # 所有 worker 同时开始计时
+        await asyncio.sleep(max(0.0, args.start_at - time.time()))
+        started = time.perf_counter()
+        for _ in range(args.requests):
+            for name, query in MIXES.items():
+                begun = time.perf_counter()
+                status, _, _ = await driver.request("GET", f"/api/assets?limit=50&{query}", headers)
+                samples[name].append((time.perf_counter() - begun) * 1000)
+                if status != 200:
+                    raise RuntimeError(f"{query}: {status}")
+        elapsed = time.perf_counter() - started
+    return {
+        "elapsed_seconds": elapsed,
+        "samples": samples,
+        "scan": asset_scan.stats() if asset_scan is not None else None,
+    }
+
+
+def _writer(args) -> None:
+    from app.database import engine
+
+    rng = random.Random(11)
+    interval = 1 / args.updates_per_sec
+    while True:
+        with engine.begin() as conn:
+            _update(conn, rng, args.size)
+        time.sleep(interval)
+
+
+def _run(args, mode: str, workers: int) -> Dict[str, Any]:
+    command = [sys.executable, "-m", "benchmarks.asset_scan", "--mode", mode, "--size", str(args.size), "--requests", str(args.requests)]
+    writer = None
+    if args.updates_per_sec:
+        writer = subprocess.Popen([*command, "--child", "writer", "--updates-per-sec", str(args.updates_per_sec)], cwd=BACKEND_DIR)
+    start_at = time.time() + 3 + workers * 0.5
+    readers = [
+        subprocess.Popen([*command, "--child", "reader", "--start-at", str(start_at)], cwd=BACKEND_DIR, stdout=subprocess.PIPE, text=True)
+        for _ in range(workers)
+    ]
+    try:
+        results = [json.loads(reader.communicate()[0].strip().splitlines()[-1]) for reader in readers]
+    finally:
+        if writer is not None:
+            writer.terminate()
+            writer.wait()
+    if any(reader.returncode for reader in readers):
+        raise RuntimeError(f"{mode} with {workers} workers failed")
+    requests = args.requests * len(MIXES) * workers
+    wall = max(result["elapsed_seconds"] for result in results)
+    merged = {name: [value for result in results for value in result["samples"][name]] for name in MIXES}
+    summary = {
+        "mode": mode,
+        "workers": workers,
+        "requests": requests,
+        "requests_per_sec": round(requests / wall, 1),
+        "mixes": {name: percentiles(values) for name, values in merged.items()},
+    }
+    if mode == "scan":
+        summary["fallbacks"] = sum(result["scan"]["fallbacks"] for result in results)
+        summary["scans"] = sum(result["scan"]["scans"] for result in results)
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=1000000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--requests", type=int, default=50, help="rounds over all filter mixes per worker")
+    parser.add_argument("--updates-per-sec", type=float, default=0)
+    parser.add_argument("--mode", choices=list(MODES), help=argparse.SUPPRESS)
+    parser.add_argument("--child", choices=["prepare", "reader", "writer"], help=argparse.SUPPRESS)
+    parser.add_argument("--start-at", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _environment(args, args.mode)
+        if args.child == "prepare":
+            print(json.dumps(_prepare(args)))
+        elif args.child == "reader":
+            print(json.dumps(asyncio.run(_reader(args))))
+        else:
+            _writer(args)
+        return
+
+    _environment(args, "sql")
+    ensure_inventory(args.size)
+    prepared = run_isolated("benchmarks.asset_scan", "--child", "prepare", "--mode", "scan", "--size", str(args.size))
+    print(
+        f"snapshot: {'built' if prepared['rebuilds'] else 'opened'} in {prepared['build_seconds']}s, {prepared['file_mb']} MB, "
+        f"1000 queued changes applied in {prepared['apply_1000_changes_ms']}ms",
+        file=sys.stderr,
+    )
+    results = []
+    for workers in args.workers:
+        for mode in MODES:
+            result = _run(args, mode, workers)
+            results.append(result)
+            line = "  ".join(f"{name} {value['p50_ms']:.2f}" for name, value in result["mixes"].items())
+            print(f"{mode:<4} x{workers:<2} {result['requests_per_sec']:>8.1f} req/s  p50 ms: {line}", file=sys.stderr)
+    print(json.dumps({"size": args.size, "prepare": prepared, "runs": results}, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Throughput and tail latency with many concurrent clients: threadpool vs. async driver.
+
+    python -m benchmarks.async_mode --clients 500 --duration 15
+
+Each client loops over ``GET /api/assets?limit=20``, ``GET /api/assets/{id}``
+and, every ``--write-every`` requests, ``PUT /api/assets/{id}``. ``sync`` is the
+default threadpool + sqlite3 path; ``async`` sets ``DB_ASYNC=true`` (aiosqlite).
+
+Afterwards ``--roles-burst`` concurrent ``GET /api/users/roles`` are sent with the
+role cache revalidating on every call, which must not stall the event loop. A run
+that hangs is stopped after ``--hang-timeout`` seconds with the stack of every
+thread, and the script exits with status 1.
+"""
+import argparse
+import asyncio
+import faulthandler
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+from .common import ASGIDriver, percentiles, run_isolated, seed_assets, use_database
+
+
+async def _client(driver, headers, index, args, deadline, samples, outcomes):
+    rng = random.Random(index)
+    json_headers = {**headers, "content-type": "application/json"}
+    count = 0
+    while time.monotonic() < deadline:
+        count += 1
+        asset_id = rng.randint(1, args.seed)
+        if args.write_every and count % args.write_every == 0:
+            body = json.dumps({"note": f"bench {index}-{count}"}).encode()
+            request = ("PUT", f"/api/assets/{asset_id}", json_headers, body)
+        elif count % 2:
+            request = ("GET", "/api/assets?limit=20", headers, b"")
+        else:
+            request = ("GET", f"/api/assets/{asset_id}", headers, b"")
+        started = time.perf_counter()
+        try:
+            status, _, _ = await driver.request(*request)
+        except Exception as exc:  # 连接池耗尽等异常直接穿透 ASGI 应用，按错误计数
+            status = type(exc).__name__
+        samples.append((time.perf_counter() - started) * 1000)
+        outcomes[status] = outcomes.get(status, 0) + 1
+
+
+async def _run(args) -> dict:
+    from app.main import app
+
+    async with ASGIDriver(app) as driver:
+        headers = await driver.login()
+        deadline = time.monotonic() + args.duration
+        samples, outcomes = [], {}
+        started = time.monotonic()
+        await asyncio.gather(
+            *[_client(driver, headers, index, args, deadline, samples, outcomes) for index in range(args.clients)]
+        )
+        elapsed = time.monotonic() - started
+        roles = await _roles_check(driver, headers, args)
+    return {
+        "requests_per_sec": round(len(samples) / elapsed, 1),
+        "latency": percentiles(samples),
+        "status": {str(key): value for key, value in outcomes.items()},
+        "roles_check": roles,
+    }
+
+
+async def _roles_check(driver, headers, args) -> dict:
+    from app.utils.roles import role_cache
+
+    # 每次调用都比对版本号，放大并发刷新角色缓存的竞争
+    role_cache.ttl = 0
+    outcomes = {}
+    started = time.perf_counter()
+    for _ in range(args.roles_rounds):
+        responses = await asyncio.gather(*[driver.request("GET", "/api/users/roles", headers) for _ in range(args.roles_burst)])
+        for status, _, _ in responses:
+            outcomes[str(status)] = outcomes.get(str(status), 0) + 1
+    return {"requests": args.roles_burst * args.roles_rounds, "ms": round((time.perf_counter() - started) * 1000, 2), "status": outcomes}
+
+
+def _watchdog(seconds: float) -> None:
+    # 事件循环被阻塞时 asyncio 的超时不会触发，由独立线程输出各线程调用栈后退出
+    def fire():
+        faulthandler.dump_traceback(all_threads=True)
+        # 密码哈希进程池的子进程继承了标准输出，一并结束，父进程才能读到 EOF
+        for child in multiprocessing.active_children():
+            child.kill()
+        os._exit(1)
+
+    timer = threading.Timer(seconds, fire)
+    timer.daemon = True
+    timer.start()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--seed", type=int, default=20000, help="assets loaded before the run")
+    parser.add_argument("--write-every", type=int, default=10, help="one PUT every N requests per client, 0 disables")
+    parser.add_argument("--roles-burst", type=int, default=20, help="concurrent GET /api/users/roles per round")
+    parser.add_argument("--roles-rounds", type=int, default=10)
+    parser.add_argument("--hang-timeout", type=float, default=120.0, help="seconds beyond --duration before a run counts as hung")
+    parser.add_argument("--mode", choices=["sync", "async"])
+    args = parser.parse_args()
+
+    if args.mode:
+        _watchdog(args.duration + args.hang_timeout)
+        os.environ["DB_ASYNC"] = "true" if args.mode == "async" else "false"
+        os.environ.setdefault("ADMIN_DEFAULT_PASSWORD", "Admin@123")
+        use_database("async-mode")
+        seed_assets(args.seed)
+        result = asyncio.run(_run(args))
+        result["mode"] = args.mode
+        print(json.dumps(result))
+        return
+
+    options = [
+        "--clients", str(args.clients),
+        "--duration", str(args.duration),
+        "--seed", str(args.seed),
+        "--write-every", str(args.write_every),
+        "--roles-burst", str(args.roles_burst),
+        "--roles-rounds", str(args.roles_rounds),
+        "--hang-timeout", str(args.hang_timeout),
+    ]
+    report, failed = [], False
+    for mode in ("sync", "async"):
+        try:
+            report.append(run_isolated("benchmarks.async_mode", "--mode", mode, *options))
+        except subprocess.CalledProcessError as exc:
+            print(f"{mode}: run failed or hung\n{exc.stderr[-5000:]}", file=sys.stderr)
+            failed = True
+    for result in report:
+        latency = result["latency"]
+        roles = result["roles_check"]
+        print(
+            f"{result['mode']:<5} {result['requests_per_sec']:>8.1f} req/s  p50 {latency.get('p50_ms', 0):>8.1f} ms  "
+            f"p99 {latency.get('p99_ms', 0):>8.1f} ms  status {result['status']}  "
+            f"roles x{roles['requests']} {roles['ms']:.0f} ms {roles['status']}",
+            file=sys.stderr,
+        )
+        failed = failed or set(roles["status"]) != {"200"}
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Throughput of create_asset/update_asset with inline vs. background audit writes.
+
+    python -m benchmarks.audit_writer --ops 2000
+
+``legacy`` replays the old pattern (business commit, then a separate audit
+commit and refresh); ``strict`` and ``async`` are the two AUDIT_MODE settings.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from .common import run_isolated, use_database
+
+MODES = ["legacy", "strict", "async"]
+
+
+def _scenario(mode: str, ops: int) -> None:
+    os.environ["AUDIT_MODE"] = "async" if mode == "async" else "strict"
+    path = use_database(f"audit-{mode}")
+    if path.exists():
+        path.unlink()
+
+    from fastapi import Response
+
+    from app import models, schemas
+    from app.database import Base, SessionLocal, engine
+    from app.routers import assets
+    from app.utils.audit import audit_writer
+
+    Base.metadata.create_all(bind=engine)
+    principal = schemas.Principal(
+        id=1, username="bench", is_active=True, role_id=1, **{field: True for field in schemas.PERMISSION_FIELDS}
+    )
+
+    def legacy_create(payload, db):
+        asset = models.Asset(**payload.dict())
+        db.add(asset)
+        db.commit()
+        db.refresh(asset)
+        log = models.AuditLog(user_id=principal.id, action="CREATE", target_table="assets", target_id=asset.id, detail=str(payload.dict()))
+        db.add(log)
+        db.commit()
+        db.refresh(log)
+        return asset
+
+    def legacy_update(asset_id, payload, db):
+        asset = db.get(models.Asset, asset_id)
+        for key, value in payload.dict(exclude_unset=True).items():
+            setattr(asset, key, value)
+        db.commit()
+        db.refresh(asset)
+        log = models.AuditLog(user_id=principal.id, action="UPDATE", target_table="assets", target_id=asset.id, detail="{}")
+        db.add(log)
+        db.commit()
+        db.refresh(log)
+
+    if mode == "async":
+        audit_writer.start()
+    started = time.perf_counter()
+    ids = []
+    for index in range(ops):
+        db = SessionLocal()
+        try:
+            payload = schemas.AssetCreate(asset_code=f"BENCH-{index}", category="pc", status="in_use")
+            if mode == "legacy":
+                ids.append(legacy_create(payload, db).id)
+            else:
+                ids.append(assets.create_asset(payload=payload, db=db, current_user=principal).id)
+        finally:
+            db.close()
+    for asset_id in ids:
+        db = SessionLocal()
+        try:
+            payload = schemas.AssetUpdate(status="spare")
+            if mode == "legacy":
+                legacy_update(asset_id, payload, db)
+            else:
+                assets.update_asset(
+                    asset_id=asset_id, payload=payload, response=Response(), if_match=None, db=db, current_user=principal
+                )
+        finally:
+            db.close()
+    elapsed = time.perf_counter() - started
+    audit_writer.stop()
+    drained = time.perf_counter() - started
+
+    db = SessionLocal()
+    audit_rows = db.query(models.AuditLog).count()
+    db.close()
+    print(json.dumps({
+        "mode": mode,
+        "ops": ops * 2,
+        "ops_per_sec": round(ops * 2 / elapsed, 1),
+        "drain_ms": round((drained - elapsed) * 1000, 1),
+        "audit_rows": audit_rows,
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ops", type=int, default=2000, help="number of assets created, then updated")
+    parser.add_argument("--mode", choices=MODES)
+    args = parser.parse_args()
+
+    if args.mode:
+        _scenario(args.mode, args.ops)
+        return
+    report = [run_isolated("benchmarks.audit_writer", "--mode", mode, "--ops", str(args.ops)) for mode in MODES]
+    for result in report:
+        print(f"{result['mode']:<7} {result['ops_per_sec']:>9.1f} ops/s  drain {result['drain_ms']:>7.1f} ms", file=sys.stderr)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Relocating/retiring N assets: one PUT/DELETE per asset vs. the batch endpoints.
+
+    python -m benchmarks.batch_ops --count 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+from .common import ASGIDriver, run_isolated, seed_assets, use_database
+
+
+async def _run(args) -> dict:
+    from app.main import app
+
+    async with ASGIDriver(app) as driver:
+        headers = await driver.login()
+        json_headers = {**headers, "content-type": "application/json"}
+        ids = list(range(1, args.count + 1))
+        result = {"count": args.count, "audit_mode": os.environ["AUDIT_MODE"]}
+
+        async def timed(label, coro_factory):
+            started = time.perf_counter()
+            statuses = await coro_factory()
+            result[label] = {"seconds": round(time.perf_counter() - started, 3), "status": sorted(set(statuses))}
+
+        async def per_asset_update():
+            body = json.dumps({"status": "repair", "location": "B1-01"}).encode()
+            return [(await driver.request("PUT", f"/api/assets/{asset_id}", json_headers, body))[0] for asset_id in ids]
+
+        async def batch_update():
+            body = json.dumps({"ids": ids, "changes": {"status": "retired", "location": "B1-02"}}).encode()
+            return [(await driver.request("PATCH", "/api/assets/batch", json_headers, body))[0]]
+
+        async def per_asset_delete():
+            return [(await driver.request("DELETE", f"/api/assets/{asset_id}", headers))[0] for asset_id in ids]
+
+        async def batch_delete():
+            body = json.dumps({"ids": [asset_id + args.count for asset_id in ids]}).encode()
+            return [(await driver.request("POST", "/api/assets/batch-delete", json_headers, body))[0]]
+
+        await timed("per_asset_update", per_asset_update)
+        await timed("batch_update", batch_update)
+        await timed("per_asset_delete", per_asset_delete)
+        await timed("batch_delete", batch_delete)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=100000)
+    parser.add_argument("--audit-mode", choices=["async", "strict"])
+    args = parser.parse_args()
+
+    if args.audit_mode:
+        os.environ["AUDIT_MODE"] = args.audit_mode
+        os.environ.setdefault("ADMIN_DEFAULT_PASSWORD", "Admin@123")
+        path = use_database(f"batch-ops-{args.audit_mode}")
+        for suffix in ("", "-wal", "-shm"):
+            candidate = path.with_name(path.name + suffix)
+            if candidate.exists():
+                candidate.unlink()
+        seed_assets(args.seed)
+        print(json.dumps(asyncio.run(_run(args))))
+        return
+
+    report = [
+        run_isolated("benchmarks.batch_ops", "--audit-mode", mode, "--count", str(args.count), "--seed", str(args.seed))
+        for mode in ("async", "strict")
+    ]
+    for result in report:
+        print(
+            f"audit={result['audit_mode']:<6} update: per-asset {result['per_asset_update']['seconds']:>7.2f} s  "
+            f"batch {result['batch_update']['seconds']:>6.3f} s   delete: per-asset {result['per_asset_delete']['seconds']:>7.2f} s  "
+            f"batch {result['batch_delete']['seconds']:>6.3f} s",
+            file=sys.stderr,
+        )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Downstream sync: re-reading the full asset list on a timer vs. following the change feed.
+
+    python -m benchmarks.change_feed --size 10000 --consumers 16 --duration 20
+
+A writer updates random assets at ``--write-rate`` per second, stamping the write
+time into ``note``. "poll" consumers page through ``GET /api/assets`` every
+``--interval`` seconds and diff it against their previous copy; "feed" consumers
+long-poll ``GET /api/assets/changes``. Both report bytes transferred, requests,
+server CPU time and how long a write took to reach the consumer.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from urllib.parse import quote
+
+from .common import ASGIDriver, percentiles, run_isolated, seed_assets, use_database
+
+
+async def _writer(driver, headers, args, deadline, written):
+    json_headers = {**headers, "content-type": "application/json"}
+    rng = random.Random(0)
+    while time.monotonic() < deadline:
+        body = json.dumps({"note": f"w{time.perf_counter():.6f}"}).encode()
+        await driver.request("PUT", f"/api/assets/{rng.randint(1, args.size)}", json_headers, body)
+        written[0] += 1
+        await asyncio.sleep(1 / args.write_rate)
+
+
+def _delay(note, seen_at, delays, seen):
+    if note and note.startswith("w") and note not in seen:
+        seen.add(note)
+        delays.append((seen_at - float(note[1:])) * 1000)
+
+
+async def _poll_consumer(driver, headers, args, deadline, totals, delays):
+    seen = set()
+    snapshot = None
+    while time.monotonic() < deadline:
+        started = time.monotonic()
+        notes, cursor = {}, None
+        while True:
+            path = f"/api/assets?limit={args.page_size}" + (f"&cursor={quote(cursor)}" if cursor else "")
+            status, response_headers, body = await driver.request("GET", path, headers)
+            totals["requests"] += 1
+            totals["bytes"] += len(body)
+            for asset in json.loads(body):
+                notes[asset["id"]] = asset["note"]
+            cursor = response_headers.get("x-next-cursor")
+            if not cursor:
+                break
+        seen_at = time.perf_counter()
+        if snapshot is not None:
+            for asset_id, note in notes.items():
+                if snapshot.get(asset_id) != note:
+                    _delay(note, seen_at, delays, seen)
+        snapshot = notes
+        await asyncio.sleep(max(0.0, args.interval - (time.monotonic() - started)))
+
+
+async def _feed_consumer(driver, headers, args, deadline, totals, delays):
+    seen = set()
+    _, _, body = await driver.request("GET", "/api/assets/changes", headers)
+    since = json.loads(body)["next"]
+    while time.monotonic() < deadline:
+        wait = max(0.0, min(args.interval, deadline - time.monotonic()))
+        _, _, body = await driver.request("GET", f"/api/assets/changes?since={since}&wait={wait:.2f}", headers)
+        totals["requests"] += 1
+        totals["bytes"] += len(body)
+        page = json.loads(body)
+        seen_at = time.perf_counter()
+        for change in page["changes"]:
+            if change["asset"]:
+                _delay(change["asset"]["note"], seen_at, delays, seen)
+        since = page["next"]
+
+
+async def _run(args) -> dict:
+    from app.main import app
+    from app.utils.change_feed import change_notifier
+
+    consumer = _poll_consumer if args.mode == "poll" else _feed_consumer
+    async with ASGIDriver(app) as driver:
+        headers = await driver.login()
+        totals, delays, written = {"requests": 0, "bytes": 0}, [], [0]
+        deadline = time.monotonic() + args.duration
+        cpu_started = time.process_time()
+        await asyncio.gather(
+            _writer(driver, headers, args, deadline, written),
+            *[consumer(driver, headers, args, deadline, totals, delays) for _ in range(args.consumers)],
+        )
+        cpu = time.process_time() - cpu_started
+    return {
+        "mode": args.mode,
+        "size": args.size,
+        "consumers": args.consumers,
+        "writes": written[0],
+        "requests": totals["requests"],
+        "megabytes": round(totals["bytes"] / 1024 / 1024, 2),
+        "cpu_seconds": round(cpu, 2),
+        "notifier_polls": change_notifier.polls,
+        "propagation": percentiles(delays),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=10000)
+    parser.add_argument("--consumers", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--interval", type=float, default=5, help="poll interval / long-poll wait in seconds")
+    parser.add_argument("--write-rate", type=float, default=5, help="asset updates per second")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--mode", choices=["poll", "feed"])
+    args = parser.parse_args()
+
+    if args.mode:
+        os.environ.setdefault("ADMIN_DEFAULT_PASSWORD", "Admin@123")
+        use_database(f"change-feed-{args.size}")
+        seed_assets(args.size)
+        print(json.dumps(asyncio.run(_run(args))))
+        return
+
+    options = [
+        "--size", str(args.size), "--consumers", str(args.consumers), "--duration", str(args.duration),
+        "--interval", str(args.interval), "--write-rate", str(args.write_rate), "--page-size", str(args.page_size),
+    ]
+    report = [run_isolated("benchmarks.change_feed", "--mode", mode, *options) for mode in ("poll", "feed")]
+    for result in report:
+        propagation = result["propagation"]
+        print(
+            f"{result['mode']:<5} requests {result['requests']:>6}  {result['megabytes']:>8.2f} MB  "
+            f"cpu {result['cpu_seconds']:>6.2f} s  propagation p50 {propagation.get('p50_ms', 0):>7.1f} ms  "
+            f"p99 {propagation.get('p99_ms', 0):>7.1f} ms",
+            file=sys.stderr,
+        )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
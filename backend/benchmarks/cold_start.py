@@ -0,0 +1,87 @@
+"""Cold start of N workers booting at once, against a fresh and an already initialized database.
+
+    python -m benchmarks.cold_start --workers 8
+
+Each worker is a fresh interpreter that imports ``app.main`` and runs the startup
+event, as ``uvicorn --workers N`` does; it reports ``app.bootstrap.startup_report``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+from .common import BACKEND_DIR, use_database
+
+
+def _worker() -> None:
+    from app.bootstrap import startup_report
+    from app.main import app
+
+    asyncio.run(app.router.startup())
+    asyncio.run(app.router.shutdown())
+    print(json.dumps(startup_report))
+
+
+def _boot(workers: int) -> dict:
+    started = time.perf_counter()
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.cold_start", "--worker"],
+            cwd=BACKEND_DIR,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        for _ in range(workers)
+    ]
+    reports, failures = [], []
+    for process in processes:
+        stdout, stderr = process.communicate()
+        if process.returncode == 0:
+            reports.append(json.loads(stdout.strip().splitlines()[-1]))
+        else:
+            failures.append(stderr.strip().splitlines()[-1] if stderr.strip() else f"exit {process.returncode}")
+    outcomes = {}
+    for report in reports:
+        outcomes[report["bootstrap"]] = outcomes.get(report["bootstrap"], 0) + 1
+    return {
+        "wall_seconds": round(time.perf_counter() - started, 3),
+        "failures": failures,
+        "outcomes": outcomes,
+        "import_seconds_max": max((report["import_seconds"] for report in reports), default=None),
+        "bootstrap_seconds": sorted(report["bootstrap_seconds"] for report in reports),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker()
+        return
+
+    path = use_database("cold-start")
+    for suffix in ("", "-wal", "-shm"):
+        candidate = path.with_name(path.name + suffix)
+        if candidate.exists():
+            candidate.unlink()
+    os.environ.setdefault("ADMIN_DEFAULT_PASSWORD", "Admin@123")
+    report = {"workers": args.workers, "fresh": _boot(args.workers), "initialized": _boot(args.workers)}
+    for scenario in ("fresh", "initialized"):
+        result = report[scenario]
+        print(
+            f"{scenario:<11} failures {len(result['failures']):>2}  outcomes {result['outcomes']}  "
+            f"bootstrap max {max(result['bootstrap_seconds'], default=0):.3f}s  wall {result['wall_seconds']:.2f}s",
+            file=sys.stderr,
+        )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
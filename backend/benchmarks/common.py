@@ -0,0 +1,219 @@
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = Path(os.getenv("BENCH_DATA_DIR", Path(tempfile.gettempdir()) / "asset-bench"))
+
+CATEGORIES = ["pc", "server", "switch", "router", "firewall", "ap"]
+STATUSES = ["in_use", "spare", "repair", "retired"]
+DEPTS = ["信息中心", "财务部", "人事部", "生产部", "研发部", "市场部"]
+BRANDS = ["Dell", "HP", "Lenovo", "Huawei", "H3C", "Cisco", "Ruijie"]
+
+
+def use_database(name: str) -> Path:
+    """Point the app at a benchmark database; call before importing ``app``."""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    path = DATA_DIR / f"{name}.db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+    return path
+
+
+ASSET_COLUMNS = [
+    "asset_code", "category", "brand", "model", "serial_number", "location", "owner_dept", "ip_address", "mac_address",
+    "ip_packed", "mac_normalized", "os_or_firmware", "status", "note", "created_at", "updated_at",
+]
+OS_VERSIONS = ["Windows 11", "Ubuntu 22.04", "VRP 8.1", "IOS 15.2"]
+_MODELS = [f"M{number}" for number in range(100, 1000)]
+LOCATIONS = [f"{floor}F-{room:02d}" for floor in range(1, 31) for room in range(1, 41)]
+BASE_TIME = datetime(2024, 1, 1)
+
+
+@lru_cache(maxsize=4096)
+def _stored_date(day: int) -> str:
+    return (BASE_TIME + timedelta(days=day)).strftime("%Y-%m-%d")
+
+
+def stored_time(offset_seconds: int) -> str:
+    """``BASE_TIME`` plus whole seconds, formatted as SQLAlchemy stores ``DateTime`` in SQLite."""
+    day, seconds = divmod(offset_seconds, 86400)
+    return f"{_stored_date(day)} {seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}.000000"
+
+
+def asset_rows(count: int, seed: int = 42, batch_size: int = 10000) -> Iterator[Tuple]:
+    """Asset rows as tuples in ``ASSET_COLUMNS`` order, timestamps formatted the way SQLAlchemy stores them.
+
+    Attributes are drawn a batch at a time; IP, MAC and asset code follow the row
+    index (``10.a.b.c`` and the index as a 48-bit MAC), and rows are 7 seconds apart.
+    """
+    from app.utils.network import normalize_mac, pack_ip
+
+    rng = random.Random(seed)
+    for start in range(0, count, batch_size):
+        size = min(batch_size, count - start)
+        columns = zip(
+            rng.choices(CATEGORIES, k=size),
+            rng.choices(BRANDS, k=size),
+            rng.choices(_MODELS, k=size),
+            rng.choices(LOCATIONS, k=size),
+            rng.choices(DEPTS, k=size),
+            rng.choices(OS_VERSIONS, k=size),
+            rng.choices(STATUSES, k=size),
+        )
+        for index, (category, brand, model, location, dept, os_version, status) in enumerate(columns, start):
+            stamp = stored_time(index * 7)
+            ip_address = f"10.{(index >> 16) & 255}.{(index >> 8) & 255}.{index & 255}"
+            digits = f"{index:012x}"
+            mac_address = ":".join(digits[offset:offset + 2] for offset in range(0, 12, 2))
+            yield (
+                f"AS-{index:08d}", category, brand, model, f"SN{rng.getrandbits(40):010X}", location, dept,
+                ip_address, mac_address, pack_ip(ip_address), normalize_mac(mac_address), os_version, status, None,
+                stamp, stamp,
+            )
+
+
+def generate_assets(count: int, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """``asset_rows`` as dicts with ``datetime`` timestamps, for ORM/Core inserts."""
+    for row in asset_rows(count, seed):
+        item = dict(zip(ASSET_COLUMNS, row))
+        item["created_at"] = item["updated_at"] = datetime.fromisoformat(item["created_at"])
+        yield item
+
+
+def seed_assets(count: int) -> None:
+    """Load ``count`` generated assets unless the database already holds exactly that many."""
+    from .generate import ensure_inventory
+
+    ensure_inventory(count)
+
+
+def peak_rss_mb() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+
+def timed(fn: Callable[[], Any], repeat: int = 1) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {"min_ms": round(samples[0], 2), "median_ms": round(samples[len(samples) // 2], 2)}
+
+
+def run_isolated(module: str, *args: str) -> Dict[str, Any]:
+    """Run one scenario in a fresh interpreter so peak RSS is attributable to it."""
+    output = subprocess.run(
+        [sys.executable, "-m", module, *args],
+        cwd=BACKEND_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pick(fraction: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 2)
+
+    return {"count": len(ordered), "p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99), "max_ms": round(ordered[-1], 2)}
+
+
+class ASGIDriver:
+    """Minimal in-process HTTP client that calls an ASGI app directly (no sockets)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __aenter__(self) -> "ASGIDriver":
+        await self.app.router.startup()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.app.router.shutdown()
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        headers: Optional[Dict[str, str]] = None,
+        body: bytes = b"",
+        client: Tuple[str, int] = ("127.0.0.1", 50000),
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        path, _, query = path.partition("?")
+        raw_headers = [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()]
+        if body:
+            raw_headers.append((b"content-length", str(len(body)).encode()))
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": raw_headers,
+            "client": client,
+            "server": ("bench", 80),
+        }
+        finished = asyncio.Event()
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        status, response_headers, chunks = 0, {}, []
+
+        async def send(message):
+            nonlocal status, response_headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers = {key.decode(): value.decode() for key, value in message.get("headers", [])}
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body"):
+                    finished.set()
+
+        await self.app(scope, receive, send)
+        finished.set()
+        return status, response_headers, b"".join(chunks)
+
+    async def login(self, username: str = "admin", password: Optional[str] = None) -> Dict[str, str]:
+        if password is None:
+            from app.config import get_settings
+
+            password = get_settings().admin_default_password
+        status, _, body = await self.request(
+            "POST",
+            "/api/login",
+            {"content-type": "application/json"},
+            json.dumps({"username": username, "password": password}).encode(),
+        )
+        if status != 200:
+            raise RuntimeError(f"login failed: {status} {body[:200]!r}")
+        return {"authorization": f"Bearer {json.loads(body)['token']['access_token']}"}
@@ -0,0 +1,100 @@
+"""Compare two benchmark JSON files and flag regressions beyond a threshold.
+
+    python -m benchmarks.compare before.json after.json --threshold 10
+
+Accepts the output of ``benchmarks.suite`` or of any single benchmark. Only
+metrics with a known direction are compared: latencies and durations (``*_ms``,
+``*_us``, ``us_per_op``, ``*_seconds``) are better when lower, throughputs
+(``*per_sec``) when higher; counts and settings are ignored. List items are
+matched by their ``workload``/``mode``/``size`` field when present. Exits with
+status 1 when any metric regressed, so it can gate CI.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+LOWER_IS_BETTER = ("_ms", "_us", "us_per_op", "_seconds")
+HIGHER_IS_BETTER = ("per_sec",)
+LIST_KEYS = ("workload", "mode", "size", "name")
+# 配置项不代表性能；单个最大值受偶发停顿影响过大，也不参与比较
+IGNORED = {"duration_seconds", "interval_ms", "warmup_seconds", "max_ms"}
+
+
+def _direction(name: str) -> Optional[int]:
+    if name in IGNORED:
+        return None
+    if name.endswith(HIGHER_IS_BETTER):
+        return 1
+    if name.endswith(LOWER_IS_BETTER):
+        return -1
+    return None
+
+
+def _label(item: Any, index: int) -> str:
+    if isinstance(item, dict):
+        for key in LIST_KEYS:
+            if key in item:
+                return f"{key}={item[key]}"
+    return str(index)
+
+
+def flatten(data: Any, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    """``(dotted path, value)`` for every numeric leaf; ``meta`` is skipped."""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if key == "meta" and not prefix:
+                continue
+            yield from flatten(value, f"{prefix}.{key}" if prefix else key)
+    elif isinstance(data, list):
+        for index, item in enumerate(data):
+            label = _label(item, index)
+            yield from flatten(item, f"{prefix}[{label}]")
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        yield prefix, float(data)
+
+
+def compare(before: Any, after: Any, threshold: float) -> Dict[str, Any]:
+    old = dict(flatten(before))
+    rows, regressions = [], 0
+    for path, value in flatten(after):
+        direction = _direction(path.rsplit(".", 1)[-1])
+        if direction is None or path not in old or old[path] == 0:
+            continue
+        change = (value - old[path]) / old[path] * 100
+        # 正数表示变好，负数表示变差
+        gain = change * direction
+        status = "regressed" if gain < -threshold else "improved" if gain > threshold else ""
+        regressions += status == "regressed"
+        rows.append({"metric": path, "before": old[path], "after": value, "change_pct": round(change, 1), "status": status})
+    return {"threshold_pct": threshold, "regressions": regressions, "metrics": rows}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("before", type=Path)
+    parser.add_argument("after", type=Path)
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change counted as a regression")
+    parser.add_argument("--all", action="store_true", help="also list metrics within the threshold")
+    args = parser.parse_args()
+
+    before, after = (json.loads(path.read_text()) for path in (args.before, args.after))
+    result = compare(before, after, args.threshold)
+    for side, data in (("before", before), ("after", after)):
+        if isinstance(data, dict) and "meta" in data:
+            meta = data["meta"]
+            print(f"{side:<6} {meta.get('commit') or '?'}{' (dirty)' if meta.get('dirty') else ''}  {meta.get('created_at', '')}", file=sys.stderr)
+    for row in result["metrics"]:
+        if row["status"] or args.all:
+            print(
+                f"{row['status'] or 'same':<9} {row['metric']:<60} {row['before']:>12.2f} -> {row['after']:>12.2f}  {row['change_pct']:+.1f}%",
+                file=sys.stderr,
+            )
+    print(f"{result['regressions']} regression(s) beyond {args.threshold:g}% in {len(result['metrics'])} metrics", file=sys.stderr)
+    print(json.dumps(result, indent=2))
+    sys.exit(1 if result["regressions"] else 0)
+
+
+if __name__ == "__main__":
+    main()
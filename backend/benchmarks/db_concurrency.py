@@ -0,0 +1,121 @@
+"""Concurrent read/write throughput and lock errors: bare engine vs. tuned engine.
+
+    python -m benchmarks.db_concurrency --writers 8 --readers 16 --duration 10
+
+``legacy`` is the previous ``create_engine(url, connect_args={"check_same_thread": False})``
+(NullPool, rollback journal); ``tuned`` is ``app.database.build_engine`` with the
+default settings (QueuePool, WAL, synchronous=NORMAL, busy_timeout, mmap).
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+
+from .common import run_isolated, use_database
+
+
+def _scenario(mode: str, args) -> None:
+    path = use_database(f"dbconc-{mode}")
+    for suffix in ("", "-wal", "-shm"):
+        candidate = path.with_name(path.name + suffix)
+        if candidate.exists():
+            candidate.unlink()
+
+    from sqlalchemy import create_engine, func, insert, select
+    from sqlalchemy.exc import OperationalError
+    from sqlalchemy.orm import sessionmaker
+
+    from app import models
+    from app.config import get_settings
+    from app.database import Base, build_engine
+    from benchmarks.common import generate_assets
+
+    url = f"sqlite:///{path}"
+    if mode == "legacy":
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+    else:
+        engine = build_engine(url, get_settings())
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.Asset), list(generate_assets(args.seed)))
+    Session = sessionmaker(bind=engine)
+
+    counters = {"reads": 0, "writes": 0, "lock_errors": 0, "other_errors": 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+
+    def bump(key):
+        with lock:
+            counters[key] += 1
+
+    def writer(index):
+        serial = 0
+        while time.monotonic() < deadline:
+            session = Session()
+            try:
+                code = f"W{index}-{serial}"
+                session.execute(select(models.Asset.id).where(models.Asset.asset_code == code)).first()
+                session.add(models.Asset(asset_code=code, category="pc", status="in_use"))
+                session.commit()
+                bump("writes")
+            except OperationalError as exc:
+                session.rollback()
+                bump("lock_errors" if "locked" in str(exc) else "other_errors")
+            finally:
+                session.close()
+            serial += 1
+
+    def reader(index):
+        while time.monotonic() < deadline:
+            session = Session()
+            try:
+                session.execute(
+                    select(models.Asset).where(models.Asset.category == "server").order_by(models.Asset.updated_at.desc()).limit(50)
+                ).all()
+                session.execute(select(func.count()).select_from(models.Asset)).scalar()
+                bump("reads")
+            except OperationalError as exc:
+                bump("lock_errors" if "locked" in str(exc) else "other_errors")
+            finally:
+                session.close()
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counters.update(
+        mode=mode,
+        writes_per_sec=round(counters["writes"] / args.duration, 1),
+        reads_per_sec=round(counters["reads"] / args.duration, 1),
+    )
+    print(json.dumps(counters))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=50000, help="assets loaded before the run")
+    parser.add_argument("--mode", choices=["legacy", "tuned"])
+    args = parser.parse_args()
+
+    if args.mode:
+        _scenario(args.mode, args)
+        return
+    options = ["--writers", str(args.writers), "--readers", str(args.readers), "--duration", str(args.duration), "--seed", str(args.seed)]
+    report = [run_isolated("benchmarks.db_concurrency", "--mode", mode, *options) for mode in ("legacy", "tuned")]
+    for result in report:
+        print(
+            f"{result['mode']:<7} writes {result['writes_per_sec']:>8.1f}/s  reads {result['reads_per_sec']:>8.1f}/s  "
+            f"lock errors {result['lock_errors']}",
+            file=sys.stderr,
+        )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""Synthetic inventory for benchmarks and load tests: assets, users and audit rows, 10k to 10M.
+
+    python -m benchmarks.generate --assets 1000000 --users 1000 --audit 2000000
+
+Rows are written with ``executemany`` in large batches while the secondary
+indexes and the per-row triggers on the loaded tables (full-text index,
+statistics, history, change feed, table versions) are dropped; afterwards the
+indexes are rebuilt, the derived tables are filled once with set-based
+statements and the triggers restored. The result matches what
+inserting through the API would leave behind, minus the change feed, and the
+same seed always produces the same rows.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+import orjson
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .common import ASSET_COLUMNS, DEPTS, LOCATIONS, OS_VERSIONS, STATUSES, asset_rows, stored_time, use_database
+
+# 生成用户的统一密码，供负载测试以任意用户登录
+BENCH_USER_PASSWORD = "Bench@123"
+LOADED_TABLES = ("assets", "asset_history", "users", "audit_logs", "audit_changes")
+# 审计操作的比例大致与线上相当：查询不记审计，修改远多于新增与删除
+AUDIT_ACTIONS = [("LOGIN", 30), ("UPDATE", 55), ("CREATE", 10), ("DELETE", 5)]
+AUDIT_FIELDS = {
+    "status": STATUSES,
+    "location": LOCATIONS,
+    "owner_dept": DEPTS,
+    "os_or_firmware": OS_VERSIONS,
+}
+
+
+def _batches(rows: Iterator[Tuple], size: int) -> Iterator[List[Tuple]]:
+    batch: List[Tuple] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def user_rows(count: int, roles: Dict[str, int], password_hash: str, seed: int = 42) -> Iterator[Tuple]:
+    rng = random.Random(seed)
+    created = stored_time(0)
+    for index in range(count):
+        role = "editor" if index % 5 == 0 else "viewer"
+        yield (
+            f"user{index:07d}", password_hash, f"用户{index}", rng.choice(DEPTS), roles[role], 1, created, created, 1
+        )
+
+
+def audit_rows(count: int, asset_count: int, user_ids: Sequence[int], first_id: int, seed: int = 42):
+    """``(audit_logs row, audit_changes rows)`` per event, spread evenly over 2024 in time order."""
+    rng = random.Random(seed)
+    actions = [name for name, weight in AUDIT_ACTIONS for _ in range(weight)]
+    fields = list(AUDIT_FIELDS)
+    login_detail = orjson.dumps("用户登录").decode()
+    step = 365 * 86400 / max(count, 1)
+    for index in range(count):
+        audit_id = first_id + index
+        action = rng.choice(actions)
+        user_id = rng.choice(user_ids)
+        stamp = stored_time(int(index * step))
+        changes: List[Tuple] = []
+        if action == "LOGIN":
+            log = (audit_id, user_id, action, "users", user_id, None, login_detail, stamp)
+        else:
+            asset_id = rng.randint(1, max(asset_count, 1))
+            asset_code = f"AS-{asset_id - 1:08d}"
+            detail: Any
+            if action == "UPDATE":
+                changed = fields[rng.randrange(len(fields)):][:rng.randint(1, 2)]
+                detail = {field: rng.sample(AUDIT_FIELDS[field], 2) for field in changed}
+                changes = [(audit_id, "assets", asset_id, field, old, new, stamp) for field, (old, new) in detail.items()]
+            else:
+                detail = {"asset_code": asset_code}
+            log = (audit_id, user_id, action, "assets", asset_id, asset_code, orjson.dumps(detail).decode(), stamp)
+        yield log, changes
+
+
+def load_inventory(assets: int, users: int = 0, audit: int = 0, seed: int = 42, batch_size: int = 50000) -> Dict[str, Any]:
+    """Replace the assets, generated users and audit rows of the current database; returns counts and timings."""
+    from app.auth import get_password_hash
+    from app.bootstrap import bootstrap
+    from app.database import engine
+    from app.migrations import analyze
+    from app.utils.history import backfill_history
+    from app.utils.search import rebuild_search_index
+    from app.utils.stats import rebuild_stats
+
+    bootstrap(engine)
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        placeholders = ", ".join("?" for _ in LOADED_TABLES)
+        triggers, indexes = [], []
+        for kind, saved in (("trigger", triggers), ("index", indexes)):
+            # 主键与约束自带的自动索引（sql 为空）无法删除，保留
+            saved.extend(
+                conn.exec_driver_sql(
+                    f"SELECT name, sql FROM sqlite_master WHERE type = ? AND sql IS NOT NULL AND tbl_name IN ({placeholders})",
+                    (kind, *LOADED_TABLES),
+                ).all()
+            )
+            for name, _ in saved:
+                conn.exec_driver_sql(f"DROP {kind.upper()} {name}")
+        for table in ("audit_changes", "audit_logs", "asset_history", "asset_changes", "assets"):
+            conn.exec_driver_sql(f"DELETE FROM {table}")
+        conn.exec_driver_sql("DELETE FROM users WHERE username LIKE 'user%'")
+
+        insert_assets = f"INSERT INTO assets ({', '.join(ASSET_COLUMNS)}) VALUES ({', '.join('?' for _ in ASSET_COLUMNS)})"
+        for batch in _batches(asset_rows(assets, seed), batch_size):
+            conn.exec_driver_sql(insert_assets, batch)
+        timings["assets_seconds"] = time.perf_counter() - started
+
+        mark = time.perf_counter()
+        roles = dict(conn.exec_driver_sql("SELECT role_name, id FROM roles").all())
+        password_hash = get_password_hash(BENCH_USER_PASSWORD)
+        for batch in _batches(user_rows(users, roles, password_hash, seed), batch_size):
+            conn.exec_driver_sql(
+                "INSERT INTO users (username, password_hash, display_name, dept, role_id, is_active, created_at, updated_at, version) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                batch,
+            )
+        user_ids = [row[0] for row in conn.exec_driver_sql("SELECT id FROM users ORDER BY id").all()]
+        timings["users_seconds"] = time.perf_counter() - mark
+
+        mark = time.perf_counter()
+        for batch in _batches(audit_rows(audit, assets, user_ids, 1, seed), batch_size):
+            conn.exec_driver_sql(
+                "INSERT INTO audit_logs (id, user_id, action, target_table, target_id, asset_code, detail, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [log for log, _ in batch],
+            )
+            changes = [change for _, item_changes in batch for change in item_changes]
+            if changes:
+                conn.exec_driver_sql(
+                    "INSERT INTO audit_changes (audit_log_id, target_table, target_id, field, old_value, new_value, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    changes,
+                )
+        timings["audit_seconds"] = time.perf_counter() - mark
+
+        # 索引在数据写完后一次性排序建立，比逐行随机插入 B 树快得多；派生数据按全表重建后再恢复触发器
+        mark = time.perf_counter()
+        for _, sql in indexes:
+            conn.exec_driver_sql(sql)
+        timings["index_seconds"] = time.perf_counter() - mark
+        mark = time.perf_counter()
+        rebuild_search_index(conn)
+        rebuild_stats(conn)
+        backfill_history(conn)
+        for _, sql in triggers:
+            conn.exec_driver_sql(sql)
+        conn.exec_driver_sql("UPDATE table_versions SET version = version + 1, updated_at = datetime('now')")
+        analyze(conn)
+        timings["derived_seconds"] = time.perf_counter() - mark
+    timings["total_seconds"] = time.perf_counter() - started
+    return {
+        "assets": assets,
+        "users": len(user_ids),
+        "audit_logs": audit,
+        **{key: round(value, 2) for key, value in timings.items()},
+        "assets_per_sec": round(assets / timings["assets_seconds"]) if assets else 0,
+    }
+
+
+def ensure_inventory(assets: int, users: Optional[int] = None, audit: Optional[int] = None, seed: int = 42) -> bool:
+    """Load unless the database already holds these counts (``None`` accepts any); returns whether it loaded."""
+    from app.bootstrap import bootstrap
+    from app.database import engine
+
+    bootstrap(engine)
+    with engine.connect() as conn:
+        current = (
+            conn.exec_driver_sql("SELECT count(*) FROM assets").scalar(),
+            conn.exec_driver_sql("SELECT count(*) FROM users WHERE username LIKE 'user%'").scalar(),
+            conn.exec_driver_sql("SELECT count(*) FROM audit_logs").scalar(),
+        )
+    wanted = (assets, users, audit)
+    if all(expected is None or expected == actual for expected, actual in zip(wanted, current)):
+        return False
+    load_inventory(assets, users or 0, audit or 0, seed)
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--assets", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--audit", type=int, default=100000, help="audit log rows")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--name", help="database name under BENCH_DATA_DIR, defaults to inventory-<assets>")
+    args = parser.parse_args()
+
+    path = use_database(args.name or f"inventory-{args.assets}")
+    result = load_inventory(args.assets, args.users, args.audit, args.seed)
+    result["database"] = str(path)
+    result["size_mb"] = round(path.stat().st_size / (1024 * 1024), 1)
+    print(
+        f"{result['assets']} assets ({result['assets_per_sec']}/s), {result['users']} users, {result['audit_logs']} audit rows "
+        f"in {result['total_seconds']:.1f}s -> {path} ({result['size_mb']} MB)",
+        file=sys.stderr,
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
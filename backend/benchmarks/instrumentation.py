@@ -0,0 +1,139 @@
+"""Per-request cost of the instrumentation: disabled, metrics, metrics plus slow-query log, and a profiled request.
+
+    python -m benchmarks.instrumentation --requests 3000
+
+One client issues requests back to back so the difference between modes is the
+per-request overhead, not queueing. Each mode runs in a fresh interpreter
+because the settings are read at import time, and the modes alternate over
+``--rounds`` with the median reported, since run-to-run noise is larger than
+the overhead itself. The two hot paths are also timed directly: one
+``SELECT 1`` (cursor events) and one call through the route wrapper around an
+empty ASGI app. The slow-query threshold is set high enough that nothing is
+logged, which is the common production case.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import timeit
+
+from .common import ASGIDriver, percentiles, run_isolated, seed_assets, use_database
+
+MODES = {
+    "off": {},
+    "metrics": {"METRICS_ENABLED": "true"},
+    "metrics_slow_log": {"METRICS_ENABLED": "true", "SLOW_QUERY_MS": "1000"},
+    "profile_token": {"PROFILE_TOKEN": "bench"},
+}
+PATHS = [
+    "/api/assets?limit=50",
+    "/api/assets?limit=50&status=in_use",
+    "/api/assets/stats",
+] + [f"/api/assets/{asset_id}" for asset_id in range(1, 11)]
+
+
+async def _empty_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _wrapper_us(route_app, count: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": []}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(count):
+        await route_app(scope, None, send)
+    return (time.perf_counter() - started) * 1e6 / count
+
+
+async def _run(args) -> dict:
+    from app.database import engine
+    from app.main import app
+    from app.utils.metrics import InstrumentedRoute
+
+    with engine.connect() as conn:
+        select_us = timeit.timeit(lambda: conn.exec_driver_sql("SELECT 1").scalar(), number=20000) / 20000 * 1e6
+    wrapped = InstrumentedRoute(_empty_app, "/bench") if args.mode != "off" else _empty_app
+
+    async with ASGIDriver(app) as driver:
+        headers = await driver.login()
+        for path in PATHS:
+            await driver.request("GET", path, headers)
+        samples = []
+        for index in range(args.requests):
+            started = time.perf_counter()
+            status, _, _ = await driver.request("GET", PATHS[index % len(PATHS)], headers)
+            samples.append((time.perf_counter() - started) * 1000)
+            if status != 200:
+                raise RuntimeError(f"{PATHS[index % len(PATHS)]}: {status}")
+        result = {
+            "mode": args.mode,
+            "latency": percentiles(samples),
+            "mean_ms": round(sum(samples) / len(samples), 4),
+            "select_us": round(select_us, 2),
+            "wrapper_us": round(await _wrapper_us(wrapped, 20000), 2),
+        }
+        if args.mode == "profile_token":
+            # 携带 X-Profile 的请求：包括采样线程启动与写出 folded 文件
+            profiled = []
+            for index in range(20):
+                started = time.perf_counter()
+                await driver.request("GET", PATHS[index % len(PATHS)], {**headers, "x-profile": "bench"})
+                profiled.append((time.perf_counter() - started) * 1000)
+            result["profiled"] = percentiles(profiled)
+        if args.mode.startswith("metrics"):
+            _, _, body = await driver.request("GET", "/metrics", {})
+            result["metrics_bytes"] = len(body)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--mode", choices=list(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        # 关闭响应缓存，每个请求都实际执行 SQL，SQL 事件的开销计入其中
+        os.environ["RESPONSE_CACHE_BACKEND"] = "none"
+        os.environ["PROFILE_DIR"] = str(use_database(f"instrumentation-{args.size}").parent / "profiles")
+        os.environ.setdefault("ADMIN_DEFAULT_PASSWORD", "Admin@123")
+        os.environ.update(MODES[args.mode])
+        print(json.dumps(asyncio.run(_run(args))))
+        return
+
+    use_database(f"instrumentation-{args.size}")
+    seed_assets(args.size)
+    runs = {mode: [] for mode in MODES}
+    for _ in range(args.rounds):
+        for mode in MODES:
+            runs[mode].append(
+                run_isolated("benchmarks.instrumentation", "--mode", mode, "--size", str(args.size), "--requests", str(args.requests))
+            )
+    results = []
+    for mode, mode_runs in runs.items():
+        result = {"mode": mode, "runs": mode_runs}
+        for key in ("mean_ms", "select_us", "wrapper_us"):
+            result[key] = statistics.median(run[key] for run in mode_runs)
+        results.append(result)
+        line = (
+            f"{mode:<17} request mean {result['mean_ms']:.3f}ms ({(result['mean_ms'] - results[0]['mean_ms']) * 1000:+.0f}us)  "
+            f"SELECT 1 {result['select_us']:.1f}us ({result['select_us'] - results[0]['select_us']:+.1f}us)  "
+            f"route wrapper {result['wrapper_us']:.1f}us ({result['wrapper_us'] - results[0]['wrapper_us']:+.1f}us)"
+        )
+        if "profiled" in mode_runs[0]:
+            line += f"  profiled request p50 {mode_runs[0]['profiled']['p50_ms']:.2f}ms"
+        print(line, file=sys.stderr)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Compare the legacy full-list response with keyset pages and NDJSON streaming.
+
+    python -m benchmarks.list_assets --sizes 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from .common import peak_rss_mb, run_isolated, seed_assets, timed, use_database
+
+SCENARIOS = ["legacy", "page", "ndjson"]
+
+
+async def _drain(body_iterator) -> None:
+    async for _ in body_iterator:
+        pass
+
+
+def _scenario(name: str) -> None:
+    from fastapi import Request
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import parse_obj_as
+
+    from app import models, schemas
+    from app.database import SessionLocal
+    from app.routers import assets
+
+    filters = assets.AssetFilterParams()
+    principal = schemas.Principal(
+        id=1, username="admin", is_active=True, role_id=1, **{field: True for field in schemas.PERMISSION_FIELDS}
+    )
+
+    def call(db, output_format: str, limit=None):
+        request = Request({"type": "http", "method": "GET", "path": "/api/assets", "query_string": b"", "headers": []})
+        return assets.list_assets(
+            request=request, filters=filters, cursor=None, limit=limit, output_format=output_format, as_of=None, db=db, current_user=principal
+        )
+
+    def legacy():
+        db = SessionLocal()
+        try:
+            rows = db.query(models.Asset).order_by(models.Asset.updated_at.desc()).all()
+            json.dumps(jsonable_encoder(parse_obj_as(list[schemas.AssetOut], rows)))
+        finally:
+            db.close()
+
+    def page():
+        db = SessionLocal()
+        try:
+            # 分页响应已由处理函数编码为 JSON
+            call(db, "json", 100)
+        finally:
+            db.close()
+
+    def ndjson():
+        db = SessionLocal()
+        try:
+            response = call(db, "ndjson")
+            asyncio.run(_drain(response.body_iterator))
+        finally:
+            db.close()
+
+    result = timed({"legacy": legacy, "page": page, "ndjson": ndjson}[name])
+    result["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    print(json.dumps(result))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--scenario", choices=["seed", *SCENARIOS])
+    parser.add_argument("--size", type=int)
+    args = parser.parse_args()
+
+    if args.scenario == "seed":
+        use_database(f"assets-{args.size}")
+        seed_assets(args.size)
+        print(json.dumps({"seeded": args.size}))
+        return
+    if args.scenario:
+        use_database(f"assets-{args.size}")
+        _scenario(args.scenario)
+        return
+
+    report = []
+    for size in args.sizes:
+        run_isolated("benchmarks.list_assets", "--scenario", "seed", "--size", str(size))
+        for scenario in SCENARIOS:
+            result = run_isolated("benchmarks.list_assets", "--scenario", scenario, "--size", str(size))
+            result.update(size=size, scenario=scenario)
+            report.append(result)
+            print(f"{size:>9} {scenario:<8} {result['min_ms']:>10.1f} ms {result['peak_rss_mb']:>8.1f} MB", file=sys.stderr)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
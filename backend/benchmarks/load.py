@@ -0,0 +1,205 @@
+"""In-process load test: throughput and p50/p95/p99 latency for mixed read/write workloads.
+
+    python -m benchmarks.load --workload mixed --clients 32 --duration 30
+
+Each client is a task that picks operations by weight from the workload, using
+its own seeded RNG so the same sequence is replayed on every run. Clients act
+as generated editor accounts (tokens are minted directly, without bcrypt);
+``login`` operations do go through ``POST /api/login``. Requests issued during
+``--warmup`` are not recorded. Every workload runs in a fresh interpreter
+against the same generated inventory, so results are comparable across commits;
+assets created by a run are deleted afterwards, updates are kept.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+from .common import CATEGORIES, DEPTS, STATUSES, ASGIDriver, percentiles, run_isolated, use_database
+from .generate import BENCH_USER_PASSWORD, ensure_inventory
+
+# 操作权重；update 为读取后带 If-Match 修改，与前端编辑资产的请求序列一致。
+# 一次登录的 bcrypt 计算相当于数百次读请求，单独作为 login 负载，避免淹没其他负载的结果
+WORKLOADS = {
+    "read": {"list": 45, "get": 35, "search": 10, "stats": 10},
+    "mixed": {"list": 35, "get": 25, "search": 10, "stats": 5, "update": 20, "create": 5},
+    "write": {"get": 20, "update": 60, "create": 20},
+    "login": {"login": 5, "list": 50, "get": 45},
+}
+SEARCH_TERMS = ["huawei", "cisco", "dell", "ubuntu", "windows", "vrp", "m12", "lenovo"]
+
+
+async def _list(driver, headers, rng, state) -> int:
+    filters = rng.choice(["", f"&category={rng.choice(CATEGORIES)}", f"&status={rng.choice(STATUSES)}", f"&owner_dept={rng.choice(DEPTS)}"])
+    status, _, _ = await driver.request("GET", f"/api/assets?limit=50{filters}", headers)
+    return status
+
+
+async def _get(driver, headers, rng, state) -> int:
+    status, _, _ = await driver.request("GET", f"/api/assets/{rng.randint(1, state['size'])}", headers)
+    return status
+
+
+async def _search(driver, headers, rng, state) -> int:
+    status, _, _ = await driver.request("GET", f"/api/assets?limit=20&q={rng.choice(SEARCH_TERMS)}", headers)
+    return status
+
+
+async def _stats(driver, headers, rng, state) -> int:
+    status, _, _ = await driver.request("GET", "/api/assets/stats", headers)
+    return status
+
+
+async def _update(driver, headers, rng, state) -> int:
+    path = f"/api/assets/{rng.randint(1, state['size'])}"
+    status, response_headers, _ = await driver.request("GET", path, headers)
+    if status != 200:
+        return status
+    body = json.dumps({"status": rng.choice(STATUSES), "location": f"{rng.randint(1, 30)}F-{rng.randint(1, 40):02d}"}).encode()
+    request_headers = {**headers, "content-type": "application/json", "if-match": response_headers.get("etag", "")}
+    status, _, _ = await driver.request("PUT", path, request_headers, body)
+    return status
+
+
+async def _create(driver, headers, rng, state) -> int:
+    state["created"] += 1
+    body = json.dumps(
+        {
+            "asset_code": f"LD-{state['run']}-{state['created']:07d}",
+            "category": rng.choice(CATEGORIES),
+            "status": rng.choice(STATUSES),
+            "owner_dept": rng.choice(DEPTS),
+            "brand": "Bench",
+        }
+    ).encode()
+    status, _, _ = await driver.request("POST", "/api/assets", {**headers, "content-type": "application/json"}, body)
+    return status
+
+
+async def _login(driver, headers, rng, state) -> int:
+    state["logins"] += 1
+    body = json.dumps({"username": f"user{rng.randrange(state['users']):07d}", "password": BENCH_USER_PASSWORD}).encode()
+    # 每次登录使用不同的来源 IP，避免触发单 IP 限流
+    client = (f"10.201.{state['logins'] // 250 % 250}.{state['logins'] % 250 + 1}", 40000)
+    status, _, _ = await driver.request("POST", "/api/login", {"content-type": "application/json"}, body, client)
+    return status
+
+
+OPERATIONS: Dict[str, Callable] = {
+    "list": _list,
+    "get": _get,
+    "search": _search,
+    "stats": _stats,
+    "update": _update,
+    "create": _create,
+    "login": _login,
+}
+
+
+async def _client(driver, index: int, args, state, started_at: float, deadline: float, samples: Dict[str, List]) -> None:
+    from app.auth import create_access_token
+
+    rng = random.Random(args.seed * 10007 + index)
+    # 生成的用户中序号为 5 的倍数的是编辑者，具备修改权限
+    headers = {"authorization": f"Bearer {create_access_token(f'user{index * 5 % args.users:07d}')}"}
+    names, weights = zip(*WORKLOADS[args.workload].items())
+    while time.monotonic() < deadline:
+        name = rng.choices(names, weights)[0]
+        started = time.perf_counter()
+        status = await OPERATIONS[name](driver, headers, rng, state)
+        if time.monotonic() >= started_at:
+            samples[name].append(((time.perf_counter() - started) * 1000, status))
+
+
+def _remove_created(run: str) -> None:
+    # 删除本次新增的资产，资产总数不变，下次运行无需重新生成数据
+    from app.database import engine
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM assets WHERE asset_code LIKE ?", (f"LD-{run}-%",))
+
+
+async def _run(args) -> Dict[str, Any]:
+    from app.main import app
+
+    state = {"size": args.size, "users": args.users, "run": f"{int(time.time() * 1000):x}", "created": 0, "logins": 0}
+    samples: Dict[str, List] = {name: [] for name in WORKLOADS[args.workload]}
+    async with ASGIDriver(app) as driver:
+        started_at = time.monotonic() + args.warmup
+        deadline = started_at + args.duration
+        await asyncio.gather(*[_client(driver, index, args, state, started_at, deadline, samples) for index in range(args.clients)])
+    _remove_created(state["run"])
+
+    operations = {}
+    for name, items in samples.items():
+        statuses: Dict[str, int] = {}
+        for _, status in items:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        operations[name] = {**percentiles([latency for latency, _ in items]), "status": statuses}
+    every = [latency for items in samples.values() for latency, _ in items]
+    # 304 为条件请求命中，409 为并发修改冲突，均属正常结果
+    errors = sum(1 for items in samples.values() for _, status in items if status >= 400 and status != 409)
+    return {
+        "workload": args.workload,
+        "clients": args.clients,
+        "duration_seconds": args.duration,
+        "requests": len(every),
+        "requests_per_sec": round(len(every) / args.duration, 1),
+        "errors": errors,
+        "latency": percentiles(every),
+        "operations": operations,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workload", nargs="+", choices=list(WORKLOADS), default=["read", "mixed", "write", "login"])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds per workload")
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--size", type=int, default=100000, help="assets in the generated inventory")
+    parser.add_argument("--users", type=int, default=1000, help="generated users, at least 5 x clients")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    use_database(f"inventory-{args.size}")
+    if args.child:
+        args.workload = args.workload[0]
+        print(json.dumps(asyncio.run(_run(args))))
+        return
+
+    if args.users < args.clients * 5:
+        parser.error("--users must be at least 5 x --clients so every client acts as a distinct editor")
+    ensure_inventory(args.size, users=args.users)
+    results = []
+    for workload in args.workload:
+        result = run_isolated(
+            "benchmarks.load",
+            "--child",
+            "--workload", workload,
+            "--clients", str(args.clients),
+            "--duration", str(args.duration),
+            "--warmup", str(args.warmup),
+            "--size", str(args.size),
+            "--users", str(args.users),
+            "--seed", str(args.seed),
+        )
+        results.append(result)
+        latency = result["latency"]
+        print(
+            f"{workload:<6} {result['requests_per_sec']:>8.1f} req/s  p50 {latency['p50_ms']:>7.2f}ms  p95 {latency['p95_ms']:>7.2f}ms  "
+            f"p99 {latency['p99_ms']:>7.2f}ms  errors {result['errors']}",
+            file=sys.stderr,
+        )
+        for name, operation in result["operations"].items():
+            if operation["count"]:
+                print(f"    {name:<7} {operation['count']:>7}  p50 {operation['p50_ms']:>7.2f}ms  p99 {operation['p99_ms']:>7.2f}ms  {operation['status']}", file=sys.stderr)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
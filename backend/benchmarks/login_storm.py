@@ -0,0 +1,86 @@
+"""API read latency while a burst of logins hits the server.
+
+    python -m benchmarks.login_storm --logins 64 --duration 10
+
+Runs twice: bcrypt in the request threadpool (PASSWORD_HASH_WORKERS=0, the
+old behaviour) and in the dedicated process pool.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+from .common import ASGIDriver, percentiles, run_isolated, seed_assets, use_database
+
+
+async def _reader(driver, headers, deadline, samples):
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        status, _, _ = await driver.request("GET", "/api/assets?limit=20", headers)
+        if status == 200:
+            samples.append((time.perf_counter() - started) * 1000)
+
+
+async def _login_loop(driver, index, deadline, outcomes):
+    # 每个任务使用不同的来源 IP，避免触发单 IP 限流
+    client = (f"10.99.{index // 250}.{index % 250 + 1}", 40000)
+    body = json.dumps({"username": "admin", "password": os.environ["ADMIN_DEFAULT_PASSWORD"]}).encode()
+    while time.monotonic() < deadline:
+        status, _, _ = await driver.request("POST", "/api/login", {"content-type": "application/json"}, body, client)
+        outcomes[status] = outcomes.get(status, 0) + 1
+        if status != 200:
+            await asyncio.sleep(0.05)
+
+
+async def _run(args) -> dict:
+    from app.main import app
+
+    async with ASGIDriver(app) as driver:
+        headers = await driver.login()
+        result = {}
+        for phase, logins in (("baseline", 0), ("storm", args.logins)):
+            deadline = time.monotonic() + args.duration
+            samples, outcomes = [], {}
+            tasks = [_reader(driver, headers, deadline, samples) for _ in range(args.readers)]
+            tasks += [_login_loop(driver, index, deadline, outcomes) for index in range(logins)]
+            await asyncio.gather(*tasks)
+            result[phase] = {"reads": percentiles(samples), "logins": {str(key): value for key, value in outcomes.items()}}
+        return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=64, help="concurrent login clients during the storm")
+    parser.add_argument("--readers", type=int, default=8, help="concurrent GET /api/assets clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per phase")
+    parser.add_argument("--workers", type=int, help="internal: PASSWORD_HASH_WORKERS for this run")
+    args = parser.parse_args()
+
+    if args.workers is not None:
+        os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+        os.environ.setdefault("ADMIN_DEFAULT_PASSWORD", "Admin@123")
+        os.environ["LOGIN_USER_FAILURE_LIMIT"] = "0"
+        use_database("login-storm")
+        seed_assets(1000)
+        result = asyncio.run(_run(args))
+        result["password_hash_workers"] = args.workers
+        print(json.dumps(result))
+        return
+
+    common = ["--logins", str(args.logins), "--readers", str(args.readers), "--duration", str(args.duration)]
+    report = [run_isolated("benchmarks.login_storm", "--workers", str(workers), *common) for workers in (0, 2)]
+    for result in report:
+        for phase in ("baseline", "storm"):
+            reads = result[phase]["reads"]
+            print(
+                f"workers={result['password_hash_workers']} {phase:<8} reads p50 {reads.get('p50_ms', 0):>8.1f} ms "
+                f"p99 {reads.get('p99_ms', 0):>8.1f} ms  logins {result[phase]['logins']}",
+                file=sys.stderr,
+            )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
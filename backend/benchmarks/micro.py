@@ -0,0 +1,160 @@
+"""Micro-benchmarks for the per-request hot paths: authentication, list serialization and audit logging.
+
+    python -m benchmarks.micro --size 100000
+
+Each case is run ``--repeat`` times over a fixed number of calls and the best
+run is reported, as ``timeit`` does, so the numbers track the code rather than
+noise from the rest of the machine. Audit logging is measured once per
+``AUDIT_MODE`` in separate interpreters, end to end: ``async`` until the
+background writer has persisted every event, ``strict`` with one commit per
+event.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from .common import run_isolated, use_database
+from .generate import ensure_inventory
+
+AUDIT_EVENTS = 5000
+
+
+def _result(elapsed: float, count: int, rows: int = 0) -> Dict[str, float]:
+    result = {"us_per_op": round(elapsed * 1e6 / count, 3), "ops_per_sec": round(count / elapsed, 1)}
+    if rows:
+        result["rows_per_sec"] = round(rows * count / elapsed)
+    return result
+
+
+def _bench(fn: Callable[[], Any], count: int, repeat: int, rows: int = 0) -> Dict[str, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(count):
+            fn()
+        best = min(best, time.perf_counter() - started)
+    return _result(best, count, rows)
+
+
+async def _abench(fn: Callable[[], Awaitable[Any]], count: int, repeat: int) -> Dict[str, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(count):
+            await fn()
+        best = min(best, time.perf_counter() - started)
+    return _result(best, count)
+
+
+async def _auth_cases(args) -> Dict[str, Any]:
+    from app.auth import create_access_token, validate_token
+    from app.database import SessionLocal
+    from app.dependencies import get_current_principal, get_current_user, principal_cache
+
+    token = create_access_token("admin")
+    principal = await get_current_principal(token)
+
+    def current_user():
+        # 与请求一致：每次使用新会话，身份映射中没有缓存的用户
+        db = SessionLocal()
+        try:
+            get_current_user(db, principal)
+        finally:
+            db.close()
+
+    async def principal_miss():
+        principal_cache.clear()
+        await get_current_principal(token)
+
+    return {
+        "validate_token": _bench(lambda: validate_token(token), args.calls, args.repeat),
+        "get_current_principal_cached": await _abench(lambda: get_current_principal(token), args.calls, args.repeat),
+        "get_current_principal_uncached": await _abench(principal_miss, args.calls // 10, args.repeat),
+        "get_current_user": _bench(current_user, args.calls // 10, args.repeat),
+    }
+
+
+def _serialization_cases(args) -> Dict[str, Any]:
+    from app import models
+    from app.database import SessionLocal
+    from app.routers.assets import asset_encoder
+    from app.routers.users import user_encoder
+
+    db = SessionLocal()
+    try:
+        result = {}
+        for limit in (100, 1000):
+            rows = db.query(*asset_encoder.columns).order_by(models.Asset.id).limit(limit).all()
+            result[f"list_assets_encode_{limit}"] = _bench(lambda: asset_encoder.dumps(rows), max(args.calls // limit, 10), args.repeat, limit)
+        users = db.query(*user_encoder.columns).join(models.User.role).all()
+        result["list_users_encode"] = _bench(lambda: user_encoder.dumps(users), max(args.calls // 100, 10), args.repeat, len(users))
+        return result
+    finally:
+        db.close()
+
+
+def _audit_case(args) -> Dict[str, Any]:
+    from app.database import SessionLocal
+    from app.utils.audit import audit_writer, create_audit_log
+
+    audit_writer.start()
+    db = SessionLocal()
+    try:
+        result = {}
+        for label, changes in (("plain", None), ("with_changes", {"status": ["spare", "in_use"], "location": ["1F-01", "2F-03"]})):
+            written = audit_writer.written
+            started = time.perf_counter()
+            for index in range(AUDIT_EVENTS):
+                create_audit_log(
+                    db, user_id=1, action="UPDATE", target_table="assets", target_id=index + 1, asset_code=f"AS-{index:08d}", changes=changes
+                )
+                db.commit()
+            # 异步模式计到后台线程全部落库为止
+            while audit_writer.written - written < AUDIT_EVENTS and args.audit_mode == "async":
+                time.sleep(0.005)
+            result[f"create_audit_log_{label}"] = _result(time.perf_counter() - started, AUDIT_EVENTS)
+        return result
+    finally:
+        db.close()
+        audit_writer.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=100000, help="assets in the benchmark database")
+    parser.add_argument("--users", type=int, default=1000, help="generated users, all encoded by list_users_encode")
+    parser.add_argument("--calls", type=int, default=20000, help="calls per run for the cheapest cases")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--audit-mode", choices=["async", "strict"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.audit_mode:
+        os.environ["AUDIT_MODE"] = args.audit_mode
+        os.environ.setdefault("ADMIN_DEFAULT_PASSWORD", "Admin@123")
+        use_database(f"inventory-{args.size}")
+        result = {f"{name}_{args.audit_mode}": value for name, value in _audit_case(args).items()}
+        if args.audit_mode == "async":
+            result.update(asyncio.run(_auth_cases(args)))
+            result.update(_serialization_cases(args))
+        print(json.dumps(result))
+        return
+
+    use_database(f"inventory-{args.size}")
+    ensure_inventory(args.size, users=args.users)
+    results: Dict[str, Any] = {}
+    for mode in ("async", "strict"):
+        results.update(
+            run_isolated("benchmarks.micro", "--audit-mode", mode, "--size", str(args.size), "--calls", str(args.calls), "--repeat", str(args.repeat))
+        )
+    for name, value in sorted(results.items()):
+        extra = f"  {value['rows_per_sec']:>10} rows/s" if "rows_per_sec" in value else ""
+        print(f"{name:<36} {value['us_per_op']:>10.2f} us/op {value['ops_per_sec']:>12.1f} op/s{extra}", file=sys.stderr)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""EXPLAIN every filter combination accepted by GET /api/assets and flag full scans.
+
+    python -m benchmarks.query_plans --size 100000
+
+Runs each combination (with and without a pagination cursor) through the same
+query builder as ``list_assets``, captures the SQL actually sent to SQLite and
+checks its ``EXPLAIN QUERY PLAN``. Exits with status 1 if any combination with
+an indexable filter scans the whole ``assets`` table or one of its indexes, so
+it can be wired into CI. Without ``--analyze`` the planner has no statistics
+for the freshly seeded rows, which is the worst case for index selection.
+"""
+import argparse
+import itertools
+import json
+import re
+import sys
+import time
+from datetime import datetime
+
+from .common import seed_assets, use_database
+
+# 取值与 generate_assets 生成的数据分布一致
+FILTER_VALUES = {
+    "category": "server",
+    "status_filter": "in_use",
+    "owner_dept": "财务部",
+    "ip_address": "10.0.1.5",
+    "ip_prefix": "10.0.1",
+    "cidr": "10.0.0.0/20",
+    "mac_address": "00:00:00:00:01",
+    "q": "huawei",
+    "asset_code": "0001",
+}
+# 子串匹配无法使用索引，只作为附加条件出现
+UNINDEXABLE = {"asset_code"}
+# 网段前缀与 CIDR 是同一条件的两种写法，同时给出时只使用 ip_prefix，不再组合
+ALTERNATIVES = {"ip_prefix", "cidr"}
+FULL_SCAN = re.compile(r"^SCAN assets(?: |$)")
+
+
+def _filters(combination):
+    from app.routers.assets import AssetFilterParams
+
+    params = {name: None for name in FILTER_VALUES}
+    params.update({name: FILTER_VALUES[name] for name in combination})
+    return AssetFilterParams(**params)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--analyze", action="store_true", help="run ANALYZE first, as after `python -m app.manage analyze`")
+    parser.add_argument("--verbose", action="store_true", help="print every plan, not only violations")
+    args = parser.parse_args()
+
+    use_database(f"assets-{args.size}")
+    seed_assets(args.size)
+
+    from sqlalchemy import event
+
+    from app.database import SessionLocal, engine
+    from app.migrations import analyze
+    from app.routers.assets import _keyset_query
+    from app.utils.pagination import encode_cursor
+
+    if args.analyze:
+        with engine.begin() as conn:
+            analyze(conn)
+
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    db = SessionLocal()
+    report, violations = [], []
+    try:
+        for size in range(len(FILTER_VALUES) + 1):
+            for combination in itertools.combinations(FILTER_VALUES, size):
+                if ALTERNATIVES <= set(combination):
+                    continue
+                for paged in (False, True):
+                    cursor = None
+                    if paged:
+                        cursor = encode_cursor(-1.0, 0) if "q" in combination else encode_cursor(datetime(2024, 3, 1), 1)
+                    statements.clear()
+                    started = time.perf_counter()
+                    _keyset_query(db, _filters(combination), cursor).limit(args.limit + 1).all()
+                    elapsed = (time.perf_counter() - started) * 1000
+                    statement, parameters = statements[-1]
+                    raw = db.connection().connection.cursor()
+                    plan = [row[-1] for row in raw.execute("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()]
+                    raw.close()
+                    indexed = set(combination) - UNINDEXABLE
+                    full_scan = bool(indexed) and any(FULL_SCAN.match(line) for line in plan)
+                    entry = {
+                        "filters": list(combination),
+                        "cursor": paged,
+                        "ms": round(elapsed, 2),
+                        "sort": any("TEMP B-TREE" in line for line in plan),
+                        "full_scan": full_scan,
+                        "plan": plan,
+                    }
+                    report.append(entry)
+                    if full_scan:
+                        violations.append(entry)
+                    if full_scan or args.verbose:
+                        label = ",".join(combination) or "-"
+                        print(f"{'FULL SCAN' if full_scan else 'ok':<9} {label:<60} cursor={paged!s:<5} {elapsed:>8.1f} ms", file=sys.stderr)
+                        for line in plan:
+                            print(f"    {line}", file=sys.stderr)
+    finally:
+        db.close()
+
+    slowest = max(report, key=lambda item: item["ms"])
+    print(
+        f"{len(report)} plans, {len(violations)} full scans, slowest {slowest['ms']} ms ({','.join(slowest['filters']) or '-'})",
+        file=sys.stderr,
+    )
+    print(json.dumps({"size": args.size, "violations": len(violations), "plans": report}, ensure_ascii=False, indent=2))
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Reconciling a full-network scan against the inventory: scan engine vs. one lookup and PUT per host.
+
+    python -m benchmarks.reconcile --size 100000 --workers 0 2
+
+Writes an ARP dump and an nmap XML file covering ``size`` seeded assets, where
+every 20th host has a new IP, every 33rd asset is absent and 2% extra hosts are
+unknown. Parsing and diffing run once per ``--workers`` value, each in a fresh
+interpreter. The last run also times the per-host ``GET /api/assets?mac_address=``
+(+ ``PUT``) path on ``--sample`` hosts, extrapolated to the whole scan, and then
+applies the remaining drift in one go.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import time
+
+from .common import DATA_DIR, ASGIDriver, run_isolated, seed_assets, use_database
+
+
+def _hosts(size: int):
+    # 与 generate_assets 的地址规则一致：第 index 个资产的 IP/MAC 由序号决定
+    for index in range(size):
+        if index % 33 == 0:
+            continue
+        mac = ":".join(f"{(index >> shift) & 255:02x}" for shift in (40, 32, 24, 16, 8, 0))
+        if index % 20 == 0:
+            ip = f"172.16.{(index >> 8) & 255}.{index & 255}"
+        else:
+            ip = f"10.{(index >> 16) & 255}.{(index >> 8) & 255}.{index & 255}"
+        yield ip, mac
+    for index in range(size // 50):
+        yield f"192.168.{(index >> 8) & 255}.{index & 255}", ":".join(f"{(0x020000000000 + index >> shift) & 255:02x}" for shift in (40, 32, 24, 16, 8, 0))
+
+
+def _write_scans(size: int):
+    arp_path = DATA_DIR / f"reconcile-{size}-arp.txt"
+    nmap_path = DATA_DIR / f"reconcile-{size}.xml"
+    with open(arp_path, "w") as arp, open(nmap_path, "w") as nmap:
+        arp.write("Address                  HWtype  HWaddress           Flags Mask            Iface\n")
+        nmap.write('<?xml version="1.0"?>\n<nmaprun scanner="nmap">\n')
+        for ip, mac in _hosts(size):
+            arp.write(f"? ({ip}) at {mac} [ether] on eth0\n")
+            nmap.write(
+                f'<host><status state="up"/><address addr="{ip}" addrtype="ipv4"/>'
+                f'<address addr="{mac.upper()}" addrtype="mac"/></host>\n'
+            )
+        nmap.write("</nmaprun>\n")
+    return [("arp", str(arp_path)), ("nmap", str(nmap_path))]
+
+
+async def _per_host(size: int, sample: int) -> dict:
+    from app.main import app
+
+    hosts = list(itertools.islice(_hosts(size), sample))
+    moved = list(itertools.islice((host for host in _hosts(size) if host[0].startswith("172.16.")), sample))
+    async with ASGIDriver(app) as driver:
+        headers = await driver.login()
+        json_headers = {**headers, "content-type": "application/json"}
+        started = time.perf_counter()
+        for _, mac in hosts:
+            await driver.request("GET", f"/api/assets?mac_address={mac}", headers)
+        lookup = (time.perf_counter() - started) / len(hosts)
+        started = time.perf_counter()
+        for ip, mac in moved:
+            _, _, body = await driver.request("GET", f"/api/assets?mac_address={mac}", headers)
+            asset = json.loads(body)[0]
+            await driver.request("PUT", f"/api/assets/{asset['id']}", json_headers, json.dumps({"ip_address": ip}).encode())
+        update = (time.perf_counter() - started) / len(moved)
+    return {"lookup_ms": round(lookup * 1000, 3), "lookup_and_put_ms": round(update * 1000, 3), "sampled_updates": len(moved)}
+
+
+def _child(args) -> dict:
+    from app.database import SessionLocal
+    from app.utils.reconcile import parse_sources, reconcile, scope_ranges, shutdown_reconcile_pool
+
+    if args.prepare:
+        seed_assets(args.size)
+        _write_scans(args.size)
+    sources = [("arp", str(DATA_DIR / f"reconcile-{args.size}-arp.txt")), ("nmap", str(DATA_DIR / f"reconcile-{args.size}.xml"))]
+    result = {"workers": args.workers, "bytes": sum(os.path.getsize(path) for _, path in sources)}
+    started = time.perf_counter()
+    observations = parse_sources(sources)
+    result["parse_seconds"] = round(time.perf_counter() - started, 3)
+    shutdown_reconcile_pool()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        report = reconcile(db, observations, scope=scope_ranges(["10.0.0.0/8"]))
+        result["diff_seconds"] = round(time.perf_counter() - started, 3)
+        result.update(
+            observations=report.observations,
+            hosts=report.hosts,
+            changed=report.changed_total,
+            unknown=report.unknown_total,
+            missing=report.missing_total,
+        )
+        if args.apply:
+            # 先按逐台方式修改一部分资产计时，其余由对账一次性批量更新
+            result["per_host"] = asyncio.run(_per_host(args.size, args.sample))
+            db.rollback()
+            started = time.perf_counter()
+            report = reconcile(db, observations, apply=True)
+            db.commit()
+            result["diff_and_apply_seconds"] = round(time.perf_counter() - started, 3)
+            result["applied"] = report.applied
+    finally:
+        db.close()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2])
+    parser.add_argument("--sample", type=int, default=300)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--prepare", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--apply", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        args.workers = args.workers[0]
+        os.environ["RECONCILE_WORKERS"] = str(args.workers)
+        os.environ["RECONCILE_CHUNK_BYTES"] = str(1024 * 1024)
+        os.environ.setdefault("ADMIN_DEFAULT_PASSWORD", "Admin@123")
+        use_database(f"reconcile-{args.size}")
+        print(json.dumps(_child(args)))
+        return
+
+    path = use_database(f"reconcile-{args.size}")
+    for suffix in ("", "-wal", "-shm"):
+        candidate = path.with_name(path.name + suffix)
+        if candidate.exists():
+            candidate.unlink()
+    results = []
+    for index, workers in enumerate(args.workers):
+        # 第一次运行播种并生成扫描文件，最后一次运行实际更新资产
+        extra = ["--prepare"] if index == 0 else []
+        if index == len(args.workers) - 1:
+            extra += ["--apply", "--sample", str(args.sample)]
+        result = run_isolated("benchmarks.reconcile", "--child", "--size", str(args.size), "--workers", str(workers), *extra)
+        results.append(result)
+        print(
+            f"workers {workers}: parse {result['parse_seconds']:.2f}s diff {result['diff_seconds']:.2f}s "
+            f"({result['observations']} records, {result['changed']} changed, {result['unknown']} unknown, {result['missing']} missing)",
+            file=sys.stderr,
+        )
+    last = results[-1]
+    per_host = last["per_host"]
+    estimate = (per_host["lookup_ms"] * last["hosts"] + (per_host["lookup_and_put_ms"] - per_host["lookup_ms"]) * last["changed"]) / 1000
+    print(
+        f"apply {last['applied']} changes: diff+apply {last['diff_and_apply_seconds']:.2f}s; "
+        f"per host: lookup {per_host['lookup_ms']:.2f}ms, lookup+PUT {per_host['lookup_and_put_ms']:.2f}ms, ~{estimate:.0f}s for the whole scan",
+        file=sys.stderr,
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
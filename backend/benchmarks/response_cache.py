@@ -0,0 +1,105 @@
+"""Read-mostly polling: no response cache, in-process cache, and cache plus conditional GETs.
+
+    python -m benchmarks.response_cache --clients 32 --duration 10
+
+Clients poll a fixed set of list pages and single assets, as monitoring tools
+do; ``--write-every`` mixes in updates so cached entries are invalidated.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+from .common import ASGIDriver, percentiles, run_isolated, seed_assets, use_database
+
+PATHS = [
+    "/api/assets?limit=100",
+    "/api/assets?limit=100&category=server",
+    "/api/assets?limit=100&status=in_use&category=pc",
+    "/api/assets/stats",
+] + [f"/api/assets/{asset_id}" for asset_id in range(1, 21)]
+
+
+async def _client(driver, headers, index, args, deadline, samples, outcomes):
+    rng = random.Random(index)
+    etags = {}
+    json_headers = {**headers, "content-type": "application/json"}
+    count = 0
+    while time.monotonic() < deadline:
+        count += 1
+        if args.write_every and count % args.write_every == 0:
+            body = json.dumps({"note": f"bench {index}-{count}"}).encode()
+            request = ("PUT", f"/api/assets/{rng.randint(1, 20)}", json_headers, body)
+        else:
+            path = rng.choice(PATHS)
+            request_headers = headers
+            if args.mode == "conditional" and path in etags:
+                request_headers = {**headers, "if-none-match": etags[path]}
+            request = ("GET", path, request_headers, b"")
+        started = time.perf_counter()
+        status, response_headers, _ = await driver.request(*request)
+        samples.append((time.perf_counter() - started) * 1000)
+        outcomes[status] = outcomes.get(status, 0) + 1
+        if request[0] == "GET" and "etag" in response_headers:
+            etags[request[1]] = response_headers["etag"]
+
+
+async def _run(args) -> dict:
+    from app.main import app
+
+    async with ASGIDriver(app) as driver:
+        headers = await driver.login()
+        deadline = time.monotonic() + args.duration
+        samples, outcomes = [], {}
+        started = time.monotonic()
+        await asyncio.gather(
+            *[_client(driver, headers, index, args, deadline, samples, outcomes) for index in range(args.clients)]
+        )
+        elapsed = time.monotonic() - started
+    return {
+        "mode": args.mode,
+        "requests_per_sec": round(len(samples) / elapsed, 1),
+        "latency": percentiles(samples),
+        "status": {str(key): value for key, value in outcomes.items()},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=100000, help="assets loaded before the run")
+    parser.add_argument("--write-every", type=int, default=50, help="one PUT every N requests per client, 0 disables")
+    parser.add_argument("--mode", choices=["uncached", "cached", "conditional"])
+    args = parser.parse_args()
+
+    if args.mode:
+        os.environ["RESPONSE_CACHE_BACKEND"] = "none" if args.mode == "uncached" else "memory"
+        os.environ.setdefault("ADMIN_DEFAULT_PASSWORD", "Admin@123")
+        use_database("response-cache")
+        seed_assets(args.seed)
+        print(json.dumps(asyncio.run(_run(args))))
+        return
+
+    options = [
+        "--clients", str(args.clients),
+        "--duration", str(args.duration),
+        "--seed", str(args.seed),
+        "--write-every", str(args.write_every),
+    ]
+    report = [run_isolated("benchmarks.response_cache", "--mode", mode, *options) for mode in ("uncached", "cached", "conditional")]
+    for result in report:
+        latency = result["latency"]
+        print(
+            f"{result['mode']:<11} {result['requests_per_sec']:>8.1f} req/s  p50 {latency.get('p50_ms', 0):>7.1f} ms  "
+            f"p99 {latency.get('p99_ms', 0):>7.1f} ms  status {result['status']}",
+            file=sys.stderr,
+        )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
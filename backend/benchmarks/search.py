@@ -0,0 +1,70 @@
+"""Compare FTS5-ranked search against the LIKE-based filtering it replaces.
+
+    python -m benchmarks.search --size 1000000
+
+Also checks that CJK substrings, which the FTS tokenizer cannot find inside a
+word, still match through ``GET /api/assets?q=`` as they did with LIKE; exits
+with status 1 otherwise.
+"""
+import argparse
+import json
+import sys
+
+from .common import seed_assets, timed, use_database
+
+TERMS = ["AS-00012345", "huawei", "SN0", "10.3.4", "ubuntu 22", "12F-07"]
+# 部门名的词中子串与词首前缀，取值与 generate_assets 生成的部门一致
+CJK_TERMS = ["务部", "研发", "中心 dell"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    use_database(f"assets-{args.size}")
+    seed_assets(args.size)
+
+    from sqlalchemy import and_
+
+    from app import models
+    from app.database import SessionLocal
+    from app.routers.assets import AssetFilterParams, _keyset_query
+    from app.utils.search import build_match_expression, like_fallback, ranked_matches
+
+    db = SessionLocal()
+    report = []
+    try:
+        for term in TERMS:
+
+            def like():
+                db.query(models.Asset).filter(and_(*like_fallback(term))).order_by(
+                    models.Asset.updated_at.desc()
+                ).limit(args.limit).all()
+
+            def fts():
+                matches = ranked_matches(build_match_expression(term))
+                db.query(models.Asset).join(matches, matches.c.asset_id == models.Asset.id).order_by(
+                    matches.c.rank
+                ).limit(args.limit).all()
+
+            like_result, fts_result = timed(like, repeat=5), timed(fts, repeat=5)
+            report.append({"term": term, "like": like_result, "fts": fts_result})
+            print(f"{term:<14} like {like_result['median_ms']:>9.1f} ms   fts {fts_result['median_ms']:>9.1f} ms", file=sys.stderr)
+        cjk, failed = [], False
+        for term in CJK_TERMS:
+            expected = db.query(models.Asset.id).filter(and_(*like_fallback(term))).count()
+            found = _keyset_query(db, AssetFilterParams(q=term), None).count()
+            ok = expected > 0 and found == expected
+            failed = failed or not ok
+            cjk.append({"term": term, "like": expected, "api": found, "ok": ok})
+            print(f"{term:<14} like {expected:>9} rows   api {found:>9} rows   {'ok' if ok else 'MISMATCH'}", file=sys.stderr)
+    finally:
+        db.close()
+    print(json.dumps({"size": args.size, "results": report, "cjk": cjk}, indent=2, ensure_ascii=False))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Rows/sec for list responses: ORM + pydantic + jsonable_encoder vs. column tuples + orjson.
+
+    python -m benchmarks.serialization --sizes 10000 100000
+
+``orm`` reproduces what FastAPI does for ``response_model=List[...]`` (validate
+every ORM row, then ``jsonable_encoder`` and ``json.dumps``); ``tuples`` is the
+``RowEncoder`` path used by ``list_assets`` and ``list_users``. Both produce the
+same bytes, which is checked before timing.
+"""
+import argparse
+import json
+import sys
+from typing import List
+
+from .common import run_isolated, seed_assets, timed, use_database
+
+
+def _seed_users(count: int) -> None:
+    from sqlalchemy import func, insert, select
+
+    from app import models
+    from app.database import engine
+
+    with engine.begin() as conn:
+        if conn.execute(select(func.count()).select_from(models.Role)).scalar() == 0:
+            conn.execute(insert(models.Role), [{"role_name": "viewer", "can_read_asset": True}])
+        role_id = conn.execute(select(models.Role.id)).scalars().first()
+        existing = conn.execute(select(func.count()).select_from(models.User)).scalar()
+        if existing >= count:
+            return
+        conn.execute(
+            insert(models.User),
+            [
+                {"username": f"user{index:07d}", "password_hash": "x", "display_name": f"用户{index}", "dept": "研发部", "role_id": role_id}
+                for index in range(existing, count)
+            ],
+        )
+
+
+def _scenario(size: int) -> dict:
+    use_database(f"assets-{size}")
+    seed_assets(size)
+    _seed_users(size)
+
+    from pydantic import parse_obj_as
+
+    from app import models, schemas
+    from app.database import SessionLocal
+    from app.routers.assets import asset_encoder
+    from app.routers.users import user_encoder
+    from app.utils.response_cache import encode_json
+
+    db = SessionLocal()
+    result = {"size": size}
+    try:
+        cases = {
+            "assets": (
+                lambda: encode_json(parse_obj_as(List[schemas.AssetOut], db.query(models.Asset).limit(size).all())),
+                lambda: asset_encoder.dumps(db.query(*asset_encoder.columns).limit(size).all()),
+            ),
+            "users": (
+                lambda: encode_json(parse_obj_as(List[schemas.UserOut], db.query(models.User).limit(size).all())),
+                lambda: user_encoder.dumps(db.query(*user_encoder.columns).join(models.User.role).limit(size).all()),
+            ),
+        }
+        for name, (orm, tuples) in cases.items():
+            db.expunge_all()
+            assert orm() == tuples(), f"{name}: outputs differ"
+            for label, fn in (("orm", orm), ("tuples", tuples)):
+                db.expunge_all()
+                timing = timed(lambda: (fn(), db.expunge_all()), repeat=3)
+                timing["rows_per_sec"] = round(size / (timing["median_ms"] / 1000))
+                result[f"{name}_{label}"] = timing
+    finally:
+        db.close()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--scenario", type=int, help="internal: run a single size")
+    args = parser.parse_args()
+
+    if args.scenario:
+        print(json.dumps(_scenario(args.scenario)))
+        return
+    report = [run_isolated("benchmarks.serialization", "--scenario", str(size)) for size in args.sizes]
+    for result in report:
+        for name in ("assets", "users"):
+            orm, tuples = result[f"{name}_orm"], result[f"{name}_tuples"]
+            print(
+                f"{result['size']:>8} {name:<6} orm {orm['rows_per_sec']:>9} rows/s   tuples {tuples['rows_per_sec']:>9} rows/s   "
+                f"x{orm['median_ms'] / tuples['median_ms']:.1f}",
+                file=sys.stderr,
+            )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
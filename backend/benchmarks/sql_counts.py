@@ -0,0 +1,161 @@
+"""SQL statements emitted per endpoint, checked against a budget and against data size.
+
+    python -m benchmarks.sql_counts [--small 5] [--large 200] [--verbose]
+
+Each endpoint is called against a small and a large dataset (users, assets and
+audit logs) in separate fresh databases. The script exits with status 1 when an
+endpoint emits more statements than its budget, or more statements on the large
+dataset than on the small one: the signature of an N+1 query. Intended for CI.
+
+Audit logging runs in strict mode and the response cache is off so that every
+statement a request causes is issued on the request path and counted.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+from .common import ASGIDriver, run_isolated, use_database
+
+# (method, path, body, statement budget)；路径中的 {user_id}/{asset_id} 在运行时替换
+ENDPOINTS = [
+    ("GET", "/api/me", None, 1),
+    ("GET", "/api/users", None, 1),
+    ("GET", "/api/users/roles", None, 1),
+    ("POST", "/api/login", {"username": "admin", "password": None}, 3),
+    ("POST", "/api/users", {"username": "sqlcount", "password": "Passw0rd!", "role_id": 3}, 4),
+    ("PUT", "/api/users/{user_id}", {"dept": "研发部", "role_id": 2}, 6),
+    ("GET", "/api/assets?limit=100", None, 2),
+    ("GET", "/api/assets/{asset_id}", None, 2),
+    ("GET", "/api/assets/stats", None, 6),
+    ("GET", "/api/assets/changes?since=0&limit=100", None, 2),
+    ("GET", "/api/assets?limit=100&as_of=2100-01-01T00:00:00", None, 2),
+    ("GET", "/api/assets/{asset_id}/history", None, 2),
+    ("GET", "/api/audit?limit=100", None, 2),
+    ("PUT", "/api/assets/{asset_id}", {"note": "sql count"}, 6),
+]
+
+
+def _seed(size: int) -> None:
+    from sqlalchemy import insert
+
+    from app import models
+    from app.auth import get_password_hash
+    from app.bootstrap import bootstrap
+    from app.database import engine
+    from benchmarks.common import generate_assets
+
+    bootstrap(engine)
+    password_hash = get_password_hash("Passw0rd!")
+    with engine.begin() as conn:
+        # 角色数随数据量增长，按角色逐个懒加载的写法在大数据集上会多出语句
+        role_count = 3 + size // 10
+        if role_count > 3:
+            conn.execute(insert(models.Role), [{"role_name": f"role{index:03d}"} for index in range(role_count - 3)])
+        conn.execute(
+            insert(models.User),
+            [
+                {"username": f"user{index:05d}", "password_hash": password_hash, "role_id": 1 + index % role_count, "is_active": True}
+                for index in range(size)
+            ],
+        )
+        conn.execute(insert(models.Asset), list(generate_assets(size)))
+        for index in range(size):
+            log_id = conn.execute(
+                insert(models.AuditLog).values(user_id=1, action="UPDATE", target_table="assets", target_id=index + 1)
+            ).inserted_primary_key[0]
+            conn.execute(
+                insert(models.AuditChange),
+                [
+                    {"audit_log_id": log_id, "target_table": "assets", "target_id": index + 1, "field": field, "old_value": "a", "new_value": "b"}
+                    for field in ("status", "location")
+                ],
+            )
+
+
+async def _measure(args) -> dict:
+    from sqlalchemy import event
+
+    from app.config import get_settings
+    from app.database import engine
+    from app.main import app
+
+    statements = []
+    engines = [engine]
+    if get_settings().db_async:
+        from app.async_database import async_engine
+
+        engines.append(async_engine.sync_engine)
+    for target in engines:
+        event.listen(target, "before_cursor_execute", lambda conn, cursor, statement, *rest: statements.append(statement))
+
+    counts = {}
+    async with ASGIDriver(app) as driver:
+        headers = await driver.login()
+        json_headers = {**headers, "content-type": "application/json"}
+        substitutions = {"user_id": "2", "asset_id": "1"}
+        for method, path, body, budget in ENDPOINTS:
+            if body and "password" in body and body["password"] is None:
+                body = {**body, "password": get_settings().admin_default_password}
+            target = path.format(**substitutions)
+            payload = json.dumps(body).encode() if body else b""
+            # 先调用一次预热登录态缓存等进程级缓存，再计数
+            if method == "GET":
+                await driver.request(method, target, json_headers, payload)
+            statements.clear()
+            status, _, _ = await driver.request(method, target, json_headers, payload)
+            counts[f"{method} {path}"] = {"status": status, "statements": len(statements), "budget": budget}
+            if args.verbose:
+                counts[f"{method} {path}"]["sql"] = [" ".join(statement.split())[:160] for statement in statements]
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--small", type=int, default=5)
+    parser.add_argument("--large", type=int, default=200)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--verbose", action="store_true", help="include the statements in the report")
+    args = parser.parse_args()
+
+    if args.size is not None:
+        os.environ["AUDIT_MODE"] = "strict"
+        os.environ["RESPONSE_CACHE_BACKEND"] = "none"
+        # 登录态缓存按时间间隔比对版本号，计数只统计请求本身的语句
+        os.environ["PRINCIPAL_CACHE_REVALIDATE_SECONDS"] = "3600"
+        os.environ.setdefault("ADMIN_DEFAULT_PASSWORD", "Admin@123")
+        path = use_database(f"sql-counts-{args.size}")
+        for suffix in ("", "-wal", "-shm"):
+            candidate = path.with_name(path.name + suffix)
+            if candidate.exists():
+                candidate.unlink()
+        _seed(args.size)
+        print(json.dumps(asyncio.run(_measure(args))))
+        return
+
+    extra = ["--verbose"] if args.verbose else []
+    small = run_isolated("benchmarks.sql_counts", "--size", str(args.small), *extra)
+    large = run_isolated("benchmarks.sql_counts", "--size", str(args.large), *extra)
+    failures = []
+    for endpoint, result in large.items():
+        baseline = small[endpoint]["statements"]
+        problems = []
+        if result["status"] >= 400:
+            problems.append(f"HTTP {result['status']}")
+        if result["statements"] > result["budget"]:
+            problems.append(f"over budget {result['budget']}")
+        if result["statements"] > baseline:
+            problems.append(f"grows with data ({baseline} -> {result['statements']})")
+        if problems:
+            failures.append(endpoint)
+        print(
+            f"{endpoint:<45} {baseline:>3} / {result['statements']:>3} statements  {'; '.join(problems) or 'ok'}",
+            file=sys.stderr,
+        )
+    print(json.dumps({"small": small, "large": large}, indent=2))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
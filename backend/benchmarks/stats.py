@@ -0,0 +1,60 @@
+"""Dashboard counts: download-and-count, GROUP BY over assets, and the asset_stats summary table.
+
+    python -m benchmarks.stats --size 1000000
+"""
+import argparse
+import json
+import sys
+from collections import Counter
+
+from .common import seed_assets, timed, use_database
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=100000)
+    args = parser.parse_args()
+
+    use_database(f"assets-{args.size}")
+    seed_assets(args.size)
+
+    from sqlalchemy import func, select
+
+    from app import models
+    from app.database import SessionLocal
+    from app.utils.stats import DIMENSIONS, asset_stats
+
+    db = SessionLocal()
+    columns = [getattr(models.Asset, name) for name in DIMENSIONS]
+    try:
+
+        def client_side():
+            # 相当于前端拉取全部资产后在浏览器中计数
+            counters = {name: Counter() for name in DIMENSIONS}
+            for row in db.execute(select(*columns)):
+                for name, value in zip(DIMENSIONS, row):
+                    counters[name][value] += 1
+
+        def group_by():
+            for column in columns:
+                db.execute(select(column, func.count()).group_by(column)).all()
+
+        def summary():
+            asset_stats(db, DIMENSIONS, ("category", "status"))
+
+        report = {
+            "size": args.size,
+            "groups": db.query(models.AssetStat).count(),
+            "client_side": timed(client_side, repeat=3),
+            "group_by": timed(group_by, repeat=3),
+            "summary_table": timed(summary, repeat=5),
+        }
+    finally:
+        db.close()
+    for name in ("client_side", "group_by", "summary_table"):
+        print(f"{name:<14} {report[name]['median_ms']:>9.1f} ms", file=sys.stderr)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Run the micro-benchmarks and the load test and write one JSON file, for comparing commits.
+
+    python -m benchmarks.suite --output before.json
+    git checkout <other commit>
+    python -m benchmarks.suite --output after.json
+    python -m benchmarks.compare before.json after.json
+
+Both runs use the same generated inventory (it is only regenerated when the
+requested size changes), so the difference between the files is the code.
+"""
+import argparse
+import json
+import platform
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+from .common import BACKEND_DIR
+
+
+def _run(module: str, *args: str) -> Any:
+    # 进度输出直接显示在终端，标准输出整体为 JSON
+    output = subprocess.run([sys.executable, "-m", module, *args], cwd=BACKEND_DIR, check=True, stdout=subprocess.PIPE, text=True).stdout
+    return json.loads(output)
+
+
+def _git(*args: str) -> str:
+    try:
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def metadata() -> Dict[str, Any]:
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "machine": platform.machine(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", type=Path, required=True)
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--workload", nargs="+", default=["read", "mixed", "write", "login"])
+    args = parser.parse_args()
+
+    common: List[str] = ["--size", str(args.size), "--users", str(args.users)]
+    result = {"meta": metadata()}
+    print(f"micro benchmarks ({args.size} assets)", file=sys.stderr)
+    result["micro"] = _run("benchmarks.micro", *common)
+    print(f"load test: {', '.join(args.workload)}", file=sys.stderr)
+    result["load"] = _run(
+        "benchmarks.load", *common, "--clients", str(args.clients), "--duration", str(args.duration), "--workload", *args.workload
+    )
+    args.output.write_text(json.dumps(result, indent=2, ensure_ascii=False))
+    print(f"written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -55,10 +55,12 @@ export const AssetFormPage: React.FC<{ mode: "create" | "edit" }> = ({ mode }) =
   const [values, setValues] = useState<AssetFormValues>(defaultValues);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  const [etag, setEtag] = useState<string | null>(null);
 
   useEffect(() => {
     if (mode === "edit" && id) {
       apiClient.get(`/api/assets/${id}`).then((response) => {
+        setEtag(response.headers["etag"] ?? null);
         const data = response.data as Partial<AssetFormValues>;
         setValues({
           asset_code: data.asset_code ?? "",
@@ -92,7 +94,7 @@ export const AssetFormPage: React.FC<{ mode: "create" | "edit" }> = ({ mode }) =
       if (mode === "create") {
         await apiClient.post("/api/assets", values);
       } else if (id) {
-        await apiClient.put(`/api/assets/${id}`, values);
+        await apiClient.put(`/api/assets/${id}`, values, { headers: etag ? { "If-Match": etag } : {} });
       }
       navigate("/assets");
     } catch (err: any) {
@@ -23,6 +23,8 @@ type FilterState = {
   status: string;
 };
 
+const PAGE_SIZE = 100;
+
 const categoryOptions = [
   { label: "全部", value: "" },
   { label: "台式机", value: "pc" },
@@ -53,6 +55,7 @@ export const AssetsPage: React.FC = () => {
   const [assets, setAssets] = useState<Asset[]>([]);
   const [filters, setFilters] = useState<FilterState>({ asset_code: "", ip_address: "", category: "", status: "" });
   const [loading, setLoading] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
 
   const canCreate = user?.role.can_create_asset;
   const canUpdate = user?.role.can_update_asset;
@@ -61,8 +64,21 @@ export const AssetsPage: React.FC = () => {
   const fetchAssets = async () => {
     setLoading(true);
     try {
-      const response = await apiClient.get("/api/assets", { params: filters });
+      const response = await apiClient.get("/api/assets", { params: { ...filters, limit: PAGE_SIZE } });
       setAssets(response.data);
+      setNextCursor(response.headers["x-next-cursor"] ?? null);
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoading(true);
+    try {
+      const response = await apiClient.get("/api/assets", { params: { ...filters, limit: PAGE_SIZE, cursor: nextCursor } });
+      setAssets((prev) => [...prev, ...response.data]);
+      setNextCursor(response.headers["x-next-cursor"] ?? null);
     } finally {
       setLoading(false);
     }
@@ -235,6 +251,16 @@ export const AssetsPage: React.FC = () => {
       </div>
 
       <div className="grid gap-4 lg:hidden">{cards}</div>
+
+      {nextCursor && (
+        <button
+          onClick={loadMore}
+          disabled={loading}
+          className="w-full rounded-md border border-slate-200 bg-white px-4 py-2 text-sm font-semibold text-slate-600 hover:bg-slate-50 disabled:opacity-50"
+        >
+          加载更多
+        </button>
+      )}
     </div>
   );
 };